@@ -1,7 +1,79 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm # For custom user admin forms
-from .models import CustomUser, Company, JobApplication
+from .models import CustomUser, Company, JobApplication, ScoringJob, OutgoingEmail, ExtractedText, ResumeBlob, StatusTransition, StatusRollup, FunnelRollup
+from .company_index import resolve_company
+from .exporter import export_response
+from .search import search_applications
+
+# --- List filters ---
+class AutocompleteFilter(admin.ListFilter):
+    """
+    Filters the changelist on a foreign key picked with the admin's autocomplete widget, instead of
+    listing every related row in the sidebar (the related model's admin needs search_fields).
+    """
+    field_name = None
+    template = 'admin/job_applications/autocomplete_filter.html'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.field = model._meta.get_field(self.field_name)
+        self.admin_site = model_admin.admin_site
+        self.parameter_name = f'{self.field_name}__id__exact'
+        if self.parameter_name in params:
+            self.used_parameters[self.parameter_name] = params.pop(self.parameter_name)[-1]
+
+    def value(self):
+        return self.used_parameters.get(self.parameter_name)
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.parameter_name]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        try:
+            return queryset.filter(**{f'{self.field.attname}': int(self.value())})
+        except ValueError as e:
+            raise IncorrectLookupParameters(e)
+
+    def choices(self, changelist):
+        # Only the selected object is loaded (to label the widget); the rest come from the autocomplete view.
+        choice_field = forms.ModelChoiceField(
+            queryset=self.field.remote_field.model._default_manager.all(), required=False,
+            widget=AutocompleteSelect(self.field, self.admin_site, attrs={'data-placeholder': 'Type to search'}),
+        )
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'parameter_name': self.parameter_name,
+            'widget': choice_field.widget.render(f'filter-{self.parameter_name}', self.value()),
+        }
+
+    @classmethod
+    def media(cls):
+        return AutocompleteSelect(None, None).media + forms.Media(js=['js/autocomplete_filter.js'])
+
+
+class UserAutocompleteFilter(AutocompleteFilter):
+    title = 'user'
+    field_name = 'user'
+
+
+class CompanyAutocompleteFilter(AutocompleteFilter):
+    title = 'company'
+    field_name = 'company'
+
 
 # --- CustomUser Admin ---
 class CustomUserCreationForm(UserCreationForm):
@@ -56,19 +128,26 @@ class CustomUserAdmin(BaseUserAdmin):
 class CompanyAdmin(admin.ModelAdmin):
     list_display = ('name', 'website', 'user_email_display')
     search_fields = ('name', 'website', 'user__email')
-    list_filter = ('user__email',) # Or simply 'user' if you want to filter by user ID
+    list_filter = (UserAutocompleteFilter,)
 
     def user_email_display(self, obj):
-        return obj.user.email
+        return obj.user_email
     user_email_display.short_description = 'User (Email)'
-    user_email_display.admin_order_field = 'user__email' # Allows sorting by email
+    user_email_display.admin_order_field = 'user_email' # Allows sorting by email
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        qs = super().get_queryset(request).annotate(user_email=F('user__email')) # Joined, not a query per row
         if request.user.is_superuser:
             return qs
         return qs.filter(user=request.user)
 
+    def get_list_filter(self, request):
+        return self.list_filter if request.user.is_superuser else () # Others only see their own rows
+
+    @property
+    def media(self):
+        return super().media + AutocompleteFilter.media()
+
     def save_model(self, request, obj, form, change):
         if not obj.pk: # If new object
             obj.user = request.user
@@ -85,19 +164,33 @@ class CompanyAdmin(admin.ModelAdmin):
 
 
 # --- JobApplication Admin ---
+class JobApplicationChangeList(ChangeList):
+    """Loads only the columns the changelist renders (no job_description/notes blobs)."""
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).only(*self.model_admin.list_only_fields)
+
+
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
     list_display = (
-        'job_title', 'get_company_name', 'user_email_display', 
+        'job_title', 'company_display', 'user_email_display', 
         'application_source', 'applied_date', 'status', 
         'resume_submitted_link', 'resume_match_score' # Added score to list
     )
-    list_filter = ('status', 'applied_date', 'user__email', 'company__name', 'application_source')
-    search_fields = (
-        'job_title', 'company__name', 'company_name_manual', 
-        'job_description', 'notes', 'application_source', 'user__email'
+    list_filter = ('status', 'applied_date', UserAutocompleteFilter, CompanyAutocompleteFilter, 'application_source')
+    # Joined into the page query: the columns below and __str__ (the row checkbox's aria-label) use them.
+    list_select_related = ('company', 'user')
+    # Columns needed by list_display and __str__ (see JobApplicationChangeList); keep in sync when adding columns.
+    list_only_fields = (
+        'job_title', 'company__name', 'company_name_manual', 'user__email', 'application_source',
+        'applied_date', 'updated_at', 'status', 'resume_submitted', 'resume_match_score',
     )
-    readonly_fields = ('created_at', 'updated_at', 'last_reminder_sent_date', 'resume_match_score_display') # Changed here
+    # Text searches go through the full-text index (see get_search_results); an email address
+    # searches user__email instead.
+    search_fields = ('user__email',)
+    search_help_text = 'Full-text search over title, company, description and notes ("phrases", prefix*), or a user email.'
+    readonly_fields = ('created_at', 'updated_at', 'last_reminder_sent_date', 'status_changed_at', 'resume_match_score_display') # Changed here
+    actions = ['export_csv', 'export_xlsx']
     
     fieldsets = (
         (None, {
@@ -110,7 +203,7 @@ class JobApplicationAdmin(admin.ModelAdmin):
         }),
         ('Internal Tracking', { # Removed (Read-only) from title as score is now editable via a button if needed
             'fields': ('resume_match_score_display', 'last_reminder_sent_date', 
-                       'created_at', 'updated_at'),
+                       'status_changed_at', 'created_at', 'updated_at'),
             'classes': ('collapse',),
         }),
     )
@@ -129,6 +222,11 @@ class JobApplicationAdmin(admin.ModelAdmin):
         return "No resume"
     resume_submitted_link.short_description = "Resume"
 
+    def company_display(self, obj):
+        return obj.get_company_name()
+    company_display.short_description = 'Company'
+    company_display.admin_order_field = 'company_sort_name'
+
     def user_email_display(self, obj):
         return obj.user.email
     user_email_display.short_description = 'User (Email)'
@@ -136,11 +234,46 @@ class JobApplicationAdmin(admin.ModelAdmin):
 
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        # Sorts the company column the way it is displayed (linked company, else the typed name)
+        qs = super().get_queryset(request).annotate(company_sort_name=Coalesce('company__name', 'company_name_manual'))
         if request.user.is_superuser:
             return qs
         return qs.filter(user=request.user)
 
+    def get_list_filter(self, request):
+        if request.user.is_superuser:
+            return self.list_filter
+        return ('status', 'applied_date', 'application_source') # Their own rows only: no user/company pickers
+
+    def get_autocomplete_fields(self, request):
+        # A superuser's user/company dropdowns would otherwise list every user's rows
+        return ('user', 'company') if request.user.is_superuser else ()
+
+    @property
+    def media(self):
+        return super().media + AutocompleteFilter.media()
+
+    # Exports stream the selection ("select all" covers every matching row, across users for a
+    # superuser) with the owner's email as an extra column; see exporter.py.
+    @admin.action(description="Export selected applications as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'csv', 'job-applications-admin', include_user=True)
+
+    @admin.action(description="Export selected applications as Excel")
+    def export_xlsx(self, request, queryset):
+        return export_response(queryset, 'xlsx', 'job-applications-admin', include_user=True)
+
+    def get_changelist(self, request, **kwargs):
+        return JobApplicationChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        if '@' in search_term:
+            return super().get_search_results(request, queryset, search_term)
+        user = None if request.user.is_superuser else request.user
+        return search_applications(queryset, search_term, user=user), False
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "company":
             if not request.user.is_superuser:
@@ -170,10 +303,97 @@ class JobApplicationAdmin(admin.ModelAdmin):
         company_obj_from_dropdown = form.cleaned_data.get('company')
         company_name_manual = form.cleaned_data.get('company_name_manual')
         if not company_obj_from_dropdown and company_name_manual:
-            resolved_company, created = Company.objects.get_or_create(
-                user=applicant_user, 
-                name=company_name_manual.strip()
-            )
-            obj.company = resolved_company
+            obj.company = resolve_company(applicant_user, company_name_manual) # From the user's cached company index
         
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+
+# --- ScoringJob Admin ---
+@admin.register(ScoringJob)
+class ScoringJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'application', 'status', 'attempts', 'run_after', 'finished_at')
+    list_filter = ('status',)
+    list_select_related = ('application', 'application__user', 'application__company')
+    readonly_fields = ('application', 'attempts', 'created_at', 'updated_at', 'finished_at', 'last_error')
+
+
+# --- OutgoingEmail Admin ---
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'subject', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('subject',)
+    exclude = ('body', 'html_body') # Activation and password-reset bodies hold working account links
+    readonly_fields = ('kind', 'from_email', 'to', 'subject', 'attempts', 'claim_token',
+                       'last_error', 'created_at', 'updated_at', 'sent_at')
+    actions = ['retry_messages']
+
+    @admin.action(description="Retry selected failed messages")
+    def retry_messages(self, request, queryset):
+        retried = queryset.filter(status=OutgoingEmail.STATUS_FAILED).update(
+            status=OutgoingEmail.STATUS_PENDING, attempts=0, run_after=timezone.now(),
+        )
+        self.message_user(request, f"{retried} message(s) queued again.")
+
+    def has_add_permission(self, request):
+        return False
+
+
+# --- ExtractedText Admin ---
+@admin.register(ExtractedText)
+class ExtractedTextAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'extractor_version', 'text_length', 'last_used_at')
+    list_filter = ('extractor_version',)
+    search_fields = ('content_hash',)
+    readonly_fields = ('content_hash', 'extractor_version', 'text_length', 'created_at', 'last_used_at')
+
+
+# --- ResumeBlob Admin ---
+@admin.register(ResumeBlob)
+class ResumeBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'ref_count', 'created_at', 'updated_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'ref_count', 'created_at', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False # Registered by JobApplication.save(); counts are fixed with `resume_storage --recount`
+
+
+# --- Status History Admin ---
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ('application', 'from_status', 'to_status', 'changed_at', 'duration')
+    list_filter = ('to_status',)
+    list_select_related = ('application', 'application__user', 'application__company')
+    readonly_fields = ('application', 'user', 'from_status', 'to_status', 'changed_at', 'duration')
+
+    def has_add_permission(self, request):
+        return False # Append-only log written by JobApplication.save()
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StatusRollup)
+class StatusRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'from_status', 'to_status', 'transition_count', 'timed_count', 'total_seconds')
+    list_filter = ('to_status',)
+    list_select_related = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FunnelRollup)
+class FunnelRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'stage', 'application_count')
+    list_select_related = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,134 @@
+"""
+Per-user dashboard statistics.
+
+Everything is computed with a few GROUP BY / ORDER BY queries (no iteration over
+JobApplication objects); the time-in-stage figures read the user's StatusRollup rows (a few dozen
+at most) and the funnel their FunnelRollup rows (one per stage) rather than the transition log.
+Results are cached under the user's ANALYTICS version, which signals.py bumps whenever one of
+their applications is saved or deleted (and the scoring code bumps when it writes scores with
+UPDATEs that send no signals).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .cache_versions import ANALYTICS, versioned_key
+from .models import FUNNEL_STAGES, FunnelRollup, JobApplication, StatusRollup, StatusTransition
+
+WEEKS_SHOWN = 26
+
+
+def get_dashboard_stats(user):
+    """Returns the (cached) dashboard statistics for a user."""
+    key = versioned_key(ANALYTICS, user.pk, 'dashboard')
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(user)
+        cache.set(key, stats, getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 3600))
+    return stats
+
+
+def compute_dashboard_stats(user):
+    applications = JobApplication.objects.filter(user=user).order_by()
+
+    # 1. Applications per status
+    status_counts = dict(applications.values_list('status').annotate(count=Count('id')))
+    total = sum(status_counts.values())
+    by_status = [(code, label, status_counts.get(code, 0)) for code, label in JobApplication.STATUS_CHOICES]
+
+    # 2. Applications and average match score per source
+    source_labels = dict(JobApplication.APPLICATION_SOURCE_CHOICES)
+    by_source = [
+        (row['application_source'], source_labels.get(row['application_source'], 'Not specified'),
+         row['count'], row['avg_score'])
+        for row in applications.values('application_source')
+                               .annotate(count=Count('id'), avg_score=Avg('resume_match_score'))
+                               .order_by('-count')
+    ]
+
+    # 3. Applications per week, for the last WEEKS_SHOWN weeks (empty weeks filled with 0)
+    today = timezone.localdate()
+    first_week = today - timedelta(days=today.weekday()) - timedelta(weeks=WEEKS_SHOWN - 1)
+    weekly_counts = {
+        _as_date(week): count
+        for week, count in applications.filter(applied_date__gte=first_week)
+                                       .annotate(week=TruncWeek('applied_date'))
+                                       .values_list('week').annotate(count=Count('id'))
+    }
+    weekly = [(first_week + timedelta(weeks=i), weekly_counts.get(first_week + timedelta(weeks=i), 0))
+              for i in range(WEEKS_SHOWN)]
+
+    # 4. Funnel conversion and time in each stage (from the rollup tables)
+    funnel = _funnel(user)
+    rollups = list(StatusRollup.objects.filter(user=user)
+                   .values_list('from_status', 'to_status', 'transition_count', 'timed_count', 'total_seconds'))
+    time_in_stage = _time_in_stage(rollups)
+
+    # 5. Median days until the first response (the first move out of APPLIED)
+    median_response_days = _median_response_days(user, sum(
+        timed for from_status, _, _, timed, _ in rollups if from_status == 'APPLIED'
+    ))
+
+    return {
+        'total': total,
+        'by_status': by_status,
+        'by_source': by_source,
+        'weekly': weekly,
+        'weekly_max': max([count for _, count in weekly] + [1]),
+        'funnel': funnel,
+        'time_in_stage': time_in_stage,
+        'median_response_days': median_response_days,
+        'generated_at': timezone.now(),
+    }
+
+
+def _as_date(value):
+    return value.date() if hasattr(value, 'date') else value
+
+
+def _funnel(user):
+    """
+    [(stage label, applications that reached it, % of the previous stage)]
+    Read from the FunnelRollup rows, which count each application once per stage it ever reached
+    (skipping a stage counts for it), so every stage is at most the one before it.
+    """
+    counts = dict(FunnelRollup.objects.filter(user=user).values_list('stage', 'application_count'))
+    reached = [counts.get(stage, 0) for stage in range(len(FUNNEL_STAGES))]
+    funnel = []
+    for stage, label in enumerate(FUNNEL_STAGES):
+        previous = reached[stage - 1] if stage else None
+        funnel.append((label, reached[stage], reached[stage] / previous * 100 if previous else None))
+    return funnel
+
+
+def _time_in_stage(rollups):
+    """[(status code, label, transitions out of it, average days spent in it)] in STATUS_CHOICES order."""
+    totals = {}
+    for from_status, _, count, timed, seconds in rollups:
+        if from_status:
+            exits, timed_total, seconds_total = totals.get(from_status, (0, 0, 0.0))
+            totals[from_status] = (exits + count, timed_total + timed, seconds_total + seconds)
+    return [
+        (code, label, totals[code][0], totals[code][2] / totals[code][1] / 86400 if totals[code][1] else None)
+        for code, label in JobApplication.STATUS_CHOICES if code in totals
+    ]
+
+
+def _median_response_days(user, responded):
+    """
+    The median is picked by the database (ORDER BY + LIMIT/OFFSET on the middle row or two, along
+    the (user, from_status, duration) index) rather than by loading every duration.
+    """
+    if not responded:
+        return None
+    durations = (StatusTransition.objects.filter(user=user, from_status='APPLIED', duration__isnull=False)
+                 .order_by('duration').values_list('duration', flat=True))
+    middle = responded // 2
+    values = list(durations[middle - 1:middle + 1] if responded % 2 == 0 else durations[middle:middle + 1])
+    if not values:
+        return None
+    return sum(value.total_seconds() for value in values) / len(values) / 86400
@@ -0,0 +1,378 @@
+"""
+Approximate nearest-neighbour index over job description embeddings.
+
+Used for "find applications similar to this posting" and duplicate-posting detection. The index is
+pure NumPy random-hyperplane LSH: every vector is hashed into one bucket per table, a query only
+scores the vectors in its buckets (plus the buckets one bit away), and the candidates are re-ranked
+by exact cosine similarity. Small indexes, and queries whose buckets hold too few candidates, fall
+back to brute force.
+
+The index is built from the embeddings the scoring code already stores (DocumentEmbedding), saved
+to settings.JD_INDEX_PATH, and kept up to date incrementally by sync_index(), which picks up
+applications updated since the last sync (the scoring worker calls it on every loop). Only the
+scoring worker and `build_jd_index` build, sync or save it; web requests just read the saved file
+(newer saves are loaded in a background thread), and search the requesting user's own stored
+embeddings by brute force until one exists.
+"""
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .documents import text_hash
+from .embeddings import get_embeddings, get_stored_embeddings
+from .models import JobApplication
+from .utils import get_sentence_model, get_sentence_model_name
+
+BRUTE_FORCE_THRESHOLD = 2000 # Below this many vectors a full scan is cheaper than bucket lookups
+
+
+class JobDescriptionIndex:
+    def __init__(self, dimensions, n_tables=8, n_bits=12, seed=0, model_name=''):
+        self.dimensions = dimensions
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.model_name = model_name
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, n_bits, dimensions)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(n_bits, dtype=np.int64))
+
+        self.application_ids = []
+        self.user_ids = []
+        self.content_hashes = []
+        self._vectors = []
+        self._matrix = None # Stacked vectors, rebuilt lazily after changes
+        self._deleted = set() # Row numbers of removed/replaced entries
+        self._row_by_application = {}
+        self._rows_by_user = defaultdict(set)
+        self._buckets = [defaultdict(list) for _ in range(n_tables)]
+        self.synced_at = None
+
+    def __len__(self):
+        return len(self._row_by_application)
+
+    def _codes(self, vector):
+        """One bucket code per table for a single vector."""
+        bits = (self.planes @ vector) > 0 # (n_tables, n_bits)
+        return bits.astype(np.int64) @ self._bit_weights
+
+    def _codes_of(self, matrix):
+        """Bucket codes of many vectors at once: (rows, n_tables)."""
+        bits = np.einsum('tbd,nd->ntb', self.planes, matrix) > 0 # (rows, n_tables, n_bits)
+        return bits.astype(np.int64) @ self._bit_weights
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = (np.vstack(self._vectors) if self._vectors
+                            else np.zeros((0, self.dimensions), dtype=np.float32))
+        return self._matrix
+
+    def add(self, application_id, user_id, vector, content_hash=''):
+        """Adds or replaces the vector of an application."""
+        self.remove(application_id)
+        row = len(self._vectors)
+        vector = np.asarray(vector, dtype=np.float32)
+        self._vectors.append(vector)
+        self.application_ids.append(application_id)
+        self.user_ids.append(user_id)
+        self.content_hashes.append(content_hash)
+        self._row_by_application[application_id] = row
+        self._rows_by_user[user_id].add(row)
+        for table, code in enumerate(self._codes(vector)):
+            self._buckets[table][int(code)].append(row)
+        self._matrix = None
+
+    def remove(self, application_id):
+        row = self._row_by_application.pop(application_id, None)
+        if row is not None:
+            self._deleted.add(row)
+            self._rows_by_user[self.user_ids[row]].discard(row)
+
+    def content_hash_for(self, application_id):
+        row = self._row_by_application.get(application_id)
+        return None if row is None else self.content_hashes[row]
+
+    def _candidate_rows(self, vector):
+        candidates = set()
+        for table, code in enumerate(self._codes(vector)):
+            code = int(code)
+            buckets = self._buckets[table]
+            candidates.update(buckets.get(code, ()))
+            # Multi-probe: neighbouring buckets (one bit flipped) catch near misses.
+            for bit in range(self.n_bits):
+                candidates.update(buckets.get(code ^ (1 << bit), ()))
+        return candidates - self._deleted
+
+    def query(self, vector, k=10, user_id=None, exclude_ids=()):
+        """Returns up to k (application_id, cosine similarity) pairs, most similar first."""
+        vector = np.asarray(vector, dtype=np.float32)
+        if user_id is not None:
+            allowed = self._rows_by_user.get(user_id, set())
+        else:
+            allowed = None
+        excluded_rows = {self._row_by_application[pk] for pk in exclude_ids if pk in self._row_by_application}
+
+        rows = None
+        if len(self) >= BRUTE_FORCE_THRESHOLD:
+            rows = self._candidate_rows(vector)
+            if allowed is not None:
+                rows &= allowed
+            rows -= excluded_rows
+            if len(rows) < k:
+                rows = None # Too few candidates: fall back to an exact scan
+        if rows is None:
+            rows = set(allowed) if allowed is not None else set(self._row_by_application.values())
+            rows -= excluded_rows
+        if not rows:
+            return []
+
+        rows = np.fromiter(rows, dtype=np.int64)
+        similarities = self.matrix[rows] @ vector
+        top = np.argsort(-similarities, kind='stable')[:k]
+        return [(self.application_ids[rows[i]], float(similarities[i])) for i in top]
+
+    def save(self, path):
+        """Writes the live entries to an .npz file (atomically, via a temp file + rename)."""
+        live_rows = sorted(self._row_by_application.values())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npz')
+        os.close(fd)
+        try:
+            np.savez(
+                tmp_path,
+                planes=self.planes,
+                vectors=self.matrix[live_rows] if live_rows else np.zeros((0, self.dimensions), dtype=np.float32),
+                application_ids=np.asarray([self.application_ids[r] for r in live_rows], dtype=np.int64),
+                user_ids=np.asarray([self.user_ids[r] for r in live_rows], dtype=np.int64),
+                content_hashes=np.asarray([self.content_hashes[r] for r in live_rows], dtype='U64'),
+                codes=self._codes_of(self.matrix[live_rows]) if live_rows else np.zeros((0, self.n_tables), dtype=np.int64),
+                model_name=np.asarray(self.model_name),
+                synced_at=np.asarray(self.synced_at.isoformat() if self.synced_at else ''),
+            )
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a saved index. The row maps and buckets are built in bulk from the saved arrays and
+        bucket codes (computed in one pass for files saved without them), not by add() per row.
+        """
+        data = np.load(path)
+        planes = data['planes']
+        index = cls(planes.shape[2], n_tables=planes.shape[0], n_bits=planes.shape[1], model_name=str(data['model_name']))
+        index.planes = planes
+        vectors = data['vectors'].astype(np.float32, copy=False)
+        application_ids = data['application_ids'].tolist()
+        user_ids = data['user_ids'].tolist()
+        codes = data['codes'] if 'codes' in data.files else index._codes_of(vectors)
+
+        index._vectors = list(vectors)
+        index._matrix = vectors
+        index.application_ids = application_ids
+        index.user_ids = user_ids
+        index.content_hashes = data['content_hashes'].tolist()
+        index._row_by_application = dict(zip(application_ids, range(len(application_ids))))
+        index._rows_by_user = defaultdict(set, {user_id: set(rows) for user_id, rows in _group_rows(data['user_ids']).items()})
+        index._buckets = [defaultdict(list, _group_rows(codes[:, table])) for table in range(index.n_tables)]
+        synced_at = str(data['synced_at'])
+        index.synced_at = datetime.fromisoformat(synced_at) if synced_at else None
+        return index
+
+
+def _group_rows(keys):
+    """{key: [row numbers with that key, ascending]} for a 1-D array of keys."""
+    order = np.argsort(keys, kind='stable')
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+    return dict(zip(unique_keys.tolist(), (rows.tolist() for rows in np.split(order, starts[1:]))))
+
+
+# --- Process-wide index ---
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+_reloading = False # A background reload (see get_index(sync=False)) is running
+
+
+def get_index_path():
+    return getattr(settings, 'JD_INDEX_PATH', os.path.join(settings.BASE_DIR, 'nlp_models', 'jd_index.npz'))
+
+
+def _embed_applications(rows):
+    """rows: [(id, user_id, job_description_hash)] -> {id: vector}, encoding only JDs never embedded."""
+    vectors = get_stored_embeddings([content_hash for _, _, content_hash in rows])
+    missing_ids = [pk for pk, _, content_hash in rows if content_hash not in vectors]
+    by_id = {pk: vectors[content_hash] for pk, _, content_hash in rows if content_hash in vectors}
+    if missing_ids:
+        texts = dict(JobApplication.objects.filter(pk__in=missing_ids).values_list('id', 'job_description'))
+        missing_ids = [pk for pk in missing_ids if texts.get(pk)]
+        if missing_ids:
+            by_id.update(zip(missing_ids, get_embeddings([texts[pk] for pk in missing_ids])))
+    return by_id
+
+
+def build_index(chunk_size=1000):
+    """Builds a fresh index over every application with a job description. Returns None without a model."""
+    model = get_sentence_model()
+    if model is None:
+        return None
+    index = JobDescriptionIndex(model.get_sentence_embedding_dimension(), model_name=get_sentence_model_name())
+    index.synced_at = timezone.now()
+    rows = (JobApplication.objects.exclude(job_description='')
+            .order_by('pk').values_list('id', 'user_id', 'job_description_hash'))
+    chunk = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _add_rows(index, chunk)
+            chunk = []
+    if chunk:
+        _add_rows(index, chunk)
+    return index
+
+
+def _add_rows(index, rows):
+    vectors = _embed_applications(rows)
+    for pk, user_id, content_hash in rows:
+        if pk in vectors:
+            index.add(pk, user_id, vectors[pk], content_hash)
+
+
+def sync_index(index):
+    """
+    Applies changes made since the index was last synced: applications whose JD changed are
+    re-embedded and replaced, ones whose JD was cleared are removed. Returns the number of changes.
+    Deleted applications are dropped by the next rebuild; queries never return them (see similar_applications()).
+    """
+    since = index.synced_at
+    now = timezone.now()
+    changed = JobApplication.objects.order_by('pk').values_list('id', 'user_id', 'job_description_hash')
+    if since is not None:
+        changed = changed.filter(updated_at__gte=since)
+    to_add, removed = [], 0
+    for pk, user_id, content_hash in changed.iterator(chunk_size=1000):
+        if not content_hash:
+            if index.content_hash_for(pk) is not None:
+                index.remove(pk)
+                removed += 1
+        elif index.content_hash_for(pk) != content_hash:
+            to_add.append((pk, user_id, content_hash))
+    for start in range(0, len(to_add), 1000):
+        _add_rows(index, to_add[start:start + 1000])
+    index.synced_at = now
+    return len(to_add) + removed
+
+
+def _load_current(path):
+    """The saved index at `path` if it was built with the current model, else None."""
+    try:
+        index = JobDescriptionIndex.load(path)
+    except Exception as e:
+        print(f"Could not load job description index from {path}: {e}")
+        return None
+    return index if index.model_name == get_sentence_model_name() else None
+
+
+def _reload_in_background(path, mtime):
+    """Loads a newer saved index off the request thread; requests keep using the current one meanwhile."""
+    global _reloading
+
+    def reload():
+        global _index, _index_mtime, _reloading
+        index = _load_current(path)
+        with _index_lock:
+            if index is not None:
+                _index = index
+            _index_mtime = mtime # A file that could not be used is not retried until it changes again
+            _reloading = False
+
+    _reloading = True
+    threading.Thread(target=reload, name='jd-index-reload', daemon=True).start()
+
+
+def get_index(sync=True):
+    """
+    Returns the process-wide index, loading it from disk on first use and reloading it when another
+    process saved a newer file.
+
+    sync=True is for the scoring worker and management commands: a missing or outdated index is
+    built, recent JD changes are applied if the last sync is older than settings.JD_INDEX_SYNC_INTERVAL
+    seconds, and the result is saved. None without a model.
+    sync=False only reads (for web requests): it never loads the model, encodes or writes, and
+    returns None while no index file for the current model exists. Once an index is loaded, a newer
+    file (the worker saves one after every sync that changed something) is loaded in a background
+    thread, so requests never wait for it.
+    """
+    global _index, _index_mtime
+    if sync and get_sentence_model() is None:
+        return None
+    path = get_index_path()
+    with _index_lock:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if _index is None or (mtime is not None and mtime != _index_mtime):
+            if not sync:
+                if _index is None and mtime is not None and mtime != _index_mtime:
+                    _index = _load_current(path) # First use: nothing to serve meanwhile
+                    _index_mtime = mtime
+                elif _index is not None and not _reloading:
+                    _reload_in_background(path, mtime)
+                return _index
+            index = _load_current(path) if mtime is not None else None
+            if index is None:
+                index = build_index()
+                index.save(path)
+            _index = index
+            _index_mtime = os.path.getmtime(path)
+
+        interval = getattr(settings, 'JD_INDEX_SYNC_INTERVAL', 30)
+        if sync and (_index.synced_at is None or (timezone.now() - _index.synced_at).total_seconds() >= interval):
+            if sync_index(_index):
+                _index.save(path)
+                _index_mtime = os.path.getmtime(path)
+        return _index
+
+
+def brute_force_similar(vector, k, user, exclude_ids=()):
+    """Exact scan over one user's applications whose JD embedding is already stored (no encoding)."""
+    rows = list(JobApplication.objects.filter(user=user).exclude(job_description_hash='')
+                .exclude(pk__in=exclude_ids).order_by('pk').values_list('id', 'job_description_hash'))
+    vectors = get_stored_embeddings([content_hash for _, content_hash in rows])
+    rows = [(pk, content_hash) for pk, content_hash in rows if content_hash in vectors]
+    if not rows:
+        return []
+    similarities = np.vstack([vectors[content_hash] for _, content_hash in rows]) @ np.asarray(vector, dtype=np.float32)
+    top = np.argsort(-similarities, kind='stable')[:k]
+    return [(rows[i][0], float(similarities[i])) for i in top]
+
+
+def similar_applications(text=None, vector=None, k=10, user=None, exclude_ids=()):
+    """
+    Returns [(application_id, similarity)] for the applications whose JD is most similar to `text`
+    (or an already-computed `vector`), optionally restricted to one user.
+    Safe for web requests: the index is only read (get_index(sync=False)) and `text` is looked up in
+    the stored embeddings rather than encoded. Until the scoring worker has embedded the text (or
+    built the index, for searches across users) the result is empty.
+    """
+    if vector is None:
+        content_hash = text_hash(text)
+        vector = get_stored_embeddings([content_hash]).get(content_hash)
+        if vector is None:
+            return []
+    index = get_index(sync=False)
+    if index is None:
+        return brute_force_similar(vector, k, user, exclude_ids) if user is not None else []
+    # Over-fetch a little: entries for deleted applications are filtered out against the DB below.
+    results = index.query(vector, k=k + 10, user_id=user.pk if user else None, exclude_ids=exclude_ids)
+    existing = set(JobApplication.objects.filter(pk__in=[pk for pk, _ in results]).values_list('id', flat=True))
+    return [(pk, similarity) for pk, similarity in results if pk in existing][:k]
@@ -0,0 +1,40 @@
+"""
+Per-user version counters for cached data.
+
+Cached values include the current version in their key; bumping the version (from a signal
+receiver) invalidates every entry for that user at once without having to know their keys.
+Use a cache backend shared by all processes (see settings.CACHES) so bumps are seen everywhere.
+"""
+from django.core.cache import cache
+
+# Namespaces
+RANKING = 'ranking' # ranking.rank_applications(); bumped when one of the user's job descriptions changes
+APPLICATION_COUNT = 'application_count' # Cached list totals (pagination.py); bumped on any application save/delete
+COMPANY_COUNT = 'company_count' # Same for the company list
+COMPANY_INDEX = 'company_index' # company_index.get_company_index(); bumped on any company save/delete
+ANALYTICS = 'analytics' # analytics.get_dashboard_stats(); bumped on any application change, including score updates
+
+
+def _version_key(namespace, user_id):
+    return f'job_applications:version:{namespace}:{user_id}'
+
+
+def get_version(namespace, user_id):
+    version = cache.get(_version_key(namespace, user_id))
+    if version is None:
+        version = 1
+        cache.add(_version_key(namespace, user_id), version, None)
+    return version
+
+
+def bump_version(namespace, user_id):
+    try:
+        cache.incr(_version_key(namespace, user_id))
+    except ValueError: # Key not set yet: nothing is cached under the current version
+        cache.add(_version_key(namespace, user_id), 2, None)
+
+
+def versioned_key(namespace, user_id, *parts):
+    """Cache key for `parts` under the user's current version of `namespace`."""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'job_applications:{namespace}:{user_id}:{get_version(namespace, user_id)}:{suffix}'
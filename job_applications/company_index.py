@@ -0,0 +1,91 @@
+"""
+Per-user company index.
+
+JobApplicationForm, the application create/update views and the admin used to query the user's
+companies on every render (the company <select>) and every submit (get_or_create on the typed
+name). They read this index instead: one cached object per user mapping id -> name and
+normalised name -> id, built with a single query and cached under the user's COMPANY_INDEX
+version, which signals.py bumps on any Company save or delete (and the importer after its
+bulk_create). The application form picks companies through a type-ahead backed by
+CompanyLookupView rather than a <select> of every company.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+
+from .cache_versions import COMPANY_INDEX, versioned_key
+from .models import Company
+
+
+def normalize_company_name(name):
+    """Case- and whitespace-insensitive form of a company name ("  ACME  corp" -> "acme corp")."""
+    return ' '.join((name or '').split()).casefold()
+
+
+class CompanyIndex:
+    def __init__(self, user_id, rows):
+        self.user_id = user_id
+        self.names = {} # id -> name, in name order
+        self.ids = {} # normalised name -> id
+        for company_id, name in rows:
+            self.names[company_id] = name
+            self.ids.setdefault(normalize_company_name(name), company_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name):
+        """Id of the company called `name` (ignoring case and spacing), or None."""
+        return self.ids.get(normalize_company_name(name))
+
+    def get(self, company_id):
+        """
+        The company as a model instance, without a query: only id, user and name are loaded (the rest
+        are deferred, as with .only()). None if the user has no such company.
+        """
+        if company_id not in self.names:
+            return None
+        return Company.from_db(DEFAULT_DB_ALIAS, ['id', 'user_id', 'name'], [company_id, self.user_id, self.names[company_id]])
+
+    def search(self, query, limit=20):
+        """(id, name) pairs matching `query`: names starting with it first, then names containing it."""
+        query = normalize_company_name(query)
+        if not query:
+            return list(self.names.items())[:limit]
+        prefix, contains = [], []
+        for company_id, name in self.names.items():
+            normalized = normalize_company_name(name)
+            if normalized.startswith(query):
+                prefix.append((company_id, name))
+                if len(prefix) >= limit:
+                    break
+            elif query in normalized and len(contains) < limit:
+                contains.append((company_id, name))
+        return (prefix + contains)[:limit]
+
+
+def get_company_index(user):
+    """Returns the (cached) company index of a user."""
+    key = versioned_key(COMPANY_INDEX, user.pk, 'index')
+    index = cache.get(key)
+    if index is None:
+        index = CompanyIndex(user.pk, Company.objects.filter(user=user).order_by('name').values_list('id', 'name'))
+        cache.set(key, index, getattr(settings, 'COMPANY_INDEX_CACHE_TIMEOUT', 24 * 60 * 60))
+    return index
+
+
+def resolve_company(user, name, index=None):
+    """
+    The user's company called `name` (ignoring case and spacing), created if there isn't one yet.
+    Existing companies come from the index; only a new name costs queries.
+    """
+    index = get_company_index(user) if index is None else index
+    company = index.get(index.find(name))
+    if company is not None:
+        return company
+    name = name.strip()
+    try:
+        with transaction.atomic():
+            return Company.objects.create(user=user, name=name)
+    except IntegrityError: # Created concurrently
+        return Company.objects.get(user=user, name=name)
@@ -0,0 +1,18 @@
+"""
+Lightweight helpers for identifying document text by its content.
+Kept free of heavy imports so models.py can use them without loading the NLP stack.
+"""
+import hashlib
+import re
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def clean_text(text):
+    """The light cleaning applied before embedding: trim and collapse runs of whitespace."""
+    return _WHITESPACE_RE.sub(' ', (text or '').strip())
+
+
+def text_hash(text):
+    """SHA-256 hex digest of the cleaned text; texts differing only in whitespace share a hash."""
+    return hashlib.sha256(clean_text(text).encode('utf-8')).hexdigest()
@@ -0,0 +1,83 @@
+"""
+Persistent store of sentence embeddings for job descriptions and resume text.
+
+Each distinct text is encoded once per model and kept in DocumentEmbedding; later scores are a dot
+product of the cached, L2-normalised vectors. Rescoring one resume against 500 stored JDs therefore
+costs one encode (the resume) instead of 1000.
+"""
+import numpy as np
+
+from .documents import clean_text, text_hash
+from .models import DocumentEmbedding
+from .utils import get_sentence_model, get_sentence_model_name
+
+LOOKUP_BATCH_SIZE = 500
+ENCODE_BATCH_SIZE = 32
+
+
+def vector_to_bytes(vector):
+    return np.asarray(vector, dtype='<f4').tobytes()
+
+
+def vector_from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<f4')
+
+
+def get_stored_embeddings(content_hashes):
+    """Returns {content_hash: vector} for the hashes that already have an embedding for the current model."""
+    model_name = get_sentence_model_name()
+    vectors = {}
+    unique_hashes = list(dict.fromkeys(content_hashes))
+    for start in range(0, len(unique_hashes), LOOKUP_BATCH_SIZE):
+        batch = unique_hashes[start:start + LOOKUP_BATCH_SIZE]
+        rows = DocumentEmbedding.objects.filter(model_name=model_name, content_hash__in=batch).values_list('content_hash', 'vector')
+        for content_hash, vector in rows:
+            vectors[content_hash] = vector_from_bytes(vector)
+    return vectors
+
+
+def get_embeddings(texts):
+    """
+    Returns an (n, d) float32 array of L2-normalised embeddings for `texts`, in order.
+    Only texts without a stored embedding for the current model are encoded (in one batch).
+    Returns None if no SentenceTransformer model is available; empty texts must be filtered out by the caller.
+    """
+    model = get_sentence_model()
+    if model is None:
+        return None
+    model_name = get_sentence_model_name()
+
+    hashes = [text_hash(text) for text in texts]
+    vectors = get_stored_embeddings(hashes)
+
+    missing = {}
+    for content_hash, text in zip(hashes, texts):
+        if content_hash not in vectors and content_hash not in missing:
+            missing[content_hash] = clean_text(text)
+    if missing:
+        encoded = model.encode(
+            list(missing.values()),
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float32)
+        new_rows = []
+        for content_hash, vector in zip(missing.keys(), encoded):
+            vectors[content_hash] = vector
+            new_rows.append(DocumentEmbedding(
+                content_hash=content_hash,
+                model_name=model_name,
+                dimensions=vector.shape[0],
+                vector=vector_to_bytes(vector),
+            ))
+        DocumentEmbedding.objects.bulk_create(new_rows, batch_size=LOOKUP_BATCH_SIZE, ignore_conflicts=True)
+
+    if not hashes:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return np.vstack([vectors[content_hash] for content_hash in hashes])
+
+
+def get_embedding(text):
+    """Single-document convenience wrapper around get_embeddings()."""
+    embeddings = get_embeddings([text])
+    return None if embeddings is None else embeddings[0]
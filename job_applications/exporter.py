@@ -0,0 +1,206 @@
+"""
+Streaming CSV/XLSX export of job applications.
+
+Rows are read with .iterator(chunk_size=...) (only the exported columns, company joined in the same
+query) and written straight into a StreamingHttpResponse in ~64 KB pieces, so memory stays flat
+however many applications are exported. The XLSX file is produced the same way: a zip archive
+written to an unseekable sink (zip data descriptors, no back-patching) holding a worksheet of
+inline strings, so no shared-strings table has to be kept in memory.
+"""
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import JobApplication
+
+CHUNK_SIZE = 2000 # Rows fetched per database round trip
+FLUSH_BYTES = 64 * 1024 # Output is yielded in pieces of about this size
+
+STATUS_LABELS = dict(JobApplication.STATUS_CHOICES)
+SOURCE_LABELS = dict(JobApplication.APPLICATION_SOURCE_CHOICES)
+
+# (header, model columns needed for .only())
+COLUMNS = [
+    ('Company', ('company__name', 'company_name_manual')),
+    ('Job Title', ('job_title',)),
+    ('Job Description', ('job_description',)),
+    ('Application Link', ('application_link',)),
+    ('Source', ('application_source',)),
+    ('Applied Date', ('applied_date',)),
+    ('Status', ('status',)),
+    ('Notes', ('notes',)),
+    ('Resume Match Score', ('resume_match_score',)),
+    ('Created At', ('created_at',)),
+    ('Updated At', ('updated_at',)),
+]
+USER_COLUMN = ('User', ('user__email',))
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def get_export_queryset(queryset, include_user=False):
+    columns = COLUMNS + [USER_COLUMN] if include_user else COLUMNS
+    related = ['company', 'user'] if include_user else ['company']
+    fields = [field for _, fields in columns for field in fields]
+    return queryset.select_related(*related).only(*fields).order_by('-applied_date', '-updated_at', '-id')
+
+
+def iter_rows(queryset, include_user=False):
+    """Yields one list of cell values per application (labels resolved, no further queries)."""
+    for app in get_export_queryset(queryset, include_user).iterator(chunk_size=CHUNK_SIZE):
+        row = [
+            app.company.name if app.company_id else app.company_name_manual,
+            app.job_title,
+            app.job_description,
+            app.application_link or '',
+            SOURCE_LABELS.get(app.application_source, app.application_source or ''),
+            app.applied_date,
+            STATUS_LABELS.get(app.status, app.status),
+            app.notes,
+            round(app.resume_match_score, 2) if app.resume_match_score is not None else None,
+            timezone.localtime(app.created_at).replace(tzinfo=None) if app.created_at else None,
+            timezone.localtime(app.updated_at).replace(tzinfo=None) if app.updated_at else None,
+        ]
+        if include_user:
+            row.append(app.user.email)
+        yield row
+
+
+def get_headers(include_user=False):
+    return [header for header, _ in (COLUMNS + [USER_COLUMN] if include_user else COLUMNS)]
+
+
+# --- CSV ---
+
+def iter_csv(queryset, include_user=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff') # BOM, so Excel opens the file as UTF-8
+    writer.writerow(get_headers(include_user))
+    for row in iter_rows(queryset, include_user):
+        writer.writerow(['' if value is None else value for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+# --- XLSX ---
+
+class _StreamSink(io.RawIOBase):
+    """Write-only, unseekable file object whose contents are drained by the generator."""
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position # zipfile needs tell() (offsets), not seek()
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Applications" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+XLSX_MAX_CELL_CHARS = 32767 # Excel's limit per cell
+_XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = value.isoformat(sep=' ') if hasattr(value, 'hour') else (
+        value.isoformat() if hasattr(value, 'isoformat') else str(value))
+    text = _XML_ILLEGAL_CHARS.sub('', text)[:XLSX_MAX_CELL_CHARS]
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def iter_xlsx(queryset, include_user=False):
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(get_headers(include_user)).encode('utf-8'))
+            pending = []
+            pending_size = 0
+            for row in iter_rows(queryset, include_user):
+                xml = _xlsx_row(row)
+                pending.append(xml)
+                pending_size += len(xml)
+                if pending_size >= FLUSH_BYTES:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending, pending_size = [], 0
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(''.join(pending).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain() # Remaining compressed data and the central directory
+
+
+def export_response(queryset, file_format, filename_stem, include_user=False):
+    """StreamingHttpResponse with the applications in `queryset` as CSV or XLSX."""
+    content = iter_xlsx(queryset, include_user) if file_format == 'xlsx' else iter_csv(queryset, include_user)
+    file_format = 'xlsx' if file_format == 'xlsx' else 'csv'
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename_stem}-{timezone.localdate():%Y-%m-%d}.{file_format}"'
+    return response
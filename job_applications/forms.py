@@ -1,11 +1,19 @@
 # In application_tracker/job_applications/forms.py
+from collections import Counter
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm as DjangoUserCreationForm # For CustomUserCreationForm
+from django.contrib.auth.forms import PasswordResetForm
 from django.contrib.auth import get_user_model
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Field, HTML
+from django.core.exceptions import ValidationError
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.functional import cached_property
 
-from .models import JobApplication, Company # Import these models for their forms
+from .models import JobApplication, Company, OutgoingEmail # Import these models for their forms
+from .company_index import get_company_index
 
 User = get_user_model() # This will be your job_applications.CustomUser
 
@@ -82,6 +90,21 @@ class EmailUserCreationForm(forms.ModelForm):
         return user
 
 
+class OutboxPasswordResetForm(PasswordResetForm):
+    """PasswordResetView's form, queueing the reset email in the outbox instead of sending it in the request."""
+    def send_mail(self, subject_template_name, email_template_name, context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = ''.join(render_to_string(subject_template_name, context).splitlines()) # No newlines in headers
+        OutgoingEmail.objects.enqueue(
+            subject=subject,
+            body=render_to_string(email_template_name, context),
+            html_body=render_to_string(html_email_template_name, context) if html_email_template_name else '',
+            to=[to_email],
+            from_email=from_email,
+            kind='password_reset',
+        )
+
+
 # --- JOB APPLICATION AND COMPANY FORMS ---
 
 class CompanyForm(forms.ModelForm):
@@ -108,7 +131,78 @@ class CompanyForm(forms.ModelForm):
         )
 
 
+class CompanyTypeaheadWidget(forms.Widget):
+    """Hidden company id plus a text box that suggests the user's companies from CompanyLookupView."""
+    template_name = 'job_applications/widgets/company_typeahead.html'
+    index = None # The user's CompanyIndex, set by the form; used to show the selected company's name
+
+    class Media:
+        js = ('js/company_typeahead.js',)
+
+    def id_for_label(self, id_):
+        return f'{id_}_search' if id_ else id_
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        try:
+            company_id = int(value)
+        except (TypeError, ValueError):
+            company_id = None
+        context['widget']['company_name'] = self.index.names.get(company_id, '') if self.index is not None else ''
+        context['widget']['lookup_url'] = reverse('job_applications:company_lookup')
+        return context
+
+
+class CompanyIndexField(forms.Field):
+    """One of the user's companies, by id, checked against their cached company index instead of a queryset."""
+    widget = CompanyTypeaheadWidget
+    default_error_messages = {'invalid_choice': "Select a valid company. That company is not one of your companies."}
+    index = None # Set by the form; without one the company is looked up in the database
+    user = None # Set by the form: the database lookup only finds this user's companies
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            company_id = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        company = self.index.get(company_id) if self.index is not None else Company.objects.filter(pk=company_id, user=self.user).first()
+        if company is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+        return company
+
+    def has_changed(self, initial, data):
+        return str(getattr(initial, 'pk', initial) or '') != str(data or '')
+
+
+def get_stored_resumes(user):
+    """Resumes `user` has already submitted, as {storage name: file name it was uploaded as}."""
+    rows = (JobApplication.objects.filter(user=user)
+            .exclude(resume_submitted='').exclude(resume_submitted__isnull=True)
+            .order_by('resume_submitted')
+            .values_list('resume_submitted', 'resume_original_name')
+            .distinct())
+    stored = {}
+    for name, original_name in rows:
+        if not stored.get(name):
+            stored[name] = original_name or name.rsplit('/', 1)[-1]
+    return stored
+
+
+def stored_resume_choices(stored_resumes):
+    # Different files uploaded under the same name are told apart by the start of their content hash
+    repeated = Counter(stored_resumes.values())
+    return [
+        (name, f"{label} ({name.rsplit('/', 1)[-1][:8]})" if repeated[label] > 1 else label)
+        for name, label in stored_resumes.items()
+    ]
+
+
 class JobApplicationForm(forms.ModelForm):
+    company = CompanyIndexField(required=False, label="Company")
+    existing_resume = forms.ChoiceField(required=False, label="...or reuse a resume you already submitted")
+
     class Meta:
         model = JobApplication
         fields = [
@@ -117,7 +211,6 @@ class JobApplicationForm(forms.ModelForm):
             'applied_date', 'status', 'resume_submitted', 'notes'
         ]
         widgets = {
-            'company': forms.Select(attrs={'class': 'form-select'}), # Basic Bootstrap class
             'company_name_manual': forms.TextInput(attrs={'placeholder': 'If company not in list above'}),
             'job_title': forms.TextInput(attrs={'placeholder': 'e.g., Software Engineer Intern'}),
             'job_description': forms.Textarea(attrs={'rows': 5, 'placeholder': 'Paste job description here...'}),
@@ -132,6 +225,8 @@ class JobApplicationForm(forms.ModelForm):
         # You can do this field by field or by iterating in __init__
         help_texts = {field: '' for field in fields} # Clears all help texts
 
+    field_order = Meta.fields[:Meta.fields.index('resume_submitted') + 1] + ['existing_resume'] # Dropdown right after the upload
+
     def __init__(self, *args, **kwargs):
         current_user = kwargs.pop('user', None) # Get user passed from view
         super().__init__(*args, **kwargs)
@@ -140,8 +235,14 @@ class JobApplicationForm(forms.ModelForm):
         for field_name in self.fields:
             self.fields[field_name].help_text = ''
 
-        if current_user:
-            self.fields['company'].queryset = Company.objects.filter(user=current_user).order_by('name')
+        # The user's companies come from the cached index (see company_index.py), not a query per render
+        self.company_index = get_company_index(current_user) if current_user else None
+        self.fields['company'].index = self.fields['company'].widget.index = self.company_index
+        self.fields['company'].user = current_user
+        self._current_user = current_user
+        # A callable, so the user's resumes are only queried when the dropdown is rendered or a resume is picked
+        self.fields['existing_resume'].choices = self.get_existing_resume_choices
+        self.fields['resume_submitted'].label = "Upload a resume (PDF/DOCX)"
 
         self.fields['company'].required = False
         if 'application_source' in self.fields and self.Meta.model._meta.get_field('application_source').blank:
@@ -155,6 +256,13 @@ class JobApplicationForm(forms.ModelForm):
         # Example of a simple layout for all fields:
         # self.helper.layout = Layout(*self.fields.keys()) # Render all fields in order
 
+    @cached_property
+    def stored_resumes(self):
+        return get_stored_resumes(self._current_user) if self._current_user else {}
+
+    def get_existing_resume_choices(self):
+        return [('', '---------')] + stored_resume_choices(self.stored_resumes)
+
     def clean(self):
         cleaned_data = super().clean()
         company = cleaned_data.get('company')
@@ -164,4 +272,67 @@ class JobApplicationForm(forms.ModelForm):
             self.add_error(None, "Please select an existing company or enter a new company name.")
         if company and company_name_manual:
             self.add_error('company_name_manual', "Please do not enter a manual company name if you have selected a company from the list.")
-        return cleaned_data
\ No newline at end of file
+
+        existing_resume = cleaned_data.get('existing_resume')
+        if existing_resume:
+            if self.files.get(self.add_prefix('resume_submitted')):
+                self.add_error('existing_resume', "Please either upload a resume or pick one you already submitted, not both.")
+            else:
+                # Point the application at the stored file; no upload, no new copy.
+                cleaned_data['resume_submitted'] = existing_resume
+                self.instance.resume_original_name = self.stored_resumes[existing_resume]
+        return cleaned_data
+
+class ResumeRankForm(forms.Form):
+    RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+    resume_file = forms.FileField(required=False, label="Upload a resume (PDF/DOCX)")
+    stored_resume = forms.ChoiceField(required=False, label="...or pick a resume you already submitted")
+    top_k = forms.IntegerField(required=False, min_value=1, max_value=1000, initial=20, label="Show top")
+
+    def __init__(self, *args, **kwargs):
+        current_user = kwargs.pop('user', None) # Get user passed from view
+        super().__init__(*args, **kwargs)
+        self.fields['stored_resume'].choices = [('', '---------')] + (
+            stored_resume_choices(get_stored_resumes(current_user)) if current_user else []
+        )
+
+        self.helper = FormHelper(self)
+        self.helper.form_method = 'post'
+        self.helper.form_tag = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        resume_file = cleaned_data.get('resume_file')
+        stored_resume = cleaned_data.get('stored_resume')
+
+        if not resume_file and not stored_resume:
+            self.add_error(None, "Please upload a resume or pick one you already submitted.")
+        if resume_file and stored_resume:
+            self.add_error('stored_resume', "Please either upload a resume or pick a stored one, not both.")
+        if resume_file and not resume_file.name.lower().endswith(self.RESUME_EXTENSIONS):
+            self.add_error('resume_file', "Only .pdf and .docx resumes are supported.")
+        return cleaned_data
+
+class ApplicationImportForm(forms.Form):
+    IMPORT_FORMATS = [('', 'Detect from file extension'), ('csv', 'CSV'), ('json', 'JSON (array of objects)'), ('jsonl', 'JSON Lines')]
+
+    file = forms.FileField(label="Applications file (.csv, .json, .jsonl)")
+    file_format = forms.ChoiceField(choices=IMPORT_FORMATS, required=False, label="Format")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper(self)
+        self.helper.form_method = 'post'
+        self.helper.form_tag = False
+
+    def clean(self):
+        from .importer import detect_format # importer imports this module
+        cleaned_data = super().clean()
+        uploaded = cleaned_data.get('file')
+        if uploaded and not cleaned_data.get('file_format'):
+            detected = detect_format(uploaded.name)
+            if not detected:
+                self.add_error('file_format', "Could not tell the format from the file name; please pick one.")
+            cleaned_data['file_format'] = detected
+        return cleaned_data
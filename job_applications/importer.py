@@ -0,0 +1,336 @@
+"""
+Bulk import of job applications from CSV, JSON (an array of objects) or JSON Lines.
+
+Rows are parsed one at a time from the stream and validated with ApplicationImportRowForm
+(JobApplicationForm's rules), so memory stays constant however large the file is. Valid rows are
+written in batches: the batch's companies are resolved through the user's cached company index
+(by normalised name, as the web form does) plus one bulk_create for the new ones, and the applications are inserted with one bulk_create. bulk_create skips save()
+and the post_save signals, so the work they would do is done here per batch instead: JD hashes,
+status history, search index entries and cache invalidation. Scoring is deferred: rows with a
+job description and a resume are queued for the scoring worker (or left for a
+`rescore_applications --unscored` pass).
+"""
+import csv
+import io
+import json
+import os
+from collections import Counter
+
+from django import forms
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import search
+from .cache_versions import ANALYTICS, APPLICATION_COUNT, COMPANY_COUNT, COMPANY_INDEX, RANKING, bump_version
+from .company_index import get_company_index, normalize_company_name
+from .documents import text_hash
+from .forms import JobApplicationForm
+from .models import (STAGE_OF_STATUS, Company, FunnelRollup, JobApplication, ResumeBlob, ScoringJob, StatusRollup,
+                     StatusTransition)
+
+FORMATS = ('csv', 'json', 'jsonl')
+MAX_REPORTED_ERRORS = 100
+
+# Spreadsheet column names accepted for each field (after lower-casing and spaces -> underscores)
+COLUMN_ALIASES = {
+    'company': 'company_name_manual',
+    'company_name': 'company_name_manual',
+    'title': 'job_title',
+    'position': 'job_title',
+    'description': 'job_description',
+    'link': 'application_link',
+    'url': 'application_link',
+    'source': 'application_source',
+    'date': 'applied_date',
+    'applied': 'applied_date',
+    'resume': 'resume_submitted',
+}
+
+
+class ApplicationImportRowForm(JobApplicationForm):
+    """JobApplicationForm's validation for one imported row. The company always comes by name."""
+    company = None # Resolved by name per batch (resolve_companies)
+    existing_resume = None # Rows reference a stored resume through their resume_submitted column
+    class Meta(JobApplicationForm.Meta):
+        fields = [
+            'company_name_manual', 'job_title', 'job_description', 'application_link',
+            'application_source', 'applied_date', 'status', 'notes',
+        ]
+
+    def __init__(self, *args, **kwargs):
+        # Skip JobApplicationForm.__init__: the crispy helper and company queryset it builds are only
+        # needed for rendering, and would be rebuilt for every row.
+        forms.ModelForm.__init__(self, *args, **kwargs)
+        self.fields['company_name_manual'].required = True
+        self.fields['application_source'].required = False
+
+    def clean(self):
+        return forms.ModelForm.clean(self) # No company dropdown to cross-check
+
+    def validate(self, data):
+        """
+        Re-binds this form to another row and validates it. Constructing a form deep-copies all of
+        its fields, which dominated import time; one form is reused for every row instead.
+        """
+        self.data = data
+        self.is_bound = True
+        self._errors = None
+        self._bound_fields_cache = {}
+        self.instance = JobApplication()
+        return self.is_valid()
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = [] # First MAX_REPORTED_ERRORS (row number, message) pairs
+        self.companies_created = 0
+        self.scoring_queued = 0
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename or '')[1].lower()
+    return {'.csv': 'csv', '.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(extension)
+
+
+# --- Streaming readers: each yields one dict per row ---
+
+def iter_csv_rows(binary_file):
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    yield from csv.DictReader(text)
+
+
+def iter_jsonl_rows(binary_file):
+    for line in io.TextIOWrapper(binary_file, encoding='utf-8-sig'):
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_json_array_rows(binary_file, chunk_size=64 * 1024):
+    """Yields the objects of a top-level JSON array without loading the whole document."""
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig')
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started:
+            if not buffer and not eof:
+                chunk = text.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if not buffer.startswith('['):
+                raise ValueError("A JSON import must be an array of objects.")
+            buffer = buffer[1:]
+            started = True
+            continue
+        if buffer.startswith(','):
+            buffer = buffer[1:]
+            continue
+        if buffer.startswith(']'):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("The JSON import ended in the middle of an object.")
+            chunk = text.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield obj
+        buffer = buffer[end:]
+
+
+READERS = {'csv': iter_csv_rows, 'json': iter_json_array_rows, 'jsonl': iter_jsonl_rows}
+
+
+# --- Row normalisation ---
+
+def _choice_lookup(choices):
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    return lookup
+
+STATUS_LOOKUP = _choice_lookup(JobApplication.STATUS_CHOICES)
+SOURCE_LOOKUP = _choice_lookup(JobApplication.APPLICATION_SOURCE_CHOICES)
+
+
+def normalize_row(row):
+    """Maps spreadsheet-style columns and choice labels onto JobApplicationForm's field names and codes."""
+    if not isinstance(row, dict):
+        raise ValueError("Each row must be an object.")
+    data = {}
+    for key, value in row.items():
+        if key is None: # Extra CSV cells without a header
+            continue
+        name = str(key).strip().lower().replace(' ', '_')
+        name = COLUMN_ALIASES.get(name, name)
+        data[name] = '' if value is None else str(value).strip()
+    if data.get('status'):
+        data['status'] = STATUS_LOOKUP.get(data['status'].lower(), data['status'])
+    else:
+        data['status'] = 'APPLIED'
+    if data.get('application_source'):
+        data['application_source'] = SOURCE_LOOKUP.get(data['application_source'].lower(), data['application_source'])
+    if not data.get('applied_date'):
+        data['applied_date'] = timezone.localdate().isoformat()
+    return data
+
+
+# --- Import ---
+
+class ApplicationImporter:
+    def __init__(self, user, batch_size=1000, enqueue_scoring=True):
+        self.user = user
+        self.batch_size = batch_size
+        self.enqueue_scoring = enqueue_scoring
+        self.result = ImportResult()
+        self._companies = {} # normalised name -> Company, for every company resolved so far
+        self._resume_names = None
+        self._form = ApplicationImportRowForm()
+
+    def get_resume_names(self):
+        """Stored resumes of this user (name -> original file name); an imported row may reference one by name."""
+        if self._resume_names is None:
+            self._resume_names = dict(
+                JobApplication.objects.filter(user=self.user).exclude(resume_submitted='')
+                .exclude(resume_submitted__isnull=True).order_by().values_list('resume_submitted', 'resume_original_name')
+                .distinct()
+            )
+        return self._resume_names
+
+    def run(self, rows):
+        batch = []
+        row_number = 0
+        try:
+            for row_number, row in enumerate(rows, start=1):
+                self.result.rows += 1
+                application = self.validate_row(row_number, row)
+                if application is not None:
+                    batch.append(application)
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    batch = []
+        except (ValueError, csv.Error, UnicodeDecodeError) as e: # Malformed file: keep what was imported so far
+            self.result.add_error(row_number + 1, f"Could not read the file: {e}")
+        if batch:
+            self.write_batch(batch)
+        if self.result.created:
+            for namespace in (RANKING, APPLICATION_COUNT, ANALYTICS):
+                bump_version(namespace, self.user.pk)
+        if self.result.companies_created: # bulk_create sends no post_save
+            bump_version(COMPANY_COUNT, self.user.pk)
+            bump_version(COMPANY_INDEX, self.user.pk)
+        return self.result
+
+    def validate_row(self, row_number, row):
+        try:
+            data = normalize_row(row)
+        except ValueError as e:
+            self.result.add_error(row_number, str(e))
+            return None
+        form = self._form
+        if not form.validate(data):
+            messages = [f"{field}: {' '.join(errors)}" if field != '__all__' else ' '.join(errors)
+                        for field, errors in form.errors.items()]
+            self.result.add_error(row_number, '; '.join(messages))
+            return None
+        resume = data.get('resume_submitted')
+        if resume and resume not in self.get_resume_names():
+            self.result.add_error(row_number, f"resume_submitted: '{resume}' is not one of your stored resumes.")
+            return None
+
+        application = form.instance
+        application.user = self.user
+        application.company_name_manual = application.company_name_manual.strip()
+        application.resume_submitted = resume or None
+        application.resume_original_name = self.get_resume_names().get(resume, '') if resume else ''
+        application.job_description_hash = text_hash(application.job_description) if application.job_description else ''
+        application.status_changed_at = timezone.now()
+        application.funnel_stage = STAGE_OF_STATUS.get(application.status, 0)
+        return application
+
+    def resolve_companies(self, names):
+        """
+        Fills self._companies for `names`, matched like the web form does (ignoring case and spacing):
+        existing companies come from the cached company index, new ones are made with one bulk_create.
+        """
+        missing = {}
+        index = None
+        for name in names:
+            key = normalize_company_name(name)
+            if key in self._companies or key in missing:
+                continue
+            index = get_company_index(self.user) if index is None else index
+            company = index.get(index.find(key))
+            if company is not None:
+                self._companies[key] = company
+            else:
+                missing[key] = name # Created as first spelled
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                created = Company.objects.bulk_create([Company(user=self.user, name=name) for name in missing.values()])
+        except IntegrityError: # Created concurrently (e.g. by the web form): fall back per company
+            created = []
+            index = get_company_index(self.user) # The concurrent save invalidated the cached one
+            for key, name in missing.items():
+                company = index.get(index.find(key))
+                if company is None:
+                    company, was_created = Company.objects.get_or_create(user=self.user, name=name)
+                    self.result.companies_created += was_created
+                self._companies[key] = company
+        for company in created:
+            self._companies[normalize_company_name(company.name)] = company
+            self.result.companies_created += 1
+
+    def write_batch(self, batch):
+        with transaction.atomic():
+            self.resolve_companies([application.company_name_manual for application in batch])
+            for application in batch:
+                application.company = self._companies[normalize_company_name(application.company_name_manual)]
+            created = JobApplication.objects.bulk_create(batch)
+
+            # What save() and the post_save receivers do for single applications:
+            StatusTransition.objects.bulk_create([
+                StatusTransition(application=application, user=self.user, from_status='',
+                                 to_status=application.status, changed_at=application.status_changed_at)
+                for application in created
+            ])
+            for status, count in Counter(application.status for application in created).items():
+                StatusRollup.objects.add(self.user.pk, '', status, count=count)
+            for stage, count in Counter(application.funnel_stage for application in created).items():
+                FunnelRollup.objects.add(self.user.pk, range(stage + 1), count=count)
+            search.index_applications(created)
+            for resume, count in Counter(application.resume_submitted.name for application in created
+                                         if application.resume_submitted).items():
+                ResumeBlob.objects.acquire(resume, count=count)
+            to_score = [application.pk for application in created
+                        if application.job_description and application.resume_submitted]
+            if to_score and self.enqueue_scoring:
+                ScoringJob.objects.bulk_create(
+                    [ScoringJob(application_id=pk, status=ScoringJob.STATUS_PENDING) for pk in to_score],
+                    ignore_conflicts=True,
+                )
+                self.result.scoring_queued += len(to_score)
+        self.result.created += len(created)
+
+
+def import_applications(user, binary_file, file_format, batch_size=1000, enqueue_scoring=True):
+    """Imports applications for `user` from an open binary file. Returns an ImportResult."""
+    if file_format not in READERS:
+        raise ValueError(f"Unsupported import format '{file_format}' (expected one of {', '.join(FORMATS)}).")
+    importer = ApplicationImporter(user, batch_size=batch_size, enqueue_scoring=enqueue_scoring)
+    return importer.run(READERS[file_format](binary_file))
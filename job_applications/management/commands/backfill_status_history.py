@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.cache_versions import ANALYTICS, bump_version
+from job_applications.models import StatusRollup
+from job_applications.status_history import backfill_history, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds the status history from current rows: every application without any StatusTransition "
+        "gets one for its current status (at its creation time), and the affected users' rollups are rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--rebuild-rollups', action='store_true',
+                            help="Also recompute every user's rollup from the full transition log.")
+
+    def handle(self, *args, **options):
+        created, users = backfill_history(chunk_size=options['chunk_size'])
+        self.stdout.write(f"Created {created} transition(s) for {users} user(s).")
+        if options['rebuild_rollups']:
+            rows = rebuild_rollups()
+            self.stdout.write(f"Rebuilt {rows} rollup row(s).")
+        # Rollups changed without any application being saved: drop cached dashboards.
+        for user_id in StatusRollup.objects.values_list('user_id', flat=True).distinct():
+            bump_version(ANALYTICS, user_id)
+        self.stdout.write(self.style.SUCCESS("Status history backfill finished."))
@@ -0,0 +1,155 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from job_applications.models import Company, CustomUser, JobApplication
+from job_applications.pagination import seek_filter
+
+
+class RollbackBenchmark(Exception):
+    """Raised at the end of the benchmark to roll back the generated data."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the list-view and admin filter queries on synthetic data: prints the query plan "
+        "and latency of each query without the composite indexes (before) and with them (after). "
+        "All generated data and index changes are rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--applications', type=int, default=1_000_000)
+        parser.add_argument('--companies-per-user', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per query; the median is reported.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self.generate(options)
+                queries = self.get_queries()
+                indexes = self.get_benchmarked_indexes()
+
+                self.execute_ddl(f'DROP INDEX {connection.ops.quote_name(index.name)}' for model, index, editor in indexes)
+                self.analyze()
+                before = self.run_queries(queries, options['repeat'], "BEFORE (without composite indexes)")
+
+                self.execute_ddl(index.create_sql(model, editor) for model, index, editor in indexes)
+                self.analyze()
+                after = self.run_queries(queries, options['repeat'], "AFTER (with composite indexes)")
+
+                self.stdout.write("\nSummary (median ms, before -> after):")
+                for name in queries:
+                    speedup = before[name] / after[name] if after[name] else float('inf')
+                    self.stdout.write(f"  {name:<40} {before[name]:>9.3f} -> {after[name]:>9.3f}  ({speedup:.1f}x)")
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            self.stdout.write(self.style.SUCCESS("Benchmark finished; generated data rolled back."))
+
+    def get_benchmarked_indexes(self):
+        # The editor is only used to render DDL, not entered: SQLite refuses to enter a schema editor
+        # inside atomic(), and the whole benchmark must stay in one transaction to be rolled back.
+        editor = connection.schema_editor()
+        return [(JobApplication, index, editor) for index in JobApplication._meta.indexes] + \
+               [(Company, index, editor) for index in Company._meta.indexes]
+
+    def execute_ddl(self, statements):
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(str(statement))
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def generate(self, options):
+        users, batch_size = options['users'], options['batch_size']
+        started = time.perf_counter()
+        self.stdout.write(f"Generating {users} users, {options['applications']} applications...")
+
+        CustomUser.objects.bulk_create(
+            [CustomUser(email=f'bench-{i}@example.com', password='!') for i in range(users)],
+            batch_size=batch_size,
+        )
+        self.user_ids = list(CustomUser.objects.filter(email__startswith='bench-').values_list('id', flat=True))
+
+        companies = (Company(user_id=user_id, name=f'Company {j}')
+                     for user_id in self.user_ids for j in range(options['companies_per_user']))
+        self.bulk_insert(Company, companies, batch_size)
+        company_ids = {}
+        for company_id, user_id in Company.objects.filter(user_id__in=self.user_ids).values_list('id', 'user_id').iterator():
+            company_ids.setdefault(user_id, []).append(company_id)
+
+        statuses = [code for code, _ in JobApplication.STATUS_CHOICES]
+        sources = [code for code, _ in JobApplication.APPLICATION_SOURCE_CHOICES]
+        start_date = date.today() - timedelta(days=3 * 365)
+
+        def applications():
+            for _ in range(options['applications']):
+                user_id = self.rng.choice(self.user_ids)
+                yield JobApplication(
+                    user_id=user_id,
+                    company_id=self.rng.choice(company_ids[user_id]),
+                    job_title='Software Engineer',
+                    applied_date=start_date + timedelta(days=self.rng.randrange(3 * 365)),
+                    status=self.rng.choice(statuses),
+                    application_source=self.rng.choice(sources),
+                )
+        self.bulk_insert(JobApplication, applications(), batch_size)
+        self.stdout.write(f"Generated in {time.perf_counter() - started:.1f}s.")
+
+    def bulk_insert(self, model, objects, batch_size):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+
+    def get_queries(self):
+        user_id = self.rng.choice(self.user_ids)
+        user_apps = JobApplication.objects.filter(user_id=user_id).select_related('company').order_by('-applied_date', '-updated_at')
+        admin_apps = JobApplication.objects.select_related('company', 'user').order_by('-applied_date', '-updated_at')
+        # Keyset pagination (the list view): seek past the last row of page 9 instead of OFFSET 90.
+        keyset_ordering = ('-applied_date', '-updated_at', '-id')
+        cursor = user_apps.order_by(*keyset_ordering).values_list('applied_date', 'updated_at', 'id')[89:90].first()
+        keyset_apps = user_apps.order_by(*keyset_ordering)
+        if cursor:
+            keyset_apps = keyset_apps.filter(seek_filter(keyset_ordering, cursor))
+        # name -> (queryset, whether the query is a COUNT)
+        return {
+            'list view: page 1': (user_apps[:10], False),
+            'list view: last page': (user_apps[90:100], False),
+            'list view: paginator count': (user_apps.order_by(), True),
+            'list view: keyset page 10': (keyset_apps[:11], False),
+            'user + status filter': (user_apps.filter(status='INTERVIEW_R1'), False),
+            'admin: status filter': (admin_apps.filter(status='OFFER_RECEIVED')[:100], False),
+            'admin: source filter': (admin_apps.filter(application_source='REFERRAL')[:100], False),
+            'admin: applied_date filter': (admin_apps.filter(applied_date__gte=date.today() - timedelta(days=7))[:100], False),
+            'admin: company name filter': (admin_apps.filter(company__name='Company 7')[:100], False),
+            'admin: unfiltered changelist': (admin_apps[:100], False),
+        }
+
+    def run_queries(self, queries, repeat, title):
+        self.stdout.write(f"\n=== {title} ===")
+        results = {}
+        for name, (query, is_count) in queries.items():
+            run = (lambda q=query: q.count()) if is_count else (lambda q=query: list(q.all()))
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+            self.stdout.write(f"\n-- {name}: median {results[name]:.3f} ms")
+            self.stdout.write(query.explain())
+        return results
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.ann_index import build_index, get_index_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the approximate nearest-neighbour index over job description embeddings from scratch "
+        "(also drops entries of deleted applications). Day-to-day changes are applied incrementally."
+    )
+
+    def handle(self, *args, **options):
+        index = build_index()
+        if index is None:
+            self.stdout.write(self.style.WARNING("SentenceTransformer model not available; the index needs embeddings."))
+            return
+        index.save(get_index_path())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(index)} job description(s) into {get_index_path()}."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.tfidf_model import fit_tfidf_model, get_model_path, is_model_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "Fits the corpus-level TF-IDF model over all stored job descriptions and resume texts. "
+        "Run it with --if-stale from cron to refit on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-stale', action='store_true',
+                            help="Only refit if the model is missing, too old, or the corpus grew past the refit threshold.")
+
+    def handle(self, *args, **options):
+        if options['if_stale'] and not is_model_stale():
+            self.stdout.write("TF-IDF model is up to date.")
+            return
+        model = fit_tfidf_model()
+        if model is None:
+            self.stdout.write(self.style.WARNING("Nothing to fit: no job descriptions or resume texts stored yet."))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Fitted TF-IDF model on {model['document_count']} documents; saved to {get_model_path()}."
+        ))
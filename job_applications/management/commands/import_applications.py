@@ -0,0 +1,53 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from job_applications.importer import FORMATS, detect_format, import_applications
+from job_applications.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports job applications for one user from a CSV, JSON (array) or JSON Lines file. "
+        "The file is streamed row by row and written in batches with bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import.")
+        parser.add_argument('--user', required=True, help="Email of the user the applications belong to.")
+        parser.add_argument('--format', choices=FORMATS, help="File format (default: from the file extension).")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows validated and inserted per batch.")
+        parser.add_argument('--rescore', action='store_true',
+                            help="Score the imported applications with one batch rescoring pass afterwards "
+                                 "instead of queueing them for the scoring worker.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email__iexact=options['user'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}.")
+        file_format = options['format'] or detect_format(options['path'])
+        if not file_format:
+            raise CommandError("Could not tell the file format from its extension; pass --format.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started = time.perf_counter()
+        with open(options['path'], 'rb') as f:
+            result = import_applications(user, f, file_format, batch_size=options['batch_size'],
+                                         enqueue_scoring=not options['rescore'])
+        elapsed = time.perf_counter() - started
+        rate = result.rows / elapsed if elapsed > 0 else 0.0
+
+        for row_number, message in result.errors:
+            self.stderr.write(f"Row {row_number}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more error(s).")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} of {result.rows} row(s) in {elapsed:.2f}s ({rate:.0f} rows/sec); "
+            f"{result.companies_created} new compan{'y' if result.companies_created == 1 else 'ies'}, "
+            f"{result.error_count} error(s), {result.scoring_queued} queued for scoring."
+        ))
+        if options['rescore'] and result.created:
+            call_command('rescore_applications', user=user.email, unscored=True, stdout=self.stdout)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the SQLite FTS5 application search index from the applications table "
+        "(e.g. after bulk updates that bypass signals). PostgreSQL's index needs no rebuild."
+    )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend != 'sqlite':
+            self.stdout.write(f"Search backend is '{backend}'; nothing to rebuild.")
+            return
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} applications."))
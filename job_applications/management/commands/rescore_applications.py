@@ -0,0 +1,89 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_applications.cache_versions import ANALYTICS, bump_version
+from job_applications.models import JobApplication
+from job_applications.scoring import score_text_pairs
+from job_applications.text_cache import get_resume_text
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes resume_match_score for many applications at once: streams them in chunks, "
+        "batch-encodes the texts, scores each chunk with one similarity matmul and saves with bulk_update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rescore applications of the user with this email.")
+        parser.add_argument('--since', type=date.fromisoformat, help="Only applications applied on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--until', type=date.fromisoformat, help="Only applications applied on or before this date (YYYY-MM-DD).")
+        parser.add_argument('--status', action='append', choices=[code for code, label in JobApplication.STATUS_CHOICES],
+                            help="Only applications with this status (may be repeated).")
+        parser.add_argument('--unscored', action='store_true', help="Only applications without a score yet (e.g. just imported).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Applications loaded, scored and written per batch.")
+        parser.add_argument('--dry-run', action='store_true', help="Compute scores but don't write them.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        applications = (JobApplication.objects
+                        .exclude(job_description='')
+                        .exclude(resume_submitted='')
+                        .exclude(resume_submitted__isnull=True))
+        if options['user']:
+            applications = applications.filter(user__email__iexact=options['user'])
+        if options['since']:
+            applications = applications.filter(applied_date__gte=options['since'])
+        if options['until']:
+            applications = applications.filter(applied_date__lte=options['until'])
+        if options['status']:
+            applications = applications.filter(status__in=options['status'])
+        if options['unscored']:
+            applications = applications.filter(resume_match_score__isnull=True)
+        applications = applications.only('id', 'user_id', 'job_description', 'resume_submitted', 'resume_match_score').order_by('pk')
+
+        started = time.perf_counter()
+        total = changed = 0
+        chunk = []
+        for application in applications.iterator(chunk_size=options['chunk_size']):
+            chunk.append(application)
+            if len(chunk) >= options['chunk_size']:
+                changed += self.rescore_chunk(chunk, options['dry_run'])
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            changed += self.rescore_chunk(chunk, options['dry_run'])
+            total += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0.0
+        verb = "Would update" if options['dry_run'] else "Updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {total} application(s) in {elapsed:.2f}s ({rate:.1f} docs/sec). {verb} {changed} score(s)."
+        ))
+
+    def rescore_chunk(self, chunk, dry_run):
+        resume_texts_by_name = {}
+        for application in chunk:
+            name = application.resume_submitted.name
+            if name not in resume_texts_by_name:
+                resume_texts_by_name[name] = get_resume_text(application.resume_submitted.path)
+
+        scores = score_text_pairs(
+            [application.job_description for application in chunk],
+            [resume_texts_by_name[application.resume_submitted.name] for application in chunk],
+        )
+
+        changed = []
+        for application, score in zip(chunk, scores):
+            if application.resume_match_score is None or abs(application.resume_match_score - score) > 1e-6:
+                application.resume_match_score = score
+                changed.append(application)
+        if changed and not dry_run:
+            JobApplication.objects.bulk_update(changed, ['resume_match_score'])
+            for user_id in {application.user_id for application in changed}:
+                bump_version(ANALYTICS, user_id)
+        return len(changed)
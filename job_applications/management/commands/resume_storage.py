@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.storage import cleanup_unreferenced, migrate_legacy_resumes, recount_references
+
+
+class Command(BaseCommand):
+    help = "Maintains the content-addressed resume storage: removes unreferenced files, fixes reference counts, moves old uploads."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--cleanup', action='store_true',
+                           help="Delete resume files no application has referenced for the grace period.")
+        group.add_argument('--recount', action='store_true',
+                           help="Rebuild the reference counts from the applications.")
+        group.add_argument('--migrate-legacy', action='store_true',
+                           help="Move resumes uploaded before content-addressed storage to their content hash names.")
+        parser.add_argument('--grace-hours', type=float, default=None,
+                            help="Override settings.RESUME_CLEANUP_GRACE_HOURS for --cleanup.")
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted = cleanup_unreferenced(grace_hours=options['grace_hours'])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced resume file(s)."))
+        elif options['recount']:
+            corrected = recount_references()
+            self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} resume reference count(s)."))
+        else:
+            moved = migrate_legacy_resumes()
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} resume file(s) to content-addressed storage."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.models import ExtractedText, JobApplication
+from job_applications.text_cache import get_resume_text, prune
+
+
+class Command(BaseCommand):
+    help = "Prunes, clears or rebuilds the content-addressed cache of extracted resume text."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--prune', action='store_true',
+                           help="Evict stale and least-recently-used entries until the cache is within its size bounds.")
+        group.add_argument('--rebuild', action='store_true',
+                           help="Re-extract the text of every resume attached to an application.")
+        group.add_argument('--clear', action='store_true', help="Delete every cache entry.")
+        parser.add_argument('--max-entries', type=int, default=None,
+                            help="Override settings.RESUME_TEXT_CACHE_MAX_ENTRIES for --prune.")
+        parser.add_argument('--max-chars', type=int, default=None,
+                            help="Override settings.RESUME_TEXT_CACHE_MAX_CHARS for --prune.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = ExtractedText.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} cached resume text(s)."))
+            return
+
+        if options['prune']:
+            deleted = prune(max_entries=options['max_entries'], max_chars=options['max_chars'])
+            self.stdout.write(self.style.SUCCESS(f"Evicted {deleted} cached resume text(s)."))
+            return
+
+        resume_names = (JobApplication.objects
+                        .exclude(resume_submitted='')
+                        .exclude(resume_submitted__isnull=True)
+                        .order_by()
+                        .values_list('resume_submitted', flat=True)
+                        .distinct())
+        storage = JobApplication._meta.get_field('resume_submitted').storage
+        extracted = failed = 0
+        for name in resume_names.iterator():
+            text = get_resume_text(storage.path(name), refresh=True)
+            if text:
+                extracted += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Could not extract text from {name}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {extracted} resume text(s); {failed} file(s) failed."))
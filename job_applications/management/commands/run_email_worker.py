@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.outbox import process_outbox, run_worker
+
+
+class Command(BaseCommand):
+    help = "Runs the worker that sends queued outgoing email (activation, password reset, ...) from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Send the messages that are currently due and exit instead of polling forever.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help="Seconds to sleep when the outbox is empty (defaults to settings.EMAIL_WORKER_POLL_INTERVAL).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Messages claimed per batch (defaults to settings.EMAIL_OUTBOX_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            sent = process_outbox(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} email(s)."))
+            return
+
+        self.stdout.write("Email worker started. Press Ctrl+C to stop.")
+        try:
+            run_worker(poll_interval=options['poll_interval'], batch_size=options['batch_size'])
+        except KeyboardInterrupt:
+            self.stdout.write("Email worker stopped.")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.scoring_queue import process_pending_jobs, run_worker
+from job_applications.utils import warm_up_scoring_model
+
+
+class Command(BaseCommand):
+    help = "Runs the local worker that processes queued resume match scoring jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Process the jobs that are currently due and exit instead of polling forever.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help="Seconds to sleep when the queue is empty (defaults to settings.SCORING_WORKER_POLL_INTERVAL).",
+        )
+        parser.add_argument(
+            '--no-warm-up', action='store_true',
+            help="Don't load the embedding model up front; it is then loaded by the first job.",
+        )
+
+    def handle(self, *args, **options):
+        if not options['no_warm_up']:
+            if warm_up_scoring_model():
+                self.stdout.write("SentenceTransformer model warmed up.")
+            else:
+                self.stdout.write("SentenceTransformer model not available; scoring will use TF-IDF.")
+
+        if options['once']:
+            processed = process_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} scoring job(s)."))
+            return
+
+        self.stdout.write("Scoring worker started. Press Ctrl+C to stop.")
+        try:
+            run_worker(poll_interval=options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Scoring worker stopped.")
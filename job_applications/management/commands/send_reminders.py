@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from job_applications.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Emails each user one digest of their applications that have been in the same status for longer "
+        "than settings.REMINDER_RULES allows, and records the reminder on them. Meant to run daily (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Due applications read per query.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Digests sent before the batch's applications are stamped.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be sent.")
+
+    def handle(self, *args, **options):
+        result = send_reminders(chunk_size=options['chunk_size'], batch_size=options['batch_size'],
+                                dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{result.users} user(s) would be reminded about {result.applications} application(s).")
+            return
+        self.stdout.write(f"Sent {result.sent} reminder digest(s) covering {result.stamped} application(s).")
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f"{result.failed} digest(s) could not be sent; they are retried next run."))
+        self.stdout.write(self.style.SUCCESS("Reminders finished."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoringJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times a worker has picked up this job.')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='The job is not picked up before this time (used for retry backoff).')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('application', models.ForeignKey(help_text='The application whose resume match score should be (re)calculated.', on_delete=django.db.models.deletion.CASCADE, related_name='scoring_jobs', to='job_applications.jobapplication')),
+            ],
+            options={
+                'verbose_name': 'Scoring Job',
+                'verbose_name_plural': 'Scoring Jobs',
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='scoringjob_status_run_after')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('application',), name='unique_pending_scoring_job')],
+            },
+        ),
+    ]
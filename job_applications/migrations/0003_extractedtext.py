@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0002_scoringjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 hex digest of the source file content.', max_length=64, unique=True)),
+                ('extractor_version', models.PositiveSmallIntegerField(help_text='utils.TEXT_EXTRACTOR_VERSION used to produce the text.')),
+                ('text', models.TextField()),
+                ('text_length', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Extracted Resume Text',
+                'verbose_name_plural': 'Extracted Resume Texts',
+            },
+        ),
+    ]
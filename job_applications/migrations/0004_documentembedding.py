@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0003_extractedtext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 hex digest of the cleaned document text.', max_length=64)),
+                ('model_name', models.CharField(help_text='Name/path of the embedding model.', max_length=255)),
+                ('dimensions', models.PositiveSmallIntegerField()),
+                ('vector', models.BinaryField(help_text='L2-normalised float32 vector (little-endian bytes).')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Document Embedding',
+                'verbose_name_plural': 'Document Embeddings',
+                'unique_together': {('content_hash', 'model_name')},
+            },
+        ),
+    ]
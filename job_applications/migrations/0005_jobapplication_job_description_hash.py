@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:36
+
+from django.db import migrations, models
+
+from job_applications.documents import text_hash
+
+
+def backfill_job_description_hashes(apps, schema_editor):
+    JobApplication = apps.get_model('job_applications', 'JobApplication')
+    batch = []
+    for application in JobApplication.objects.exclude(job_description='').only('id', 'job_description').iterator(chunk_size=1000):
+        application.job_description_hash = text_hash(application.job_description)
+        batch.append(application)
+        if len(batch) >= 1000:
+            JobApplication.objects.bulk_update(batch, ['job_description_hash'])
+            batch = []
+    if batch:
+        JobApplication.objects.bulk_update(batch, ['job_description_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0004_documentembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='job_description_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Internal field: Content hash of the job description (used to look up cached embeddings).', max_length=64),
+        ),
+        migrations.RunPython(backfill_job_description_hashes, migrations.RunPython.noop),
+    ]
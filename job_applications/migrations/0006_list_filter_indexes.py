@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0005_jobapplication_job_description_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['name'], name='company_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', '-applied_date', '-updated_at'], name='jobapp_user_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'status', '-applied_date', '-updated_at'], name='jobapp_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['status', '-applied_date', '-updated_at'], name='jobapp_status_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['application_source', '-applied_date', '-updated_at'], name='jobapp_source_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['-applied_date', '-updated_at'], name='jobapp_applied_idx'),
+        ),
+    ]
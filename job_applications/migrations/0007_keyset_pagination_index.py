@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0006_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='jobapplication',
+            name='jobapp_user_applied_idx',
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', '-applied_date', '-updated_at', '-id'], name='jobapp_user_applied_idx'),
+        ),
+    ]
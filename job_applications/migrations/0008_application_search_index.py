@@ -0,0 +1,49 @@
+from django.db import OperationalError, migrations
+
+FTS_TABLE = 'job_applications_search'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "job_title, company, job_description, notes, user_id UNINDEXED, "
+                "tokenize='porter unicode61', prefix='2 3')"
+            )
+        except OperationalError as e:
+            print(f"SQLite FTS5 is not available ({e}); application search will fall back to icontains.")
+            return
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, job_title, company, job_description, notes, user_id) "
+            "SELECT a.id, a.job_title, coalesce(c.name, a.company_name_manual, ''), a.job_description, "
+            "coalesce(a.notes, ''), a.user_id "
+            "FROM job_applications_jobapplication a LEFT JOIN job_applications_company c ON c.id = a.company_id"
+        )
+    elif connection.vendor == 'postgresql':
+        # Must stay identical to search.PG_DOCUMENT for the planner to use it.
+        schema_editor.execute(
+            "CREATE INDEX jobapp_search_idx ON job_applications_jobapplication USING GIN ("
+            "to_tsvector('english', coalesce(job_title, '') || ' ' || coalesce(company_name_manual, '') || ' ' || "
+            "coalesce(job_description, '') || ' ' || coalesce(notes, '')))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS jobapp_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0007_keyset_pagination_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.1 on 2026-10-18 04:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_status_changed_at(apps, schema_editor):
+    # Best guess for existing rows: still-APPLIED applications have been in that status since they
+    # were created; anything else last changed (at the latest) when the row was last updated.
+    JobApplication = apps.get_model('job_applications', 'JobApplication')
+    JobApplication.objects.filter(status='APPLIED').update(status_changed_at=models.F('created_at'))
+    JobApplication.objects.exclude(status='APPLIED').update(status_changed_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0008_application_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Internal field: When the status last changed (see StatusTransition).', null=True),
+        ),
+        migrations.CreateModel(
+            name='StatusRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('transition_count', models.PositiveIntegerField(default=0)),
+                ('timed_count', models.PositiveIntegerField(default=0, help_text='Transitions with a known duration.')),
+                ('total_seconds', models.FloatField(default=0, help_text='Total time spent in from_status before these transitions.')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Status Rollup',
+                'verbose_name_plural': 'Status Rollups',
+                'constraints': [models.UniqueConstraint(fields=('user', 'from_status', 'to_status'), name='unique_status_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, help_text='Empty for the status an application was created with.', max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duration', models.DurationField(blank=True, help_text='Time spent in from_status before this change.', null=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_transitions', to='job_applications.jobapplication')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Status Transition',
+                'verbose_name_plural': 'Status Transitions',
+                'ordering': ['changed_at', 'id'],
+                'indexes': [models.Index(fields=['application', 'changed_at'], name='transition_app_changed_idx'), models.Index(fields=['user', 'from_status', 'duration'], name='transition_user_from_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_status_changed_at, migrations.RunPython.noop),
+    ]
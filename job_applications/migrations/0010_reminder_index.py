@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0009_status_history'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'status', 'status_changed_at'], name='jobapp_user_status_changed_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-18 05:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0010_reminder_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(blank=True, help_text="What the message is for, e.g. 'activation' or 'password_reset'.", max_length=30)),
+                ('from_email', models.CharField(max_length=254)),
+                ('to', models.JSONField(default=list, help_text='Recipient addresses.')),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('html_body', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times a worker has tried to send this message.')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='The message is not picked up before this time (used for retry backoff).')),
+                ('claim_token', models.CharField(blank=True, editable=False, help_text='Internal field: Identifies the worker batch sending the message.', max_length=32)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outgoing Email',
+                'verbose_name_plural': 'Outgoing Emails',
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='outgoingemail_status_run_after'), models.Index(fields=['claim_token'], name='outgoingemail_claim_idx')],
+            },
+        ),
+    ]
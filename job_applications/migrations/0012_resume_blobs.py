@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 05:11
+
+import job_applications.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def register_existing_resumes(apps, schema_editor):
+    # Resumes uploaded before content-addressed storage keep their names; count their references
+    # so they are cleaned up like new ones, and label them with their file name.
+    JobApplication = apps.get_model('job_applications', 'JobApplication')
+    ResumeBlob = apps.get_model('job_applications', 'ResumeBlob')
+    counts = (JobApplication.objects.exclude(resume_submitted='').exclude(resume_submitted__isnull=True)
+              .order_by().values('resume_submitted').annotate(references=Count('id')))
+    for row in counts.iterator():
+        name = row['resume_submitted']
+        ResumeBlob.objects.create(name=name, ref_count=row['references'])
+        JobApplication.objects.filter(resume_submitted=name).update(resume_original_name=name.rsplit('/', 1)[-1][:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0011_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='resume_original_name',
+            field=models.CharField(blank=True, editable=False, help_text='Internal field: File name the resume was uploaded with (stored files are named by content hash).', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='resume_submitted',
+            field=models.FileField(blank=True, help_text='The resume PDF/DOCX you submitted (optional).', null=True, storage=job_applications.storage.get_resume_storage, upload_to='resumes/'),
+        ),
+        migrations.CreateModel(
+            name='ResumeBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage name, as in JobApplication.resume_submitted.', max_length=100, unique=True)),
+                ('ref_count', models.IntegerField(default=0, help_text='Applications referencing the file.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resume File',
+                'verbose_name_plural': 'Resume Files',
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='resumeblob_unreferenced_idx')],
+            },
+        ),
+        migrations.RunPython(register_existing_resumes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 05:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+INTERVIEW_STATUSES = ('INTERVIEW_R1', 'INTERVIEW_R2', 'INTERVIEW_R3_PLUS')
+OFFER_STATUSES = ('OFFER_RECEIVED', 'OFFER_ACCEPTED', 'OFFER_DECLINED')
+
+
+def backfill_funnel(apps, schema_editor):
+    # Each application's furthest stage, and the per-user counts, from the transition log so far.
+    StatusTransition = apps.get_model('job_applications', 'StatusTransition')
+    JobApplication = apps.get_model('job_applications', 'JobApplication')
+    FunnelRollup = apps.get_model('job_applications', 'FunnelRollup')
+    furthest = models.Max(models.Case(
+        models.When(to_status__in=OFFER_STATUSES, then=models.Value(2)),
+        models.When(to_status__in=INTERVIEW_STATUSES, then=models.Value(1)),
+        default=models.Value(0), output_field=models.IntegerField(),
+    ))
+    reached = {}
+    per_application = StatusTransition.objects.order_by().values('application', 'user_id').annotate(stage=furthest)
+    for application_id, user_id, stage in per_application.values_list('application', 'user_id', 'stage').iterator():
+        if stage:
+            JobApplication.objects.filter(pk=application_id).update(funnel_stage=stage)
+        for reached_stage in range(stage + 1):
+            reached[user_id, reached_stage] = reached.get((user_id, reached_stage), 0) + 1
+    FunnelRollup.objects.bulk_create([
+        FunnelRollup(user_id=user_id, stage=stage, application_count=count)
+        for (user_id, stage), count in reached.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_applications', '0012_resume_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='funnel_stage',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Internal field: Furthest funnel stage the status has reached (see FunnelRollup).'),
+        ),
+        migrations.CreateModel(
+            name='FunnelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.PositiveSmallIntegerField(help_text='Index into FUNNEL_STAGES.')),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Funnel Rollup',
+                'verbose_name_plural': 'Funnel Rollups',
+                'constraints': [models.UniqueConstraint(fields=('user', 'stage'), name='unique_funnel_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_funnel, migrations.RunPython.noop),
+    ]
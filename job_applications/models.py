@@ -1,8 +1,12 @@
-from django.db import models
+import os
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils import timezone
 from django.conf import settings # Used for settings.AUTH_USER_MODEL
-from .utils import get_jd_resume_match_score # For resume scoring
+from .documents import text_hash
+from .storage import get_resume_storage
 
 # --- Custom User Model and Manager ---
 class CustomUserManager(BaseUserManager):
@@ -63,6 +67,9 @@ class Company(models.Model):
     class Meta:
         unique_together = ('user', 'name')
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='company_name_idx'), # Admin "company" filter across users
+        ]
         verbose_name = "Company"
         verbose_name_plural = "Companies"
 
@@ -71,6 +78,43 @@ class Company(models.Model):
 
 
 # --- JobApplication Model ---
+class JobApplicationQuerySet(models.QuerySet):
+    # Columns the application list renders, plus the keyset ordering columns. The potentially large
+    # text fields (job_description, notes) are left in the database.
+    LIST_FIELDS = (
+        'job_title', 'company_name_manual', 'applied_date', 'updated_at', 'application_source', 'status',
+        'company__name', 'company__website',
+    )
+
+    def for_list(self):
+        """Lightweight projection for list rendering: only LIST_FIELDS, with the company joined."""
+        return self.select_related('company').only(*self.LIST_FIELDS)
+
+    def similar_to(self, target, k=10, user=None):
+        """
+        The k applications in this queryset whose job description is most similar to `target`
+        (posting text or a JobApplication), most similar first, annotated with `similarity` (0-1).
+        Backed by the approximate nearest-neighbour index in ann_index (only read here; without a saved
+        index, `user`'s own applications are scanned); pass `user` to search only that user's applications.
+        """
+        from .ann_index import similar_applications # Imported lazily: pulls in the NLP stack
+
+        exclude_ids = ()
+        if isinstance(target, JobApplication):
+            exclude_ids = (target.pk,)
+            target = target.job_description
+        if not target:
+            return self.none()
+        results = similar_applications(text=target, k=k, user=user, exclude_ids=exclude_ids)
+        if not results:
+            return self.none()
+        similarity = models.Case(
+            *[models.When(pk=pk, then=models.Value(score)) for pk, score in results],
+            output_field=models.FloatField(),
+        )
+        return self.filter(pk__in=[pk for pk, _ in results]).annotate(similarity=similarity).order_by('-similarity')
+
+
 class JobApplication(models.Model):
     STATUS_CHOICES = [
         ('APPLIED', 'Applied'),
@@ -116,6 +160,7 @@ class JobApplication(models.Model):
     )
     job_title = models.CharField(max_length=200, help_text="The title of the job you applied for.")
     job_description = models.TextField(blank=True, help_text="Copy-paste the Job Description here (optional).")
+    job_description_hash = models.CharField(max_length=64, blank=True, editable=False, help_text="Internal field: Content hash of the job description (used to look up cached embeddings).")
     application_link = models.URLField(blank=True, null=True, help_text="Link to the job posting or application portal (optional).")
 
     application_source = models.CharField(
@@ -129,13 +174,18 @@ class JobApplication(models.Model):
 
     applied_date = models.DateField(default=timezone.now, help_text="The date you submitted the application.")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='APPLIED', help_text="Current status of your application.")
-    resume_submitted = models.FileField(upload_to='resumes/%Y/%m/%d/', blank=True, null=True, help_text="The resume PDF/DOCX you submitted (optional).")
+    resume_submitted = models.FileField(upload_to='resumes/', storage=get_resume_storage, blank=True, null=True, help_text="The resume PDF/DOCX you submitted (optional).")
+    resume_original_name = models.CharField(max_length=255, blank=True, editable=False, help_text="Internal field: File name the resume was uploaded with (stored files are named by content hash).")
     notes = models.TextField(blank=True, help_text="Any personal notes, contacts, or next steps (optional).")
     last_reminder_sent_date = models.DateField(blank=True, null=True, editable=False, help_text="Internal field: Date last reminder email was sent.")
+    status_changed_at = models.DateTimeField(blank=True, null=True, editable=False, help_text="Internal field: When the status last changed (see StatusTransition).")
+    funnel_stage = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Internal field: Furthest funnel stage the status has reached (see FunnelRollup).")
     resume_match_score = models.FloatField(blank=True, null=True, editable=False, help_text="Internal field: Calculated match score between resume and JD.")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = JobApplicationQuerySet.as_manager()
+
     def get_company_name(self):
         if self.company:
             return self.company.name
@@ -145,48 +195,475 @@ class JobApplication(models.Model):
         # Using user.email because your CustomUser __str__ returns email
         return f"{self.job_title} at {self.get_company_name()} (User: {self.user.email})"
 
+    # --- Change tracking ---
+    # Values of these fields as loaded from the database are snapshotted in from_db(), so save() can
+    # tell what changed without re-reading the row. The JD is tracked through its hash, so the (possibly
+    # large) description text is never copied.
+    TRACKED_FIELDS = ('job_description_hash', 'resume_submitted', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _tracked_value(self, attname):
+        value = self.__dict__[attname]
+        if attname == 'resume_submitted':
+            return getattr(value, 'name', value) or ''
+        return value
+
+    def _snapshot_tracked_fields(self, update_fields=None):
+        # Deferred fields aren't in __dict__ and are left out (and fetched on demand if ever compared).
+        # After a save(update_fields=...) only the saved fields take their new values; the rest still
+        # hold what is in the database.
+        values = {
+            attname: self._tracked_value(attname) for attname in self.TRACKED_FIELDS
+            if attname in self.__dict__ and (update_fields is None or attname in update_fields)
+        }
+        self._loaded_values = values if update_fields is None else {**getattr(self, '_loaded_values', {}), **values}
+
+    def get_changed_fields(self):
+        """Tracked fields whose current value differs from the value loaded from the database."""
+        if self._state.adding:
+            return set(self.TRACKED_FIELDS)
+        loaded = getattr(self, '_loaded_values', {})
+        current = {attname for attname in self.TRACKED_FIELDS if attname in self.__dict__}
+        unknown = [attname for attname in current if attname not in loaded]
+        if unknown:
+            # Instance wasn't loaded through the ORM (or the field was deferred): fall back to one query.
+            stored = type(self)._base_manager.filter(pk=self.pk).values(*unknown).first()
+            if stored is None:
+                return set(self.TRACKED_FIELDS)
+            loaded = {**loaded, **{attname: stored[attname] or '' for attname in unknown}}
+            self._loaded_values = loaded
+        return {attname for attname in current if self._tracked_value(attname) != loaded[attname]}
+
     def save(self, *args, **kwargs):
         # --- THIS IS THE ADDED/UPDATED save() METHOD FOR SCORING ---
-        recalculate_score = False
-        is_new = self.pk is None
+        update_fields = kwargs.get('update_fields')
+        saves_job_description = update_fields is None or 'job_description' in update_fields
+        # Don't load a deferred JD just to hash it, nor hash a JD this save doesn't write
+        if 'job_description' in self.__dict__ and saves_job_description:
+            self.job_description_hash = text_hash(self.job_description) if self.job_description else ''
+        changed_fields = self.get_changed_fields()
+        self._job_description_changed = 'job_description_hash' in changed_fields and saves_job_description
+        resume_changed = 'resume_submitted' in changed_fields and (update_fields is None or 'resume_submitted' in update_fields)
+        recalculate_score = self._job_description_changed or resume_changed
 
-        if not is_new:
-            try:
-                old_instance = JobApplication.objects.get(pk=self.pk)
-                if (old_instance.job_description != self.job_description or
-                    (self.resume_submitted and old_instance.resume_submitted != self.resume_submitted) or
-                    (self.resume_submitted and not old_instance.resume_submitted)):
-                    recalculate_score = True
-            except JobApplication.DoesNotExist:
-                recalculate_score = True
-        elif self.job_description and self.resume_submitted:
-            recalculate_score = True
-
-        super().save(*args, **kwargs) # Call original save method first
-
-        if recalculate_score and self.job_description and self.resume_submitted and hasattr(self.resume_submitted, 'path'):
-            try:
-                print(f"Recalculating match score for application ID: {self.id}")
-                resume_path = self.resume_submitted.path
-                score = get_jd_resume_match_score(self.job_description, resume_path)
-                
-                self.__class__.objects.filter(pk=self.pk).update(resume_match_score=score)
-                self.resume_match_score = score # Update current instance
-                print(f"Score {score:.2f}% saved for application ID: {self.id}")
-            except Exception as e:
-                print(f"Error calculating or saving resume match score for application ID {self.id}: {e}")
-                self.__class__.objects.filter(pk=self.pk).update(resume_match_score=None)
-                self.resume_match_score = None
+        if recalculate_score:
+            # The stored score described the old JD/resume pair; clear it in this same write.
+            # The scoring worker fills in the new one.
+            self.resume_match_score = None
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'job_description_hash', 'resume_match_score'}
+
+        if resume_changed:
+            previous_resume = '' if self._state.adding else self._loaded_values.get('resume_submitted', '')
+            upload = self.resume_submitted
+            if upload and not upload._committed: # A new upload: its stored name will be the content hash
+                self.resume_original_name = os.path.basename(upload.name)[:255]
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = set(kwargs['update_fields']) | {'resume_original_name'}
+
+        status_changed = 'status' in changed_fields and (update_fields is None or 'status' in update_fields)
+        if status_changed:
+            previous_status = '' if self._state.adding else self._loaded_values.get('status', '')
+            previous_changed_at = self.status_changed_at
+            self.status_changed_at = timezone.now()
+            # Funnel stages this application reaches for the first time (all up to its stage, for a new one)
+            stage = STAGE_OF_STATUS.get(self.status, 0)
+            reached_stages = range(0 if self._state.adding else self.funnel_stage + 1, stage + 1)
+            if reached_stages:
+                self.funnel_stage = stage
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'status_changed_at', 'funnel_stage'}
+        if status_changed or resume_changed:
+            # The row, its history entry and the resume reference counts are written together or not at all.
+            with transaction.atomic(using=kwargs.get('using')):
+                super().save(*args, **kwargs)
+                if status_changed:
+                    StatusTransition.objects.record(self, previous_status, previous_changed_at)
+                    FunnelRollup.objects.add(self.user_id, reached_stages)
+                if resume_changed:
+                    ResumeBlob.objects.swap(previous_resume, self._tracked_value('resume_submitted'))
+        else:
+            super().save(*args, **kwargs) # Call original save method first
+        self._snapshot_tracked_fields(kwargs.get('update_fields'))
+
+        if recalculate_score and self.job_description and self.resume_submitted:
+            # Scoring (PDF parsing + model forward pass) is far too slow for the request cycle,
+            # so hand it to the scoring worker once the row is committed.
+            application_id = self.pk
+            transaction.on_commit(lambda: ScoringJob.objects.enqueue(application_id))
+            print(f"Queued match score calculation for application ID: {self.id}")
         elif recalculate_score:
             missing_parts = []
             if not self.job_description: missing_parts.append("job description")
             if not self.resume_submitted: missing_parts.append("resume")
-            elif not hasattr(self.resume_submitted, 'path'): missing_parts.append("valid resume path")
             if missing_parts:
                 print(f"Skipping score calculation for application ID {self.id}: Missing {', '.join(missing_parts)}.")
         # --- END OF save() METHOD FOR SCORING ---
 
     class Meta:
         ordering = ['-applied_date', '-updated_at']
+        # Matched to the access paths of the list view (per user, newest first), the per-user status
+        # filters and the admin changelist filters. See `python manage.py benchmark_list_queries`.
+        indexes = [
+            models.Index(fields=['user', '-applied_date', '-updated_at', '-id'], name='jobapp_user_applied_idx'),
+            models.Index(fields=['user', 'status', '-applied_date', '-updated_at'], name='jobapp_user_status_idx'),
+            models.Index(fields=['user', 'status', 'status_changed_at'], name='jobapp_user_status_changed_idx'), # Reminder scan
+            models.Index(fields=['status', '-applied_date', '-updated_at'], name='jobapp_status_applied_idx'),
+            models.Index(fields=['application_source', '-applied_date', '-updated_at'], name='jobapp_source_applied_idx'),
+            models.Index(fields=['-applied_date', '-updated_at'], name='jobapp_applied_idx'),
+        ]
         verbose_name = "Job Application"
-        verbose_name_plural = "Job Applications"
\ No newline at end of file
+        verbose_name_plural = "Job Applications"
+
+
+# --- Scoring Job Queue ---
+class ScoringJobManager(models.Manager):
+    def enqueue(self, application_id):
+        """
+        Queue a resume match scoring job for the given application.
+        At most one PENDING job exists per application, so repeated saves don't queue duplicate work:
+        the partial unique constraint turns a duplicate into a no-op INSERT (a single query either way).
+        """
+        self.bulk_create(
+            [ScoringJob(application_id=application_id, status=ScoringJob.STATUS_PENDING)],
+            ignore_conflicts=True,
+        )
+
+
+class ScoringJob(models.Model):
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    application = models.ForeignKey(
+        JobApplication,
+        on_delete=models.CASCADE,
+        related_name='scoring_jobs',
+        help_text="The application whose resume match score should be (re)calculated."
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0, help_text="Number of times a worker has picked up this job.")
+    run_after = models.DateTimeField(default=timezone.now, help_text="The job is not picked up before this time (used for retry backoff).")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    objects = ScoringJobManager()
+
+    def __str__(self):
+        return f"Scoring job #{self.pk} for application {self.application_id} ({self.status})"
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='scoringjob_status_run_after'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['application'],
+                condition=models.Q(status='PENDING'),
+                name='unique_pending_scoring_job',
+            ),
+        ]
+        verbose_name = "Scoring Job"
+        verbose_name_plural = "Scoring Jobs"
+
+
+# --- Email Outbox ---
+class OutgoingEmailManager(models.Manager):
+    def enqueue(self, subject, body, to, from_email=None, html_body='', kind=''):
+        """
+        Stores a message for the email worker (`run_email_worker`) to send, so the request that
+        produced it doesn't wait on the mail server. Returns the OutgoingEmail.
+        """
+        return self.create(
+            kind=kind,
+            from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', None) or 'noreply@yourapplicationtracker.com',
+            to=list(to),
+            subject=subject,
+            body=body,
+            html_body=html_body,
+        )
+
+
+class OutgoingEmail(models.Model):
+    STATUS_PENDING = 'PENDING'
+    STATUS_SENDING = 'SENDING'
+    STATUS_SENT = 'SENT'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, blank=True, help_text="What the message is for, e.g. 'activation' or 'password_reset'.")
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list, help_text="Recipient addresses.")
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0, help_text="Number of times a worker has tried to send this message.")
+    run_after = models.DateTimeField(default=timezone.now, help_text="The message is not picked up before this time (used for retry backoff).")
+    claim_token = models.CharField(max_length=32, blank=True, editable=False, help_text="Internal field: Identifies the worker batch sending the message.")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OutgoingEmailManager()
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='outgoingemail_status_run_after'),
+            models.Index(fields=['claim_token'], name='outgoingemail_claim_idx'),
+        ]
+        verbose_name = "Outgoing Email"
+        verbose_name_plural = "Outgoing Emails"
+
+
+# --- Resume File References ---
+class ResumeBlobManager(models.Manager):
+    def acquire(self, name, count=1):
+        """Adds `count` references to a stored resume file, registering it on first use."""
+        if not name or count <= 0:
+            return
+        if self.filter(name=name).update(ref_count=F('ref_count') + count, updated_at=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                self.create(name=name, ref_count=count)
+        except IntegrityError: # Registered concurrently
+            self.filter(name=name).update(ref_count=F('ref_count') + count, updated_at=timezone.now())
+
+    def release(self, name, count=1):
+        """Drops `count` references. Files left unreferenced are deleted later by `resume_storage --cleanup`."""
+        if name and count > 0:
+            self.filter(name=name).update(ref_count=F('ref_count') - count, updated_at=timezone.now())
+
+    def swap(self, previous_name, name):
+        if previous_name != name:
+            self.release(previous_name)
+            self.acquire(name)
+
+
+class ResumeBlob(models.Model):
+    """
+    A stored resume file (see storage.ContentAddressedStorage) and the number of applications that
+    reference it. Identical uploads share one file, so a file may only be deleted once no application
+    uses it; updated_at records when the count last changed, which gives the cleanup its grace period.
+    """
+    name = models.CharField(max_length=100, unique=True, help_text="Storage name, as in JobApplication.resume_submitted.")
+    ref_count = models.IntegerField(default=0, help_text="Applications referencing the file.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ResumeBlobManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} reference{'s' if self.ref_count != 1 else ''})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='resumeblob_unreferenced_idx'), # Cleanup scan
+        ]
+        verbose_name = "Resume File"
+        verbose_name_plural = "Resume Files"
+
+
+# --- Status History ---
+# Funnel stages in order. An application reaches a stage when its status moves into one of the
+# stage's statuses or a later stage's (skipping a stage counts for it); every other status is stage 0.
+FUNNEL_STAGES = ['Applied', 'Interview', 'Offer']
+INTERVIEW_STATUSES = ('INTERVIEW_R1', 'INTERVIEW_R2', 'INTERVIEW_R3_PLUS')
+OFFER_STATUSES = ('OFFER_RECEIVED', 'OFFER_ACCEPTED', 'OFFER_DECLINED')
+STAGE_OF_STATUS = {**{status: 1 for status in INTERVIEW_STATUSES}, **{status: 2 for status in OFFER_STATUSES}}
+
+
+class StatusTransitionManager(models.Manager):
+    def record(self, application, from_status, previous_changed_at=None):
+        """
+        Appends a transition for an application whose status just changed (from_status '' for a new
+        application) and folds it into the user's StatusRollup. Called by JobApplication.save().
+        """
+        changed_at = application.status_changed_at or timezone.now()
+        duration = changed_at - previous_changed_at if from_status and previous_changed_at else None
+        transition = self.create(
+            application=application,
+            user_id=application.user_id,
+            from_status=from_status,
+            to_status=application.status,
+            changed_at=changed_at,
+            duration=duration,
+        )
+        StatusRollup.objects.add(application.user_id, from_status, application.status, duration)
+        return transition
+
+
+class StatusTransition(models.Model):
+    """Append-only log of status changes. Never updated; removed only with its application."""
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='status_transitions')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE) # Denormalised for per-user reports
+    from_status = models.CharField(max_length=20, blank=True, help_text="Empty for the status an application was created with.")
+    to_status = models.CharField(max_length=20)
+    changed_at = models.DateTimeField(default=timezone.now)
+    duration = models.DurationField(blank=True, null=True, help_text="Time spent in from_status before this change.")
+
+    objects = StatusTransitionManager()
+
+    def __str__(self):
+        return f"Application {self.application_id}: {self.from_status or '(new)'} -> {self.to_status}"
+
+    class Meta:
+        ordering = ['changed_at', 'id']
+        indexes = [
+            models.Index(fields=['application', 'changed_at'], name='transition_app_changed_idx'),
+            models.Index(fields=['user', 'from_status', 'duration'], name='transition_user_from_idx'), # Median response time
+        ]
+        verbose_name = "Status Transition"
+        verbose_name_plural = "Status Transitions"
+
+
+class StatusRollupManager(models.Manager):
+    def add(self, user_id, from_status, to_status, duration=None, count=1):
+        """Adds `count` transitions (and their total `duration`) to a rollup row, creating it if needed."""
+        seconds = duration.total_seconds() if duration is not None else 0.0
+        timed = count if duration is not None else 0
+        row = self.filter(user_id=user_id, from_status=from_status, to_status=to_status)
+        changes = dict(
+            transition_count=models.F('transition_count') + count,
+            timed_count=models.F('timed_count') + timed,
+            total_seconds=models.F('total_seconds') + seconds,
+        )
+        if row.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, from_status=from_status, to_status=to_status,
+                            transition_count=count, timed_count=timed, total_seconds=seconds)
+        except IntegrityError: # Created concurrently: increment that row instead
+            row.update(**changes)
+
+
+class StatusRollup(models.Model):
+    """
+    Per-user totals of status transitions, maintained incrementally alongside StatusTransition so
+    funnel and time-in-stage reports read a few rows per user instead of scanning the history.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='status_rollups')
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20)
+    transition_count = models.PositiveIntegerField(default=0)
+    timed_count = models.PositiveIntegerField(default=0, help_text="Transitions with a known duration.")
+    total_seconds = models.FloatField(default=0, help_text="Total time spent in from_status before these transitions.")
+
+    objects = StatusRollupManager()
+
+    def __str__(self):
+        return f"{self.user_id}: {self.from_status or '(new)'} -> {self.to_status} x{self.transition_count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'from_status', 'to_status'], name='unique_status_rollup'),
+        ]
+        verbose_name = "Status Rollup"
+        verbose_name_plural = "Status Rollups"
+
+
+class FunnelRollupManager(models.Manager):
+    def add(self, user_id, stages, count=1):
+        """Counts `count` applications as having reached each of `stages`, creating rows as needed."""
+        for stage in stages:
+            row = self.filter(user_id=user_id, stage=stage)
+            if row.update(application_count=models.F('application_count') + count):
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(user_id=user_id, stage=stage, application_count=count)
+            except IntegrityError: # Created concurrently: increment that row instead
+                row.update(application_count=models.F('application_count') + count)
+
+
+class FunnelRollup(models.Model):
+    """
+    Per-user count of applications that ever reached each funnel stage (STAGE_OF_STATUS). An
+    application is counted the first time it reaches a stage, however often it moves back and forth,
+    so the dashboard funnel reads these rows instead of scanning the transition log.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='funnel_rollups')
+    stage = models.PositiveSmallIntegerField(help_text="Index into FUNNEL_STAGES.")
+    application_count = models.PositiveIntegerField(default=0)
+
+    objects = FunnelRollupManager()
+
+    def __str__(self):
+        return f"{self.user_id}: {FUNNEL_STAGES[self.stage]} x{self.application_count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'stage'], name='unique_funnel_rollup'),
+        ]
+        verbose_name = "Funnel Rollup"
+        verbose_name_plural = "Funnel Rollups"
+
+
+# --- Extracted Resume Text Cache ---
+class ExtractedText(models.Model):
+    """
+    Normalised text extracted from a resume file, keyed by the SHA-256 of the file content.
+    The same resume attached to many applications is only parsed once.
+    """
+    content_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 hex digest of the source file content.")
+    extractor_version = models.PositiveSmallIntegerField(help_text="utils.TEXT_EXTRACTOR_VERSION used to produce the text.")
+    text = models.TextField()
+    text_length = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.content_hash[:12]}… ({self.text_length} chars, v{self.extractor_version})"
+
+    class Meta:
+        verbose_name = "Extracted Resume Text"
+        verbose_name_plural = "Extracted Resume Texts"
+
+
+# --- Document Embedding Store ---
+class DocumentEmbedding(models.Model):
+    """
+    Sentence embedding of a document (job description or resume text), keyed by the SHA-256 of the
+    cleaned text plus the model that produced it. Vectors are L2-normalised float32 stored as raw bytes,
+    so cosine similarity is a plain dot product and unchanged text is never re-encoded.
+    """
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 hex digest of the cleaned document text.")
+    model_name = models.CharField(max_length=255, help_text="Name/path of the embedding model.")
+    dimensions = models.PositiveSmallIntegerField()
+    vector = models.BinaryField(help_text="L2-normalised float32 vector (little-endian bytes).")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.content_hash[:12]}… ({self.model_name}, {self.dimensions}d)"
+
+    class Meta:
+        unique_together = ('content_hash', 'model_name')
+        verbose_name = "Document Embedding"
+        verbose_name_plural = "Document Embeddings"
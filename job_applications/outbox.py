@@ -0,0 +1,178 @@
+"""
+DB-backed outbox for outgoing email.
+
+Views only store an OutgoingEmail (OutgoingEmail.objects.enqueue()); the `run_email_worker`
+management command claims due messages in batches and sends them over one reused connection.
+Transient failures (connection problems, 4xx SMTP replies) are retried with exponential
+backoff; permanent ones (5xx replies, malformed messages) and messages out of attempts are
+marked FAILED with the error. Delivery is at-least-once: a worker that dies mid-batch leaves
+its messages SENDING, and they are retried once EMAIL_OUTBOX_SENDING_TIMEOUT has passed.
+Once sent, activation and password-reset messages have their bodies cleared, so the table
+doesn't keep working account links around.
+"""
+import smtplib
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+SENSITIVE_KINDS = ('activation', 'password_reset') # Bodies carry a live token; cleared once sent
+
+
+def get_max_attempts():
+    return getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base, ... seconds (capped)."""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BACKOFF', 60)
+    max_delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), max_delay))
+
+
+def is_transient(error):
+    """Whether sending may succeed if retried later."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, OSError) # Connection refused/dropped, timeouts (SMTPServerDisconnected is an OSError)
+
+
+def is_connection_error(error):
+    """Failures that leave the connection unusable (as opposed to the server refusing one message)."""
+    return isinstance(error, OSError) and not isinstance(
+        error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+    )
+
+
+def requeue_stale_messages():
+    """Messages left SENDING by a worker that died count as a failed attempt. Returns how many were reset."""
+    timeout = getattr(settings, 'EMAIL_OUTBOX_SENDING_TIMEOUT', 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = list(OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_SENDING, updated_at__lt=cutoff))
+    for message in stale:
+        _record_failure(message, "Worker timed out or exited while sending.", transient=True)
+    return len(stale)
+
+
+def claim_batch(batch_size):
+    """
+    Moves up to `batch_size` due PENDING messages to SENDING and returns them. The conditional
+    UPDATE tags the rows with a token unique to this call, so concurrent workers never share a message.
+    """
+    now = timezone.now()
+    due_ids = list(
+        OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_PENDING, run_after__lte=now)
+        .order_by('run_after', 'id').values_list('id', flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+    token = uuid.uuid4().hex
+    OutgoingEmail.objects.filter(pk__in=due_ids, status=OutgoingEmail.STATUS_PENDING).update(
+        status=OutgoingEmail.STATUS_SENDING,
+        claim_token=token,
+        attempts=F('attempts') + 1,
+        updated_at=now,
+    )
+    return list(OutgoingEmail.objects.filter(claim_token=token, status=OutgoingEmail.STATUS_SENDING).order_by('id'))
+
+
+def build_message(outgoing, connection=None):
+    message = EmailMultiAlternatives(
+        subject=outgoing.subject,
+        body=outgoing.body,
+        from_email=outgoing.from_email,
+        to=outgoing.to,
+        connection=connection,
+    )
+    if outgoing.html_body:
+        message.attach_alternative(outgoing.html_body, 'text/html')
+    return message
+
+
+def send_batch(messages, connection):
+    """Sends claimed messages over an open connection and records the outcome. Returns the number sent."""
+    sent_ids = []
+    sensitive_ids = []
+    for outgoing in messages:
+        try:
+            connection.send_messages([build_message(outgoing, connection)])
+        except Exception as e:
+            print(f"ERROR sending email #{outgoing.pk} ({outgoing.kind or 'email'}) to {', '.join(outgoing.to)}: {e}")
+            _record_failure(outgoing, f"{type(e).__name__}: {e}", transient=is_transient(e))
+            if is_connection_error(e): # Start a fresh connection for the rest of the batch
+                connection.close()
+                try:
+                    connection.open()
+                except OSError as open_error:
+                    print(f"ERROR reconnecting to the mail server: {open_error}")
+            continue
+        (sensitive_ids if outgoing.kind in SENSITIVE_KINDS else sent_ids).append(outgoing.pk)
+    now = timezone.now()
+    if sent_ids:
+        OutgoingEmail.objects.filter(pk__in=sent_ids).update(
+            status=OutgoingEmail.STATUS_SENT, last_error='', sent_at=now, updated_at=now,
+        )
+    if sensitive_ids:
+        OutgoingEmail.objects.filter(pk__in=sensitive_ids).update(
+            status=OutgoingEmail.STATUS_SENT, last_error='', sent_at=now, updated_at=now, body='', html_body='',
+        )
+    return len(sent_ids) + len(sensitive_ids)
+
+
+def _record_failure(outgoing, error, transient):
+    now = timezone.now()
+    if not transient or outgoing.attempts >= get_max_attempts():
+        OutgoingEmail.objects.filter(pk=outgoing.pk).update(status=OutgoingEmail.STATUS_FAILED, last_error=error, updated_at=now)
+        return
+    OutgoingEmail.objects.filter(pk=outgoing.pk).update(
+        status=OutgoingEmail.STATUS_PENDING,
+        last_error=error,
+        run_after=now + get_retry_delay(outgoing.attempts),
+        updated_at=now,
+    )
+
+
+def process_outbox(batch_size=None, connection=None):
+    """
+    Sends due messages in batches until none are left, opening the mail connection once (and
+    only if there is something to send). Returns the number of messages sent.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100)
+    requeue_stale_messages()
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0
+    sent = 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except OSError as e: # Mail server unreachable: every claimed message is retried later
+        print(f"ERROR connecting to the mail server: {e}")
+        for outgoing in batch:
+            _record_failure(outgoing, f"{type(e).__name__}: {e}", transient=True)
+        return 0
+    try:
+        while batch:
+            sent += send_batch(batch, connection)
+            batch = claim_batch(batch_size)
+    finally:
+        connection.close()
+    return sent
+
+
+def run_worker(poll_interval=None, batch_size=None):
+    """Long-running worker loop used by the `run_email_worker` management command."""
+    if poll_interval is None:
+        poll_interval = getattr(settings, 'EMAIL_WORKER_POLL_INTERVAL', 5)
+    while True:
+        if not process_outbox(batch_size=batch_size):
+            time.sleep(poll_interval)
@@ -0,0 +1,169 @@
+"""
+Keyset (cursor) pagination for the list views.
+
+Instead of OFFSET, each page is fetched with a WHERE clause that seeks past the last row of the
+previous page on the ordering columns, so page 1000 costs the same index range scan as page 1.
+The position is passed around as an opaque, signed `cursor` token; the total count is optional
+and cached per user (invalidated by the signal receivers in signals.py).
+"""
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+
+from .cache_versions import versioned_key
+
+CURSOR_SALT = 'job_applications.pagination.cursor'
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total_count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total_count = total_count
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def _parse_ordering(ordering):
+    return [(field[1:], True) if field.startswith('-') else (field, False) for field in ordering]
+
+
+def seek_filter(ordering, values, forward=True):
+    """
+    Q object matching the rows that come after `values` in `ordering` (before them if not forward).
+    For ('-a', '-b', '-id') that is: a < x OR (a = x AND b < y) OR (a = x AND b = y AND id < z).
+    The ordering columns must be non-null and the last one unique.
+    """
+    fields = _parse_ordering(ordering)
+    condition = Q()
+    equal = {}
+    for (field, descending), value in zip(fields, values):
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= Q(**equal, **{f'{field}__{lookup}': value})
+        equal[field] = value
+    # Redundant bound on the leading column: lets the database start the index range scan at the
+    # cursor instead of walking (and filtering out) every row of the earlier pages.
+    field, descending = fields[0]
+    return Q(**{f'{field}__{"lte" if descending == forward else "gte"}': values[0]}) & condition
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing Django's OFFSET pagination. Subclasses set `keyset_ordering`
+    (ending in a unique column) and `page_size`; the template gets `page` (a KeysetPage)
+    plus `next_cursor`/`previous_cursor`. Requests with ?partial=1 render `partial_template_name`
+    (just the rows) for the "load more" button, with the next cursor in the X-Next-Cursor header.
+    """
+    keyset_ordering = ('-id',)
+    page_size = 10
+    paginate_by = None # Disable ListView's own paginator
+    partial_template_name = None
+    count_cache_namespace = None # cache_versions namespace for the cached total, None disables the count
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for field, _ in _parse_ordering(self.get_keyset_ordering()):
+            value = getattr(obj, field)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return signing.dumps([direction, values], salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, token):
+        """Returns (direction, values) or (None, None) for a missing or tampered token."""
+        if not token:
+            return None, None
+        try:
+            direction, values = signing.loads(token, salt=CURSOR_SALT)
+        except (signing.BadSignature, ValueError, TypeError):
+            return None, None
+        fields = _parse_ordering(self.get_keyset_ordering())
+        if direction not in ('next', 'prev') or len(values) != len(fields):
+            return None, None
+        try:
+            values = [self._cursor_value(field, value) for (field, _), value in zip(fields, values)]
+        except Exception: # ValidationError from to_python
+            return None, None
+        return direction, values
+
+    def _cursor_value(self, field, value):
+        try:
+            return self.model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist: # An annotation (e.g. search_rank): JSON already restored its type
+            return value
+
+    def get_total_count(self, queryset):
+        if not self.count_cache_namespace or self.request.GET.get('count') == '0':
+            return None
+        key = versioned_key(self.count_cache_namespace, self.request.user.pk, 'count', self.get_count_cache_suffix())
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, None) # Invalidated by version bumps, not by time
+        return count
+
+    def get_count_cache_suffix(self):
+        """Distinguishes cached counts of differently filtered lists (e.g. searches)."""
+        return ''
+
+    def paginate_keyset(self, queryset):
+        ordering = self.get_keyset_ordering()
+        direction, values = self.decode_cursor(self.request.GET.get('cursor'))
+        if values is None:
+            rows = queryset.order_by(*ordering)
+        elif direction == 'next':
+            rows = queryset.order_by(*ordering).filter(seek_filter(ordering, values, forward=True))
+        else:
+            reversed_ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+            rows = queryset.order_by(*reversed_ordering).filter(seek_filter(ordering, values, forward=False))
+
+        # One extra row tells whether there is another page in the direction we are going.
+        rows = list(rows[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if direction == 'prev':
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], 'next') if has_next and rows else None,
+            previous_cursor=self.encode_cursor(rows[0], 'prev') if has_previous and rows else None,
+            total_count=self.get_total_count(queryset),
+        )
+
+    def get_context_data(self, **kwargs):
+        page = self.paginate_keyset(kwargs.pop('object_list', self.object_list))
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context.update({
+            'page': page,
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+            'is_paginated': page.has_next or page.has_previous,
+        })
+        return context
+
+    def is_partial_request(self):
+        return self.partial_template_name and self.request.GET.get('partial') == '1'
+
+    def get_template_names(self):
+        if self.is_partial_request():
+            return [self.partial_template_name]
+        return super().get_template_names()
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if self.is_partial_request():
+            response['X-Next-Cursor'] = context['next_cursor'] or ''
+        return response
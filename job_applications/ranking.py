@@ -0,0 +1,71 @@
+"""
+"Rank my applications": scores one resume against every job description a user has stored.
+
+The user's JD embeddings come from the embedding store (looked up by JobApplication.job_description_hash,
+so JD text is only loaded for the few descriptions that were never embedded), and the whole ranking
+is a single matrix-vector product. Rankings are cached per (user, resume hash) and invalidated by
+bumping the user's 'ranking' cache version whenever one of their job descriptions changes.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from . import tfidf_model
+from .cache_versions import RANKING, versioned_key
+from .documents import clean_text
+from .embeddings import get_embedding, get_embeddings, get_stored_embeddings
+from .models import JobApplication
+from .scoring import score_text_pairs
+from .utils import get_sentence_model
+
+
+def _jd_similarities(user, resume_text):
+    """Returns (application_ids, similarities) for all of the user's applications with a JD."""
+    rows = list(JobApplication.objects.filter(user=user).exclude(job_description='')
+                .order_by().values_list('id', 'job_description_hash'))
+    if not rows:
+        return [], np.zeros(0, dtype=np.float32)
+    application_ids = [pk for pk, _ in rows]
+
+    if get_sentence_model():
+        vectors = get_stored_embeddings([content_hash for _, content_hash in rows])
+        missing_ids = [pk for pk, content_hash in rows if content_hash not in vectors]
+        if missing_ids:
+            # Only descriptions that were never embedded are loaded and encoded (in one batch).
+            missing = JobApplication.objects.filter(pk__in=missing_ids).values_list('id', 'job_description')
+            missing_texts = dict(missing)
+            encoded = get_embeddings([missing_texts[pk] for pk in missing_ids])
+            vectors_by_id = dict(zip(missing_ids, encoded))
+        else:
+            vectors_by_id = {}
+        jd_matrix = np.vstack([vectors_by_id[pk] if pk in vectors_by_id else vectors[content_hash]
+                               for pk, content_hash in rows])
+        return application_ids, jd_matrix @ get_embedding(resume_text)
+
+    texts = dict(JobApplication.objects.filter(pk__in=application_ids).values_list('id', 'job_description'))
+    jd_texts = [texts[pk] for pk in application_ids]
+    jd_matrix = tfidf_model.transform(jd_texts)
+    if jd_matrix is None:
+        # No corpus TF-IDF model fitted yet: fall back to per-pair scoring.
+        scores = score_text_pairs(jd_texts, [resume_text] * len(jd_texts))
+        return application_ids, np.asarray(scores, dtype=np.float32) / 100
+    resume_vector = tfidf_model.transform([resume_text])
+    return application_ids, np.asarray((jd_matrix @ resume_vector.T).todense()).ravel()
+
+
+def rank_applications(user, resume_text, resume_hash, top_k=None):
+    """
+    Returns [(application_id, score), ...] for the user's applications, best match first.
+    Applications without a job description are not ranked.
+    """
+    if not clean_text(resume_text):
+        return []
+    cache_key = versioned_key(RANKING, user.pk, resume_hash)
+    ranking = cache.get(cache_key)
+    if ranking is None:
+        application_ids, similarities = _jd_similarities(user, resume_text)
+        scores = np.clip(similarities * 100, 0.0, 100.0)
+        order = np.argsort(-scores, kind='stable')
+        ranking = [(application_ids[i], float(scores[i])) for i in order]
+        cache.set(cache_key, ranking, getattr(settings, 'RANKING_CACHE_TIMEOUT', 24 * 60 * 60))
+    return ranking if top_k is None else ranking[:top_k]
@@ -0,0 +1,177 @@
+"""
+Follow-up reminders.
+
+An application is due when it has been in its status for longer than that status's rule in
+settings.REMINDER_RULES (e.g. APPLIED for 14 days) and it was not reminded about in the last
+REMINDER_REPEAT_DAYS days. Each run sends every user with due applications one digest email,
+all over a single mail connection, and stamps last_reminder_sent_date on the applications of
+the digests that were sent.
+
+The due rows are read with one query, run in keyset chunks along jobapp_user_status_changed_idx
+(user, status, status_changed_at), so memory is bounded by the chunk and batch sizes rather than
+the number of users, and no cursor is held open while rows are being stamped.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import JobApplication
+from .pagination import seek_filter
+
+DUE_ORDERING = ('user_id', 'status', 'status_changed_at', 'id') # Walks jobapp_user_status_changed_idx
+DIGEST_MAX_LISTED = 50 # Applications listed in one digest; the rest are summarised as a count
+STAMP_BATCH_SIZE = 500 # Ids per UPDATE (keeps clear of the database's parameter limit)
+
+
+class ReminderResult:
+    def __init__(self):
+        self.users = 0 # Digests built
+        self.applications = 0 # Due applications found
+        self.sent = 0 # Digests delivered
+        self.failed = 0
+        self.stamped = 0
+
+
+def get_reminder_rules():
+    return getattr(settings, 'REMINDER_RULES', {'APPLIED': 14})
+
+
+def due_applications(now=None, rules=None):
+    """The applications due for a reminder at `now`, owner and company joined."""
+    now = now or timezone.now()
+    rules = get_reminder_rules() if rules is None else rules
+    if not rules:
+        return JobApplication.objects.none()
+    status_rules = Q()
+    for status, days in rules.items():
+        status_rules |= Q(status=status, status_changed_at__lte=now - timedelta(days=days))
+    repeat_after = timezone.localdate(now) - timedelta(days=getattr(settings, 'REMINDER_REPEAT_DAYS', 7))
+    return (
+        JobApplication.objects
+        .filter(status_rules, user__is_active=True)
+        .filter(Q(last_reminder_sent_date__isnull=True) | Q(last_reminder_sent_date__lte=repeat_after))
+        .select_related('company', 'user')
+        .only('job_title', 'company_name_manual', 'company__name', 'status', 'status_changed_at', 'applied_date',
+              'user__email', 'user__first_name')
+    )
+
+
+def iter_due_by_user(queryset, chunk_size=1000):
+    """
+    Yields (user, applications listed, ids of all the user's due applications) one user at a time.
+    At most DIGEST_MAX_LISTED application objects are kept per user.
+    """
+    queryset = queryset.order_by(*DUE_ORDERING)
+    cursor = None
+    user, listed, ids = None, [], []
+    while True:
+        chunk = queryset.filter(seek_filter(DUE_ORDERING, cursor)) if cursor else queryset
+        rows = list(chunk[:chunk_size])
+        for application in rows:
+            if user is None or application.user_id != user.pk:
+                if user is not None:
+                    yield user, listed, ids
+                user, listed, ids = application.user, [], []
+            if len(listed) < DIGEST_MAX_LISTED:
+                listed.append(application)
+            ids.append(application.pk)
+        if len(rows) < chunk_size:
+            break
+        last = rows[-1]
+        cursor = [last.user_id, last.status, last.status_changed_at, last.pk]
+    if user is not None:
+        yield user, listed, ids
+
+
+def build_digest(user, applications, total, now):
+    site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+    context = {
+        'user': user,
+        'applications': [
+            {
+                'application': application,
+                'days_in_status': (now - application.status_changed_at).days,
+                'url': site_url + reverse('job_applications:application_detail', args=[application.pk]),
+            }
+            for application in applications
+        ],
+        'total': total,
+        'not_listed': total - len(applications),
+        'list_url': site_url + reverse('job_applications:application_list'),
+    }
+    subject = f"Follow up on {total} job application{'s' if total != 1 else ''}"
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=render_to_string('job_applications/emails/reminder_digest.txt', context),
+        from_email=getattr(settings, 'REMINDER_FROM_EMAIL', None),
+        to=[user.email],
+    )
+    message.attach_alternative(render_to_string('job_applications/emails/reminder_digest.html', context), 'text/html')
+    return message
+
+
+def stamp_reminded(application_ids, today):
+    """Records the reminder on the applications (an UPDATE, so updated_at and list order are untouched)."""
+    stamped = 0
+    for start in range(0, len(application_ids), STAMP_BATCH_SIZE):
+        stamped += JobApplication.objects.filter(pk__in=application_ids[start:start + STAMP_BATCH_SIZE]).update(
+            last_reminder_sent_date=today
+        )
+    return stamped
+
+
+def send_reminders(now=None, chunk_size=1000, batch_size=500, dry_run=False, connection=None):
+    """
+    Sends the due reminder digests. Digests are sent in batches of `batch_size` over one
+    connection, and each batch's applications are stamped once the batch went out.
+    Returns a ReminderResult.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    result = ReminderResult()
+    due = iter_due_by_user(due_applications(now), chunk_size=chunk_size)
+    if dry_run:
+        for _, _, ids in due:
+            result.users += 1
+            result.applications += len(ids)
+        return result
+
+    connection = connection or get_connection()
+    batch = []
+
+    def flush():
+        sent_ids = []
+        try:
+            for message, ids in batch:
+                try:
+                    if connection.send_messages([message]):
+                        result.sent += 1
+                        sent_ids.extend(ids)
+                except Exception as e: # One failure must not stop the run; unsent digests are retried next run
+                    result.failed += 1
+                    print(f"ERROR sending reminder digest to {message.to[0]}: {e}")
+                    connection.close() # The server may have dropped us: start a fresh connection
+                    try:
+                        connection.open()
+                    except OSError as open_error: # send_messages() retries opening for the next digest
+                        print(f"ERROR reconnecting to the mail server: {open_error}")
+        finally:
+            # Whatever went out is stamped, even if the run is aborted, so it isn't sent again tomorrow.
+            result.stamped += stamp_reminded(sent_ids, today)
+            batch.clear()
+
+    with connection: # Opened once for the whole run
+        for user, applications, ids in due:
+            result.users += 1
+            result.applications += len(ids)
+            batch.append((build_digest(user, applications, len(ids), now), ids))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    return result
@@ -0,0 +1,77 @@
+"""
+Resume match scoring on top of the cached building blocks: extracted resume text (text_cache)
+and stored sentence embeddings (embeddings). Falls back to TF-IDF when no model is available,
+using the corpus-level model (tfidf_model) once one has been fitted.
+"""
+import numpy as np
+
+from . import tfidf_model
+from .embeddings import clean_text, get_embeddings
+from .utils import calculate_similarity_tfidf, get_sentence_model
+
+
+def similarity_to_score(similarity):
+    """Cosine similarity -> percentage, clamped 0-100."""
+    return float(np.clip(similarity * 100, 0.0, 100.0))
+
+
+def score_texts(job_description_text, resume_text):
+    """
+    Calculates the match score between a job description and resume text.
+    With a SentenceTransformer model, both embeddings come from the store so only new text is encoded.
+    """
+    if not clean_text(job_description_text) or not clean_text(resume_text):
+        print("Match Score: Job description or resume text is empty.")
+        return 0.0
+
+    if get_sentence_model():
+        embeddings = get_embeddings([job_description_text, resume_text])
+        return similarity_to_score(np.dot(embeddings[0], embeddings[1]))
+
+    print("Sentence Transformer model not available. Calculating similarity using TF-IDF.")
+    vectors = tfidf_model.transform([job_description_text, resume_text])
+    if vectors is None:
+        # No corpus model fitted yet: fall back to the per-pair fit.
+        return calculate_similarity_tfidf(job_description_text, resume_text)
+    return similarity_to_score(vectors[0].multiply(vectors[1]).sum())
+
+
+def score_text_pairs(job_description_texts, resume_texts):
+    """
+    Vectorised scoring of many (job description, resume text) pairs.
+    Each distinct text is embedded once (batch-encoded if not stored yet), the whole JD x resume
+    similarity matrix is computed with a single matmul, and each pair's score is read from it.
+    Returns a list of scores in input order.
+    """
+    scores = [0.0] * len(job_description_texts)
+    valid = [i for i, (jd, resume) in enumerate(zip(job_description_texts, resume_texts))
+             if clean_text(jd) and clean_text(resume)]
+    if not valid:
+        return scores
+
+    jd_index, resume_index = {}, {}
+    for i in valid:
+        jd_index.setdefault(job_description_texts[i], len(jd_index))
+        resume_index.setdefault(resume_texts[i], len(resume_index))
+    rows = np.array([jd_index[job_description_texts[i]] for i in valid])
+    cols = np.array([resume_index[resume_texts[i]] for i in valid])
+
+    if get_sentence_model():
+        jd_matrix = get_embeddings(list(jd_index))
+        resume_matrix = get_embeddings(list(resume_index))
+        similarity = (jd_matrix @ resume_matrix.T)[rows, cols]
+    else:
+        jd_matrix = tfidf_model.transform(list(jd_index))
+        if jd_matrix is None:
+            # No corpus model fitted yet: fall back to the per-pair fit.
+            for i in valid:
+                scores[i] = calculate_similarity_tfidf(job_description_texts[i], resume_texts[i])
+            return scores
+        resume_matrix = tfidf_model.transform(list(resume_index))
+        # Row-wise sparse dot product of each pair's (L2-normalised) TF-IDF vectors.
+        similarity = np.asarray(jd_matrix[rows].multiply(resume_matrix[cols]).sum(axis=1)).ravel()
+
+    pair_scores = np.clip(similarity * 100, 0.0, 100.0)
+    for i, score in zip(valid, pair_scores):
+        scores[i] = float(score)
+    return scores
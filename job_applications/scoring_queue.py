@@ -0,0 +1,169 @@
+"""
+DB-backed queue for resume match scoring.
+
+JobApplication.save() only enqueues a ScoringJob; the `run_scoring_worker` management
+command claims pending jobs, calculates the score and writes it back to the application.
+No external broker is needed - the jobs table lives in the project database.
+"""
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache_versions import ANALYTICS, bump_version
+from .models import JobApplication, ScoringJob
+from .scoring import score_texts
+from .text_cache import get_resume_text
+
+
+def get_max_attempts():
+    return getattr(settings, 'SCORING_JOB_MAX_ATTEMPTS', 5)
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base, ... seconds (capped)."""
+    base = getattr(settings, 'SCORING_JOB_RETRY_BACKOFF', 30)
+    max_delay = getattr(settings, 'SCORING_JOB_RETRY_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), max_delay))
+
+
+def requeue_stale_jobs():
+    """
+    Jobs left RUNNING by a worker that died are treated as a failed attempt.
+    Returns the number of jobs that were reset.
+    """
+    timeout = getattr(settings, 'SCORING_JOB_RUNNING_TIMEOUT', 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    reset = 0
+    for job in ScoringJob.objects.filter(status=ScoringJob.STATUS_RUNNING, updated_at__lt=cutoff):
+        _record_failure(job, "Worker timed out or exited while the job was running.")
+        reset += 1
+    return reset
+
+
+def claim_next_job():
+    """
+    Atomically moves the oldest due PENDING job to RUNNING and returns it (or None).
+    The conditional UPDATE guarantees only one worker wins a given job.
+    """
+    while True:
+        now = timezone.now()
+        job = (ScoringJob.objects
+               .filter(status=ScoringJob.STATUS_PENDING, run_after__lte=now)
+               .order_by('run_after', 'id')
+               .first())
+        if job is None:
+            return None
+        claimed = ScoringJob.objects.filter(pk=job.pk, status=ScoringJob.STATUS_PENDING).update(
+            status=ScoringJob.STATUS_RUNNING,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Lost the race to another worker; try the next job.
+
+
+def calculate_application_score(application):
+    """Returns the match score for an application, or None if it has nothing to score."""
+    if not application.job_description or not application.resume_submitted:
+        missing_parts = []
+        if not application.job_description: missing_parts.append("job description")
+        if not application.resume_submitted: missing_parts.append("resume")
+        print(f"Skipping score calculation for application ID {application.id}: Missing {', '.join(missing_parts)}.")
+        return None
+    resume_path = application.resume_submitted.path
+    resume_text = get_resume_text(resume_path)
+    if not resume_text:
+        print(f"Match Score: Could not extract text from resume: {resume_path}")
+        return 0.0
+    return score_texts(application.job_description, resume_text)
+
+
+def run_job(job):
+    """Runs a claimed job, recording success or scheduling a retry on failure."""
+    try:
+        application = JobApplication.objects.get(pk=job.application_id)
+        print(f"Recalculating match score for application ID: {application.id}")
+        score = calculate_application_score(application)
+        JobApplication.objects.filter(pk=application.pk).update(resume_match_score=score)
+        bump_version(ANALYTICS, application.user_id) # update() sends no post_save; the dashboard averages scores
+        if score is not None:
+            print(f"Score {score:.2f}% saved for application ID: {application.id}")
+    except Exception as e:
+        print(f"Error calculating or saving resume match score for application ID {job.application_id}: {e}")
+        _record_failure(job, traceback.format_exc())
+        return False
+
+    ScoringJob.objects.filter(pk=job.pk).update(
+        status=ScoringJob.STATUS_DONE,
+        last_error='',
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    return True
+
+
+def _record_failure(job, error):
+    now = timezone.now()
+    if job.attempts >= get_max_attempts():
+        ScoringJob.objects.filter(pk=job.pk).update(
+            status=ScoringJob.STATUS_FAILED, last_error=error, finished_at=now, updated_at=now,
+        )
+        return
+    try:
+        with transaction.atomic():
+            ScoringJob.objects.filter(pk=job.pk).update(
+                status=ScoringJob.STATUS_PENDING,
+                last_error=error,
+                run_after=now + get_retry_delay(job.attempts),
+                updated_at=now,
+            )
+    except IntegrityError:
+        # A newer PENDING job was queued while this one ran; that job supersedes the retry.
+        ScoringJob.objects.filter(pk=job.pk).update(
+            status=ScoringJob.STATUS_FAILED,
+            last_error=f"{error}\nSuperseded by a newer pending job.",
+            finished_at=now,
+            updated_at=now,
+        )
+
+
+def process_pending_jobs(limit=None):
+    """Runs due jobs until the queue is empty (or `limit` jobs ran). Returns the number processed."""
+    processed = 0
+    requeue_stale_jobs()
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def sync_similarity_index():
+    """Applies recent job description changes to the ANN index (see ann_index.get_index())."""
+    from .ann_index import get_index # Imported lazily: building the index needs the model
+    try:
+        get_index(sync=True)
+    except Exception as e:
+        print(f"Error syncing the job description index: {e}")
+
+
+def run_worker(poll_interval=None, stop_when_empty=False):
+    """Long-running worker loop used by the `run_scoring_worker` management command."""
+    if poll_interval is None:
+        poll_interval = getattr(settings, 'SCORING_WORKER_POLL_INTERVAL', 2)
+    while True:
+        processed = process_pending_jobs()
+        sync_similarity_index()
+        if stop_when_empty and not processed:
+            return
+        if not processed:
+            time.sleep(poll_interval)
@@ -0,0 +1,232 @@
+"""
+Full-text search over job applications (title, company, job description and notes).
+
+Backends, picked from the database in use:
+  - SQLite: an FTS5 virtual table (job_applications_search, created by migration 0008) kept in
+    sync by the signal receivers in signals.py; ranked by bm25, snippets from snippet().
+  - PostgreSQL: to_tsvector() over the application's columns, backed by a GIN expression index
+    (also migration 0008); ranked by ts_rank, snippets from ts_headline(). The linked company's
+    name is not part of this index, only company_name_manual.
+  - Anything else (or SQLite without FTS5): icontains across the same fields, unranked.
+
+Queries are plain words (all must match), "quoted phrases" and prefix terms ending in `*`.
+Results are annotated with `search_rank` (higher is better) and `search_snippet`, a fragment
+with the matches wrapped in HIGHLIGHT_START/HIGHLIGHT_END (see highlight_html()).
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import BooleanField, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'job_applications_search'
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+# bm25 column weights for (job_title, company, job_description, notes, user_id)
+FTS_WEIGHTS = '10.0, 5.0, 1.0, 1.0, 0.0'
+
+PG_DOCUMENT = (
+    "to_tsvector('english', coalesce(job_applications_jobapplication.job_title, '') || ' ' || "
+    "coalesce(job_applications_jobapplication.company_name_manual, '') || ' ' || "
+    "coalesce(job_applications_jobapplication.job_description, '') || ' ' || "
+    "coalesce(job_applications_jobapplication.notes, ''))"
+)
+PG_HEADLINE_OPTIONS = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=25, MinWords=8, MaxFragments=2'
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r'\w+')
+
+_fts_available = {} # db alias -> bool
+
+
+def parse_query(text):
+    """
+    Splits a user query into terms: [(words, is_prefix)], where a phrase has several words.
+    Everything but word characters is dropped, so the result is safe to build backend syntax from.
+    """
+    terms = []
+    for match in _TERM_RE.finditer(text or ''):
+        phrase, token = match.groups()
+        if phrase is not None:
+            words = _WORD_RE.findall(phrase)
+            if words:
+                terms.append((words, False))
+            continue
+        words = _WORD_RE.findall(token)
+        if not words:
+            continue
+        # "c++-dev*" -> "c", "dev*": only the last word of a token can be a prefix
+        for word in words[:-1]:
+            terms.append(([word], False))
+        terms.append(([words[-1]], token.endswith('*')))
+    return terms
+
+
+def to_fts5_query(terms):
+    parts = []
+    for words, is_prefix in terms:
+        part = '"' + ' '.join(words) + '"'
+        parts.append(part + '*' if is_prefix else part)
+    return ' '.join(parts) # Implicit AND
+
+
+def to_tsquery(terms):
+    parts = []
+    for words, is_prefix in terms:
+        part = ' <-> '.join(words)
+        if is_prefix:
+            part += ':*'
+        parts.append(f'({part})' if len(words) > 1 else part)
+    return ' & '.join(parts)
+
+
+def fts_table_exists(using=DEFAULT_DB_ALIAS):
+    if using not in _fts_available:
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            _fts_available[using] = FTS_TABLE in connection.introspection.table_names(cursor)
+    return _fts_available[using]
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        return 'postgresql'
+    if vendor == 'sqlite' and fts_table_exists(using):
+        return 'sqlite'
+    return 'fallback'
+
+
+def search_applications(queryset, query, user=None):
+    """
+    Filters a JobApplication queryset down to the rows matching `query`, annotated with
+    `search_rank` and `search_snippet`. Pass `user` to restrict the index lookup to one user's rows.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return _annotate_unranked(queryset).none()
+    backend = get_backend(queryset.db)
+
+    if backend == 'sqlite':
+        match = to_fts5_query(terms)
+        ids_sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        ids_params = [match]
+        if user is not None:
+            ids_sql += ' AND user_id = %s'
+            ids_params.append(user.pk)
+        row_match = (f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                     f'AND {FTS_TABLE}.rowid = job_applications_jobapplication.id')
+        return queryset.filter(id__in=RawSQL(ids_sql, ids_params)).annotate(
+            search_rank=RawSQL(f'(SELECT -bm25({FTS_TABLE}, {FTS_WEIGHTS}) {row_match})', [match], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"(SELECT snippet({FTS_TABLE}, -1, %s, %s, '…', 16) {row_match})",
+                [HIGHLIGHT_START, HIGHLIGHT_END, match], output_field=TextField(),
+            ),
+        )
+
+    if backend == 'postgresql':
+        tsquery = "to_tsquery('english', %s)"
+        text = "coalesce(job_applications_jobapplication.job_description, '') || ' ' || coalesce(job_applications_jobapplication.notes, '')"
+        query_text = to_tsquery(terms)
+        return queryset.alias(
+            search_match=RawSQL(f'{PG_DOCUMENT} @@ {tsquery}', [query_text], output_field=BooleanField()),
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(f'ts_rank({PG_DOCUMENT}, {tsquery})', [query_text], output_field=FloatField()),
+            search_snippet=RawSQL(f"ts_headline('english', {text}, {tsquery}, %s)",
+                                  [query_text, PG_HEADLINE_OPTIONS], output_field=TextField()),
+        )
+
+    condition = Q()
+    for words, _ in terms:
+        needle = ' '.join(words)
+        condition &= (Q(job_title__icontains=needle) | Q(company__name__icontains=needle) |
+                      Q(company_name_manual__icontains=needle) | Q(job_description__icontains=needle) |
+                      Q(notes__icontains=needle))
+    return _annotate_unranked(queryset.filter(condition))
+
+
+def _annotate_unranked(queryset):
+    return queryset.annotate(
+        search_rank=Value(0.0, output_field=FloatField()),
+        search_snippet=Value('', output_field=TextField()),
+    )
+
+
+def highlight_html(snippet):
+    """Escapes a search snippet and turns the highlight markers into <mark> tags."""
+    if not snippet:
+        return ''
+    html = escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+    return mark_safe(html)
+
+
+# --- SQLite index maintenance (called from signals.py) ---
+
+def _index_row(application):
+    company = application.company.name if application.company_id else (application.company_name_manual or '')
+    return [application.pk, application.job_title or '', company, application.job_description or '',
+            application.notes or '', application.user_id]
+
+
+def index_application(application, using=DEFAULT_DB_ALIAS):
+    if get_backend(using) != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [application.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, job_title, company, job_description, notes, user_id) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            _index_row(application),
+        )
+
+
+def index_applications(applications, using=DEFAULT_DB_ALIAS):
+    """Re-indexes many applications at once (bulk paths that bypass the post_save signal)."""
+    if get_backend(using) != 'sqlite':
+        return
+    rows = [_index_row(application) for application in applications]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[row[0]] for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, job_title, company, job_description, notes, user_id) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def unindex_application(application_id, using=DEFAULT_DB_ALIAS):
+    if get_backend(using) != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [application_id])
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS, chunk_size=1000):
+    """Re-creates the SQLite index contents from the applications table. Returns the rows indexed."""
+    if get_backend(using) != 'sqlite':
+        return 0
+    from .models import JobApplication # Imported here: models' signal receivers import this module
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    indexed = 0
+    chunk = []
+    applications = JobApplication.objects.using(using).select_related('company').order_by('pk')
+    for application in applications.iterator(chunk_size=chunk_size):
+        chunk.append(application)
+        if len(chunk) >= chunk_size:
+            index_applications(chunk, using)
+            indexed += len(chunk)
+            chunk = []
+    index_applications(chunk, using)
+    indexed += len(chunk)
+    with connections[using].cursor() as cursor:
+        try:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        except OperationalError:
+            pass
+    return indexed
@@ -0,0 +1,87 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import search
+from .status_history import remove_application_from_rollups
+from .cache_versions import ANALYTICS, APPLICATION_COUNT, COMPANY_COUNT, COMPANY_INDEX, RANKING, bump_version
+from .models import Company, JobApplication, ResumeBlob
+
+
+@receiver(post_save, sender=JobApplication)
+def invalidate_rankings_on_save(sender, instance, created, **kwargs):
+    # save() records whether the job description changed; default to invalidating if it didn't run.
+    if created or getattr(instance, '_job_description_changed', True):
+        bump_version(RANKING, instance.user_id)
+
+
+@receiver(post_delete, sender=JobApplication)
+def invalidate_rankings_on_delete(sender, instance, **kwargs):
+    bump_version(RANKING, instance.user_id)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_application_count(sender, instance, **kwargs):
+    # Any save: filtered counts (e.g. by status) can change without a row being added or removed.
+    bump_version(APPLICATION_COUNT, instance.user_id)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_dashboard(sender, instance, **kwargs):
+    bump_version(ANALYTICS, instance.user_id)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_count(sender, instance, **kwargs):
+    bump_version(COMPANY_COUNT, instance.user_id)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_index(sender, instance, **kwargs):
+    bump_version(COMPANY_INDEX, instance.user_id)
+
+
+@receiver(post_save, sender=JobApplication)
+def update_search_index(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        search.index_application(instance, using=using)
+
+
+@receiver(post_delete, sender=JobApplication)
+def remove_from_search_index(sender, instance, using=None, **kwargs):
+    search.unindex_application(instance.pk, using=using)
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_applications(sender, instance, created, raw=False, using=None, **kwargs):
+    # The company name is indexed with each application, so a rename has to reach them.
+    if not created and not raw:
+        search.index_applications(instance.jobapplication_set.select_related('company'), using=using)
+
+
+@receiver(pre_delete, sender=Company)
+def remember_company_applications(sender, instance, **kwargs):
+    instance._application_ids = list(instance.jobapplication_set.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Company)
+def reindex_after_company_delete(sender, instance, using=None, **kwargs):
+    # Deleting a company nulls the FK with an UPDATE, which sends no post_save for the applications.
+    ids = getattr(instance, '_application_ids', None)
+    if ids:
+        search.index_applications(JobApplication.objects.using(using).filter(pk__in=ids).select_related('company'), using=using)
+
+
+@receiver(pre_delete, sender=JobApplication)
+def remove_from_status_rollups(sender, instance, **kwargs):
+    # Its transitions are cascade-deleted with it; keep the user's rollup in step.
+    remove_application_from_rollups(instance)
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_resume_file(sender, instance, **kwargs):
+    # The file itself may be shared with other applications; `resume_storage --cleanup` removes it once unreferenced.
+    ResumeBlob.objects.release(instance.resume_submitted.name if instance.resume_submitted else '')
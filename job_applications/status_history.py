@@ -0,0 +1,112 @@
+"""
+Maintenance helpers for the status history (StatusTransition) and its per-user rollups (StatusRollup,
+and FunnelRollup with each application's funnel_stage).
+
+Transitions are recorded by JobApplication.save(); these helpers cover the other paths: deleting
+an application, seeding history for rows that predate it, and rebuilding rollups from the log.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import STAGE_OF_STATUS, FunnelRollup, JobApplication, StatusRollup, StatusTransition
+
+
+def remove_application_from_rollups(application):
+    """Subtracts an application's transitions and funnel stages from its user's rollups (call before deleting it)."""
+    totals = (StatusTransition.objects.filter(application=application).order_by()
+              .values('from_status', 'to_status')
+              .annotate(count=Count('id'), timed=Count('duration'), total=Sum('duration')))
+    for row in totals:
+        StatusRollup.objects.filter(
+            user_id=application.user_id, from_status=row['from_status'], to_status=row['to_status'],
+        ).update(
+            transition_count=F('transition_count') - row['count'],
+            timed_count=F('timed_count') - row['timed'],
+            total_seconds=F('total_seconds') - (row['total'].total_seconds() if row['total'] else 0.0),
+        )
+    if totals:
+        FunnelRollup.objects.filter(
+            user_id=application.user_id, stage__lte=application.funnel_stage,
+        ).update(application_count=F('application_count') - 1)
+
+
+def rebuild_rollups(user_ids=None):
+    """Recomputes rollups from the transition log (all users, or only `user_ids`). Returns the rows written."""
+    transitions = StatusTransition.objects.order_by()
+    rollups = StatusRollup.objects.all()
+    if user_ids is not None:
+        transitions = transitions.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+    rows = [
+        StatusRollup(
+            user_id=row['user_id'], from_status=row['from_status'], to_status=row['to_status'],
+            transition_count=row['count'], timed_count=row['timed'],
+            total_seconds=row['total'].total_seconds() if row['total'] else 0.0,
+        )
+        for row in transitions.values('user_id', 'from_status', 'to_status')
+                              .annotate(count=Count('id'), timed=Count('duration'), total=Sum('duration'))
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        StatusRollup.objects.bulk_create(rows, batch_size=1000)
+        rows += _rebuild_funnel(transitions, user_ids)
+    return len(rows)
+
+
+def _furthest_stage():
+    """Aggregate: the furthest funnel stage among a group of transitions' to_status values."""
+    return Max(Case(
+        *[When(to_status=status, then=Value(stage)) for status, stage in STAGE_OF_STATUS.items()],
+        default=Value(0), output_field=IntegerField(),
+    ))
+
+
+def _rebuild_funnel(transitions, user_ids):
+    """Recomputes funnel_stage and the funnel rollups from the transition log; returns the rollup rows."""
+    per_application = transitions.values('application', 'user_id').annotate(stage=_furthest_stage())
+    applications = JobApplication.objects.all()
+    funnel_rollups = FunnelRollup.objects.all()
+    if user_ids is not None:
+        applications = applications.filter(user_id__in=user_ids)
+        funnel_rollups = funnel_rollups.filter(user_id__in=user_ids)
+    applications.update(funnel_stage=Coalesce(
+        Subquery(per_application.filter(application=OuterRef('pk')).values('stage')), 0,
+    ))
+    reached = Counter()
+    for user_id, stage in per_application.values_list('user_id', 'stage').iterator():
+        for reached_stage in range(stage + 1):
+            reached[user_id, reached_stage] += 1
+    rows = [FunnelRollup(user_id=user_id, stage=stage, application_count=count)
+            for (user_id, stage), count in reached.items()]
+    funnel_rollups.delete()
+    FunnelRollup.objects.bulk_create(rows, batch_size=1000)
+    return rows
+
+
+def backfill_history(chunk_size=1000):
+    """
+    Seeds one transition ('' -> current status, at creation time) for every application without
+    any history, then rebuilds the affected users' rollups. Returns (transitions created, users).
+    """
+    without_history = (JobApplication.objects
+                       .filter(~Exists(StatusTransition.objects.filter(application=OuterRef('pk'))))
+                       .order_by('pk')
+                       .values_list('id', 'user_id', 'status', 'created_at'))
+    created, user_ids, chunk = 0, set(), []
+    for pk, user_id, status, created_at in without_history.iterator(chunk_size=chunk_size):
+        chunk.append(StatusTransition(application_id=pk, user_id=user_id, from_status='', to_status=status,
+                                      changed_at=created_at))
+        user_ids.add(user_id)
+        if len(chunk) >= chunk_size:
+            StatusTransition.objects.bulk_create(chunk)
+            created += len(chunk)
+            chunk = []
+    if chunk:
+        StatusTransition.objects.bulk_create(chunk)
+        created += len(chunk)
+    if user_ids:
+        rebuild_rollups(user_ids)
+    return created, len(user_ids)
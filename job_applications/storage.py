@@ -0,0 +1,209 @@
+"""
+Content-addressed storage for uploaded resumes.
+
+An upload is hashed (SHA-256) while it is streamed to a temporary file next to its final location,
+then renamed to <upload_to>/<first two hex digits>/<hash><extension>. Attaching the same PDF to
+twenty applications therefore stores it once: every later upload of it finds the file already in
+place and just returns its name. Which names are still in use is tracked by ResumeBlob reference
+counts; unreferenced files are removed by `python manage.py resume_storage --cleanup`.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+TEMP_PREFIX = '.upload-' # Partially written uploads; stale ones are removed by --cleanup
+CLEANUP_BATCH_SIZE = 500 # Stored names checked per query when looking for orphaned files
+CONTENT_ADDRESSED_NAME = re.compile(r'^(?:.+/)?[0-9a-f]{2}/([0-9a-f]{64})(?:\.[\w-]+)?$')
+
+
+def content_hash_from_name(name):
+    """The SHA-256 encoded in a content-addressed name, or None for names stored another way."""
+    match = CONTENT_ADDRESSED_NAME.match(name or '')
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files after the SHA-256 of their content and stores each one once."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+        directory, filename = posixpath.split(str(name).replace('\\', '/'))
+        extension = os.path.splitext(filename)[1].lower()[:10]
+
+        temp_dir = self.path(directory) if directory else self.location
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, prefix=TEMP_PREFIX, suffix=extension)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            content_hash = digest.hexdigest()
+            name = posixpath.join(directory, content_hash[:2], content_hash + extension)
+            full_path = self.path(name)
+            self._touch(name, full_path) # Before the existence check: see cleanup_unreferenced()
+            if os.path.exists(full_path): # Already stored: keep the existing copy
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, full_path) # Atomic; a concurrent identical upload writes the same bytes
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        validate_file_name(name, allow_relative_path=True)
+        return name
+
+    def _touch(self, name, full_path):
+        """
+        Marks a stored file as just used: cleanup_unreferenced() only deletes files whose ResumeBlob and
+        modification time are both older than its grace period, and re-checks them before deleting.
+        """
+        from .models import ResumeBlob # models imports this module
+        ResumeBlob.objects.filter(name=name).update(updated_at=timezone.now())
+        try:
+            os.utime(full_path)
+        except FileNotFoundError:
+            pass
+
+
+resume_storage = ContentAddressedStorage()
+
+
+def get_resume_storage():
+    """JobApplication.resume_submitted's storage (a callable, so migrations don't serialise the instance)."""
+    return resume_storage
+
+
+# --- Maintenance (`python manage.py resume_storage`) ---
+# models imports this module, so the models are imported inside the functions.
+
+def _resume_directory():
+    from .models import JobApplication
+    return JobApplication._meta.get_field('resume_submitted').upload_to.rstrip('/')
+
+
+def _referenced_counts():
+    from .models import JobApplication
+    return dict(
+        JobApplication.objects.exclude(resume_submitted='').exclude(resume_submitted__isnull=True)
+        .order_by().values_list('resume_submitted').annotate(references=Count('id'))
+    )
+
+
+def recount_references():
+    """Rebuilds every ResumeBlob count from the applications. Returns the number of counts corrected."""
+    from .models import ResumeBlob
+    counts = _referenced_counts()
+    corrected = 0
+    for blob in ResumeBlob.objects.iterator():
+        expected = counts.pop(blob.name, 0)
+        if blob.ref_count != expected:
+            ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=expected, updated_at=timezone.now())
+            corrected += 1
+    for name, references in counts.items(): # Referenced but never registered
+        ResumeBlob.objects.acquire(name, count=references)
+        corrected += 1
+    return corrected
+
+
+def iter_stored_names(directory):
+    """Every file name under `directory` in the resume storage, depth first."""
+    if not resume_storage.exists(directory):
+        return
+    directories, files = resume_storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from iter_stored_names(posixpath.join(directory, subdirectory))
+
+
+def cleanup_unreferenced(grace_hours=None):
+    """
+    Deletes resume files no application has referenced for `grace_hours` (settings.RESUME_CLEANUP_GRACE_HOURS),
+    plus files that were never registered (uploads whose transaction rolled back, interrupted writes).
+    The grace period covers uploads that are stored but not yet attached to a committed application.
+    Returns the number of files deleted.
+    """
+    from .models import JobApplication, ResumeBlob
+    if grace_hours is None:
+        grace_hours = getattr(settings, 'RESUME_CLEANUP_GRACE_HOURS', 24)
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+    deleted = 0
+
+    unreferenced = list(ResumeBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).values_list('pk', 'name'))
+    for pk, name in unreferenced:
+        if JobApplication.objects.filter(resume_submitted=name).exists():
+            print(f"Resume file {name} is still referenced; run `resume_storage --recount` to fix its count.")
+            continue
+        # The row and the file go together: an upload of the same content waits in
+        # ContentAddressedStorage.save() (which touches the row, then the file, before checking the
+        # file exists) until this commits, and then stores the file again.
+        with transaction.atomic():
+            # Conditional, so a file re-acquired or touched since the SELECT above is kept
+            if not ResumeBlob.objects.filter(pk=pk, ref_count__lte=0, updated_at__lt=cutoff).delete()[0]:
+                continue
+            if resume_storage.exists(name) and resume_storage.get_modified_time(name) >= cutoff:
+                continue # Touched by an upload in flight; left to the unregistered-file pass below
+            resume_storage.delete(name)
+            deleted += 1
+
+    names = iter_stored_names(_resume_directory())
+    while True:
+        batch = [name for _, name in zip(range(CLEANUP_BATCH_SIZE), names)]
+        if not batch:
+            break
+        known = set(ResumeBlob.objects.filter(name__in=batch).values_list('name', flat=True))
+        known.update(JobApplication.objects.filter(resume_submitted__in=batch).values_list('resume_submitted', flat=True))
+        for name in batch:
+            if name not in known and resume_storage.get_modified_time(name) < cutoff:
+                resume_storage.delete(name)
+                deleted += 1
+    return deleted
+
+
+def migrate_legacy_resumes():
+    """
+    Moves resumes stored before content-addressed storage (resumes/%Y/%m/%d/<name>) to their content
+    hash names, so duplicates collapse into one file. Returns the number of files moved.
+    """
+    from .models import JobApplication, ResumeBlob
+    directory = _resume_directory()
+    moved = 0
+    for name, references in _referenced_counts().items():
+        if content_hash_from_name(name):
+            continue
+        try:
+            with resume_storage.open(name, 'rb') as legacy_file:
+                new_name = resume_storage.save(posixpath.join(directory, posixpath.basename(name)), legacy_file)
+        except OSError as e:
+            print(f"Error moving resume file {name}: {e}")
+            continue
+        with transaction.atomic():
+            # An UPDATE: the content is unchanged, so scores and cached text stay valid.
+            JobApplication.objects.filter(resume_submitted=name, resume_original_name='').update(
+                resume_original_name=posixpath.basename(name)[:255])
+            JobApplication.objects.filter(resume_submitted=name).update(resume_submitted=new_name)
+            ResumeBlob.objects.filter(name=name).delete()
+            ResumeBlob.objects.acquire(new_name, count=references)
+        resume_storage.delete(name)
+        moved += 1
+    return moved
@@ -0,0 +1,11 @@
+from django import template
+
+from ..search import highlight_html
+
+register = template.Library()
+
+
+@register.filter
+def highlight(snippet):
+    """Renders a search snippet with its matches wrapped in <mark>."""
+    return highlight_html(snippet)
@@ -1,3 +1,1455 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import smtplib
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import timedelta
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+import PyPDF2
+from django.core import mail, signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import embeddings, outbox, scoring_queue, search, text_cache, tfidf_model, utils
+from .analytics import get_dashboard_stats
+from .cache_versions import ANALYTICS, APPLICATION_COUNT, RANKING, get_version
+from .company_index import get_company_index, resolve_company
+from .documents import text_hash
+from .exporter import CONTENT_TYPES
+from .forms import JobApplicationForm
+from .importer import import_applications, iter_json_array_rows
+from .models import (Company, CustomUser, DocumentEmbedding, ExtractedText, FunnelRollup, JobApplication, OutgoingEmail,
+                     ResumeBlob, ScoringJob, StatusRollup, StatusTransition)
+from .outbox import process_outbox
+from .pagination import CURSOR_SALT
+from .reminders import due_applications, send_reminders
+from .scoring import score_texts
+from .status_history import rebuild_rollups
+from .storage import content_hash_from_name, iter_stored_names, resume_storage
+from .views import ApplicationListView
+
+
+class TrackerTestCase(TestCase):
+    """Shared fixtures: a user with a few companies and applications."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='owner@example.com', password='pw', is_active=True)
+        cls.companies = [Company.objects.create(user=cls.user, name=f'Company {i}', website=f'https://c{i}.example.com')
+                         for i in range(3)]
+        cls.applications = [
+            JobApplication.objects.create(
+                user=cls.user, company=cls.companies[i % 3] if i % 4 else None, company_name_manual=f'Manual {i}',
+                job_title=f'Engineer {i}', job_description='Long description. ' * 500, notes='Private notes. ' * 200,
+                application_source='LINKEDIN', status='APPLIED',
+            )
+            for i in range(6)
+        ]
+
+    def setUp(self):
+        cache.clear() # Cached counts/dashboards would otherwise change what the views query
+        self.client.force_login(self.user)
+
+
+def selected_columns(queries, table):
+    """Columns of `table` in the SELECT list of the first query loading rows from it (COUNTs are skipped)."""
+    for query in queries:
+        sql = query['sql']
+        if sql.startswith('SELECT') and f'FROM "{table}"' in sql:
+            columns = set(re.findall(rf'"{table}"\."(\w+)"', sql[:sql.index(f'FROM "{table}"')]))
+            if columns:
+                return columns
+    raise AssertionError(f'No SELECT from {table} was run.')
+
+
+class ListProjectionTests(TrackerTestCase):
+    """The list pages must not load the large text fields they never render."""
+    def test_application_list_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('job_applications:application_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Engineer 5')
+        self.assertEqual(selected_columns(ctx.captured_queries, 'job_applications_jobapplication'), {
+            'id', 'company_id', 'company_name_manual', 'job_title', 'application_source', 'applied_date',
+            'status', 'updated_at',
+        })
+
+    def test_application_list_search_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('job_applications:application_list'), {'q': 'engineer'})
+        self.assertEqual(response.status_code, 200)
+        columns = selected_columns(ctx.captured_queries, 'job_applications_jobapplication')
+        self.assertNotIn('job_description', columns)
+        self.assertNotIn('notes', columns)
+
+    def test_company_list_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('job_applications:company_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(selected_columns(ctx.captured_queries, 'job_applications_company'), {'id', 'name', 'website'})
+
+    def test_admin_changelist_columns(self):
+        admin_user = CustomUser.objects.create_superuser(email='admin@example.com', password='pw')
+        self.client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:job_applications_jobapplication_changelist'))
+        self.assertEqual(response.status_code, 200)
+        columns = selected_columns(ctx.captured_queries, 'job_applications_jobapplication')
+        self.assertEqual(columns, {
+            'id', 'user_id', 'company_id', 'company_name_manual', 'job_title', 'application_source', 'applied_date',
+            'status', 'updated_at', 'resume_submitted', 'resume_match_score',
+        })
+
+
+class QueryCountTests(TrackerTestCase):
+    """The number of queries behind each list and detail page must not grow with the number of rows."""
+    def add_rows(self, count=10):
+        other = CustomUser.objects.create_user(email=f'other{CustomUser.objects.count()}@example.com', password='pw')
+        for owner in (self.user, other):
+            for i in range(count):
+                company = Company.objects.create(user=owner, name=f'Added {owner.pk}-{i}')
+                JobApplication.objects.create(user=owner, company=company if i % 2 else None,
+                                              company_name_manual=f'Manual added {i}', job_title=f'Added {i}')
+
+    def assertConstantQueries(self, url, params=None):
+        self.client.get(url, params) # Warm-up: one-off lookups (e.g. content types) are cached process-wide
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        self.add_rows()
+        cache.clear()
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+
+    def login_superuser(self):
+        self.client.force_login(CustomUser.objects.create_superuser(email='admin@example.com', password='pw'))
+
+    def test_application_list(self):
+        self.assertConstantQueries(reverse('job_applications:application_list'))
+
+    def test_application_search(self):
+        self.assertConstantQueries(reverse('job_applications:application_list'), {'q': 'added OR engineer'})
+
+    def test_company_list(self):
+        self.assertConstantQueries(reverse('job_applications:company_list'))
+
+    def test_dashboard(self):
+        self.assertConstantQueries(reverse('job_applications:dashboard'))
+
+    def test_application_detail(self):
+        self.assertConstantQueries(reverse('job_applications:application_detail', args=[self.applications[1].pk]))
+
+    def test_application_update_form(self):
+        self.assertConstantQueries(reverse('job_applications:application_update', args=[self.applications[1].pk]))
+
+    def test_admin_application_changelist(self):
+        self.login_superuser()
+        self.assertConstantQueries(reverse('admin:job_applications_jobapplication_changelist'))
+
+    def test_admin_application_changelist_filtered(self):
+        self.login_superuser()
+        self.assertConstantQueries(reverse('admin:job_applications_jobapplication_changelist'),
+                                   {'user__id__exact': self.user.pk, 'company__id__exact': self.companies[0].pk})
+
+    def test_admin_company_changelist(self):
+        self.login_superuser()
+        self.assertConstantQueries(reverse('admin:job_applications_company_changelist'))
+
+    def test_admin_application_change(self):
+        self.login_superuser()
+        self.assertConstantQueries(reverse('admin:job_applications_jobapplication_change', args=[self.applications[1].pk]))
+
+    def test_admin_company_change(self):
+        self.login_superuser()
+        self.assertConstantQueries(reverse('admin:job_applications_company_change', args=[self.companies[0].pk]))
+
+    def test_admin_user_filter_is_autocomplete(self):
+        self.add_rows(count=1)
+        self.login_superuser()
+        response = self.client.get(reverse('admin:job_applications_jobapplication_changelist'),
+                                   {'user__id__exact': self.user.pk})
+        self.assertContains(response, 'data-field-name="user"')
+        self.assertContains(response, 'owner@example.com') # The selected user labels the widget
+        self.assertNotContains(response, 'other') # Other users' emails are not listed in the sidebar
+
+
+class OwnedObjectTests(TrackerTestCase):
+    """Detail/edit/delete pages fetch their object once, scoped to the owner in SQL."""
+    def object_queries(self, url, table, method='get', data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data)
+        return response, [query['sql'] for query in ctx.captured_queries
+                          if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']]
+
+    def assertSingleOwnedFetch(self, url, table):
+        response, queries = self.object_queries(url, table)
+        self.assertEqual(response.status_code, 200)
+        queries = [sql for sql in queries if f'"{table}"."id" = ' in sql] # Fetches of the object itself
+        self.assertEqual(len(queries), 1, queries)
+        self.assertIn(f'"{table}"."user_id" = {self.user.pk}', queries[0])
+        return queries[0]
+
+    def test_application_views(self):
+        application = self.applications[1]
+        for name in ('application_detail', 'application_update', 'application_delete'):
+            with self.subTest(name):
+                sql = self.assertSingleOwnedFetch(reverse(f'job_applications:{name}', args=[application.pk]),
+                                                  'job_applications_jobapplication')
+                self.assertIn('JOIN "job_applications_company"', sql)
+
+    def test_company_views(self):
+        for name in ('company_update', 'company_delete'):
+            with self.subTest(name):
+                self.assertSingleOwnedFetch(reverse(f'job_applications:{name}', args=[self.companies[0].pk]),
+                                            'job_applications_company')
+
+    def test_application_update_post(self):
+        application = self.applications[1]
+        response, queries = self.object_queries(
+            reverse('job_applications:application_update', args=[application.pk]), 'job_applications_jobapplication',
+            method='post', data={'job_title': 'Renamed', 'company': application.company_id, 'company_name_manual': '',
+                                 'application_source': 'LINKEDIN', 'applied_date': '2026-01-05', 'status': 'APPLIED'},
+        )
+        self.assertRedirects(response, reverse('job_applications:application_list'), fetch_redirect_response=False)
+        self.assertEqual(len([sql for sql in queries if '"user_id" = ' in sql]), 1) # The owned fetch, not repeated
+        application.refresh_from_db()
+        self.assertEqual(application.job_title, 'Renamed')
+
+    def test_other_users_objects_are_not_found(self):
+        other = CustomUser.objects.create_user(email='intruder@example.com', password='pw', is_active=True)
+        self.client.force_login(other)
+        for url in (reverse('job_applications:application_detail', args=[self.applications[0].pk]),
+                    reverse('job_applications:application_update', args=[self.applications[0].pk]),
+                    reverse('job_applications:application_delete', args=[self.applications[0].pk]),
+                    reverse('job_applications:company_update', args=[self.companies[0].pk]),
+                    reverse('job_applications:company_delete', args=[self.companies[0].pk])):
+            with self.subTest(url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.post(reverse('job_applications:application_delete', args=[self.applications[0].pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(JobApplication.objects.filter(pk=self.applications[0].pk).exists())
+
+
+@override_settings(REMINDER_RULES={'APPLIED': 14, 'INTERVIEW_R1': 7}, REMINDER_REPEAT_DAYS=7)
+class ReminderTests(TestCase):
+    """send_reminders against Django's locmem email backend (installed by the test runner)."""
+    def setUp(self):
+        self.now = timezone.now()
+
+    def make_application(self, user, status='APPLIED', days_in_status=20, reminded_days_ago=None, title='Engineer'):
+        application = JobApplication.objects.create(user=user, company_name_manual='Acme', job_title=title, status=status)
+        JobApplication.objects.filter(pk=application.pk).update(
+            status_changed_at=self.now - timedelta(days=days_in_status),
+            last_reminder_sent_date=(timezone.localdate(self.now) - timedelta(days=reminded_days_ago)
+                                     if reminded_days_ago is not None else None),
+        )
+        return application
+
+    def make_user(self, email, **kwargs):
+        return CustomUser.objects.create_user(email=email, password='pw', is_active=kwargs.pop('is_active', True), **kwargs)
+
+    def test_due_rules(self):
+        user = self.make_user('a@example.com')
+        due = [
+            self.make_application(user, 'APPLIED', days_in_status=20),
+            self.make_application(user, 'INTERVIEW_R1', days_in_status=8),
+            self.make_application(user, 'APPLIED', days_in_status=30, reminded_days_ago=10),
+        ]
+        self.make_application(user, 'APPLIED', days_in_status=5) # Too recent
+        self.make_application(user, 'REJECTED', days_in_status=100) # No rule for the status
+        self.make_application(user, 'APPLIED', days_in_status=30, reminded_days_ago=2) # Reminded recently
+        self.make_application(self.make_user('off@example.com', is_active=False)) # Inactive user
+        self.assertEqual(set(due_applications(self.now).values_list('pk', flat=True)), {a.pk for a in due})
+
+    def test_one_digest_per_user_and_stamping(self):
+        first, second = self.make_user('first@example.com'), self.make_user('second@example.com')
+        first_apps = [self.make_application(first, title=f'First {i}') for i in range(3)]
+        second_app = self.make_application(second, 'INTERVIEW_R1', days_in_status=9, title='Second job')
+
+        result = send_reminders(now=self.now)
+        self.assertEqual((result.users, result.sent, result.stamped, result.failed), (2, 2, 4, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['first@example.com', 'second@example.com'])
+        digest = next(message for message in mail.outbox if message.to == ['first@example.com'])
+        self.assertEqual(digest.subject, 'Follow up on 3 job applications')
+        for application in first_apps:
+            self.assertIn(application.job_title, digest.body)
+            self.assertIn(reverse('job_applications:application_detail', args=[application.pk]), digest.body)
+        self.assertIn('Second job', mail.outbox[[m.to for m in mail.outbox].index(['second@example.com'])].alternatives[0][0])
+
+        today = timezone.localdate(self.now)
+        updated_at = JobApplication.objects.get(pk=second_app.pk).updated_at
+        self.assertEqual(set(JobApplication.objects.values_list('last_reminder_sent_date', flat=True)), {today})
+        self.assertEqual(JobApplication.objects.get(pk=second_app.pk).updated_at, updated_at)
+
+        mail.outbox.clear()
+        self.assertEqual(send_reminders(now=self.now).sent, 0) # Nothing is due again until REMINDER_REPEAT_DAYS pass
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(send_reminders(now=self.now + timedelta(days=8)).sent, 2)
+
+    def test_chunks_and_batches_over_one_connection(self):
+        users = [self.make_user(f'user{i}@example.com') for i in range(5)]
+        for i, user in enumerate(users):
+            for j in range(i + 1):
+                self.make_application(user, 'APPLIED' if j % 2 else 'INTERVIEW_R1', days_in_status=20 + j)
+        connection = mail.get_connection()
+        with mock.patch.object(connection, 'open', wraps=connection.open) as opened:
+            # Chunks of 2 rows split most users across queries; batches of 2 digests stamp in several steps.
+            result = send_reminders(now=self.now, chunk_size=2, batch_size=2, connection=connection)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual((result.users, result.sent, result.stamped), (5, 5, 15))
+        subjects = {message.to[0]: message.subject for message in mail.outbox}
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(subjects['user4@example.com'], 'Follow up on 5 job applications')
+        self.assertEqual(subjects['user0@example.com'], 'Follow up on 1 job application')
+
+    def test_failed_digest_is_not_stamped(self):
+        good, bad = self.make_user('good@example.com'), self.make_user('bad@example.com')
+        good_app, bad_app = self.make_application(good), self.make_application(bad)
+        connection = mail.get_connection()
+        original_send = connection.send_messages
+
+        def send_messages(messages):
+            if messages[0].to == ['bad@example.com']:
+                raise OSError('Mailbox unavailable')
+            return original_send(messages)
+
+        with mock.patch.object(connection, 'send_messages', side_effect=send_messages):
+            result = send_reminders(now=self.now, connection=connection)
+        self.assertEqual((result.sent, result.failed), (1, 1))
+        self.assertIsNotNone(JobApplication.objects.get(pk=good_app.pk).last_reminder_sent_date)
+        self.assertIsNone(JobApplication.objects.get(pk=bad_app.pk).last_reminder_sent_date)
+
+    def test_failed_reconnect_still_stamps_sent_digests(self):
+        first, bad, last = (self.make_user(f'{name}@example.com') for name in ('first', 'bad', 'last'))
+        first_app, bad_app, last_app = (self.make_application(user) for user in (first, bad, last))
+        connection = mail.get_connection()
+        original_send = connection.send_messages
+
+        def send_messages(messages):
+            if messages[0].to == ['bad@example.com']:
+                raise OSError('Connection dropped')
+            return original_send(messages)
+
+        with mock.patch.object(connection, 'send_messages', side_effect=send_messages), \
+                mock.patch.object(connection, 'open', side_effect=[None, OSError('Connection refused')]):
+            result = send_reminders(now=self.now, connection=connection)
+        self.assertEqual((result.sent, result.failed, result.stamped), (2, 1, 2))
+        self.assertEqual(set(JobApplication.objects.filter(last_reminder_sent_date__isnull=False).values_list('pk', flat=True)),
+                         {first_app.pk, last_app.pk})
+
+    def test_command_dry_run(self):
+        self.make_application(self.make_user('a@example.com'))
+        call_command('send_reminders', '--dry-run', stdout=io.StringIO())
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(JobApplication.objects.filter(last_reminder_sent_date__isnull=False).exists())
+        call_command('send_reminders', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class SimilarApplicationsTests(TrackerTestCase):
+    """The similar-postings page only reads stored embeddings and the saved index; it never builds or encodes."""
+    def setUp(self):
+        super().setUp()
+        import tempfile
+        from . import ann_index
+        self.ann_index = ann_index
+        self.index_path = f'{tempfile.mkdtemp()}/jd_index.npz'
+        settings_override = override_settings(JD_INDEX_PATH=self.index_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for patch in (
+            mock.patch.object(ann_index, '_index', None),
+            mock.patch.object(ann_index, '_index_mtime', None),
+            mock.patch.object(ann_index, '_reloading', False),
+            mock.patch.object(ann_index, 'get_sentence_model', side_effect=AssertionError('model loaded')),
+            mock.patch.object(ann_index, 'build_index', side_effect=AssertionError('index built')),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def store_embeddings(self, directions):
+        """Gives applications[i] a JD embedding along directions[i] (unit vectors in 3 dimensions)."""
+        import numpy as np
+        from .embeddings import vector_to_bytes
+        from .models import DocumentEmbedding
+        from .utils import get_sentence_model_name
+        for application, direction in zip(self.applications, directions):
+            application.job_description = f'Job description {application.pk}'
+            application.save() # Recomputes job_description_hash
+            vector = np.asarray(direction, dtype=np.float32)
+            DocumentEmbedding.objects.create(content_hash=application.job_description_hash, model_name=get_sentence_model_name(),
+                                             dimensions=3, vector=vector_to_bytes(vector / np.linalg.norm(vector)))
+
+    def similar_ids(self):
+        response = self.client.get(reverse('job_applications:application_similar', args=[self.applications[0].pk]),
+                                   {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_brute_force_over_own_rows_without_index(self):
+        self.store_embeddings([(1, 0, 0), (0, 1, 0), (1, 0.1, 0), (1, 1, 0)]) # applications[4:] have no embedding
+        other = CustomUser.objects.create_user(email='other@example.com', password='pw')
+        JobApplication.objects.create(user=other, company_name_manual='X', job_title='Copy',
+                                      job_description=self.applications[0].job_description) # Same JD, other user
+        self.assertEqual(self.similar_ids(), [self.applications[2].pk, self.applications[3].pk, self.applications[1].pk])
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_reads_saved_index(self):
+        import numpy as np
+        from .utils import get_sentence_model_name
+        self.store_embeddings([(1, 0, 0), (0, 1, 0), (1, 0.1, 0)])
+        index = self.ann_index.JobDescriptionIndex(3, model_name=get_sentence_model_name())
+        index.add(self.applications[1].pk, self.user.pk, np.asarray([0, 1, 0], dtype=np.float32))
+        index.save(self.index_path) # applications[2] is not indexed yet
+        self.assertEqual(self.similar_ids(), [self.applications[1].pk])
+
+    def test_unembedded_posting_has_no_results(self):
+        self.assertEqual(self.similar_ids(), [])
+
+    def test_load_builds_the_same_buckets_as_add(self):
+        import numpy as np
+        rng = np.random.default_rng(1)
+        index = self.ann_index.JobDescriptionIndex(16, n_tables=4, n_bits=6)
+        for pk in range(1, 301):
+            index.add(pk, pk % 3, rng.standard_normal(16).astype(np.float32), f'hash{pk}')
+        index.remove(7)
+        index.save(self.index_path)
+        expected = self.ann_index.JobDescriptionIndex(16, n_tables=4, n_bits=6)
+        for row, pk in enumerate(pk for pk in range(1, 301) if pk != 7):
+            expected.add(pk, pk % 3, index.matrix[row if pk < 7 else row + 1], f'hash{pk}')
+        with mock.patch.object(self.ann_index.JobDescriptionIndex, 'add', side_effect=AssertionError('add() per row')):
+            loaded = self.ann_index.JobDescriptionIndex.load(self.index_path)
+            saved = dict(np.load(self.index_path))
+            del saved['codes'] # A file saved before the codes were: they are computed in one pass
+            np.savez(self.index_path, **saved)
+            without_codes = self.ann_index.JobDescriptionIndex.load(self.index_path)
+        for candidate in (loaded, without_codes):
+            self.assertEqual(candidate._row_by_application, expected._row_by_application)
+            self.assertEqual(candidate._rows_by_user, expected._rows_by_user)
+            self.assertEqual([dict(buckets) for buckets in candidate._buckets], [dict(buckets) for buckets in expected._buckets])
+            self.assertEqual(candidate.content_hash_for(300), 'hash300')
+            self.assertEqual(candidate.query(expected.matrix[5], k=3, user_id=1), expected.query(expected.matrix[5], k=3, user_id=1))
+
+    def test_requests_reload_a_newer_index_in_the_background(self):
+        import threading
+        import numpy as np
+        from .utils import get_sentence_model_name
+        first = self.ann_index.JobDescriptionIndex(3, model_name=get_sentence_model_name())
+        first.save(self.index_path)
+        self.assertEqual(len(self.ann_index.get_index(sync=False)), 0) # First use loads in the request
+        second = self.ann_index.JobDescriptionIndex(3, model_name=get_sentence_model_name())
+        second.add(self.applications[1].pk, self.user.pk, np.asarray([0, 1, 0], dtype=np.float32))
+        second.save(self.index_path)
+        os.utime(self.index_path, (time.time() + 10, time.time() + 10))
+        self.assertEqual(len(self.ann_index.get_index(sync=False)), 0) # Still the loaded one
+        for thread in threading.enumerate():
+            if thread.name == 'jd-index-reload':
+                thread.join()
+        self.assertEqual(len(self.ann_index.get_index(sync=False)), 1)
+
+
+class StatusHistoryTests(TestCase):
+    """StatusTransition log and StatusRollup totals kept by JobApplication.save(), and the dashboard funnel."""
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='history@example.com', password='pw')
+
+    def move(self, application, status, days_later):
+        application.status_changed_at -= timedelta(days=days_later) # As if the current status began days_later days ago
+        application.status = status
+        application.save()
+
+    def rollups(self):
+        return {(row.from_status, row.to_status): (row.transition_count, row.timed_count, round(row.total_seconds))
+                for row in StatusRollup.objects.filter(user=self.user) if row.transition_count}
+
+    def test_save_records_transitions_and_rollups(self):
+        application = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Dev')
+        self.move(application, 'INTERVIEW_R1', days_later=3)
+        application.notes = 'No status change'
+        application.save()
+        self.assertEqual(list(application.status_transitions.values_list('from_status', 'to_status')),
+                         [('', 'APPLIED'), ('APPLIED', 'INTERVIEW_R1')])
+        self.assertAlmostEqual(application.status_transitions.last().duration.total_seconds(), 3 * 86400, delta=5)
+        self.assertEqual(self.rollups(), {('', 'APPLIED'): (1, 0, 0), ('APPLIED', 'INTERVIEW_R1'): (1, 1, 3 * 86400)})
+
+    def test_delete_and_rebuild(self):
+        kept = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Kept')
+        deleted = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Deleted')
+        self.move(kept, 'REJECTED', days_later=1)
+        self.move(deleted, 'REJECTED', days_later=2)
+        deleted.delete()
+        incremental = self.rollups()
+        self.assertEqual(incremental, {('', 'APPLIED'): (1, 0, 0), ('APPLIED', 'REJECTED'): (1, 1, 86400)})
+        rebuild_rollups([self.user.pk])
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_funnel_counts_each_application_once(self):
+        bouncing = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Bouncing')
+        for status in ('INTERVIEW_R1', 'APPLIED', 'INTERVIEW_R2', 'OFFER_RECEIVED'):
+            self.move(bouncing, status, days_later=1)
+        skipping = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Skipping')
+        self.move(skipping, 'OFFER_RECEIVED', days_later=1) # Straight to an offer: counts for Interview too
+        for i in range(2):
+            JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title=f'Waiting {i}')
+        with CaptureQueriesContext(connection) as queries:
+            funnel = get_dashboard_stats(self.user)['funnel']
+        self.assertEqual(funnel, [('Applied', 4, None), ('Interview', 2, 50.0), ('Offer', 2, 100.0)])
+        # The funnel reads the per-stage rollup; only the median response time touches the log
+        self.assertEqual(len([q for q in queries if 'job_applications_statustransition' in q['sql']]), 1)
+
+    def test_funnel_rollup_survives_delete_and_rebuild(self):
+        offered = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Offered')
+        self.move(offered, 'OFFER_RECEIVED', days_later=1)
+        self.move(offered, 'REJECTED', days_later=1) # Moving back out keeps the stages it reached
+        interviewed = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Interviewed')
+        self.move(interviewed, 'INTERVIEW_R1', days_later=1)
+        deleted = JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Deleted')
+        self.move(deleted, 'OFFER_ACCEPTED', days_later=1)
+        deleted.delete()
+        self.assertEqual(JobApplication.objects.get(pk=offered.pk).funnel_stage, 2)
+        incremental = dict(FunnelRollup.objects.filter(user=self.user).values_list('stage', 'application_count'))
+        self.assertEqual(incremental, {0: 2, 1: 2, 2: 1})
+        JobApplication.objects.update(funnel_stage=0)
+        rebuild_rollups([self.user.pk])
+        self.assertEqual(dict(FunnelRollup.objects.filter(user=self.user).values_list('stage', 'application_count')),
+                         incremental)
+        self.assertEqual(JobApplication.objects.get(pk=offered.pk).funnel_stage, 2)
+
+
+class ExtractedTextCacheTests(TestCase):
+    """Resume text cached by content hash, refreshed for new extractor versions and pruned least-recently-used first."""
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.object(text_cache, 'get_text_from_file', side_effect=lambda path: f'Text of {os.path.basename(path)}')
+        self.extract = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_identical_files_are_extracted_once(self):
+        first = self.write('a.pdf', b'same resume')
+        second = self.write('b.pdf', b'same resume')
+        self.assertEqual(text_cache.get_resume_text(first), 'Text of a.pdf')
+        self.assertEqual(text_cache.get_resume_text(second), 'Text of a.pdf')
+        self.assertEqual(self.extract.call_count, 1)
+        self.assertEqual(text_cache.get_resume_text(second, refresh=True), 'Text of b.pdf')
+        self.assertEqual(ExtractedText.objects.get().text, 'Text of b.pdf')
+
+    def test_old_extractor_version_is_refreshed(self):
+        path = self.write('a.pdf', b'resume')
+        ExtractedText.objects.create(content_hash=text_cache.hash_file(path), extractor_version=text_cache.TEXT_EXTRACTOR_VERSION - 1,
+                                     text='stale', text_length=5, last_used_at=timezone.now())
+        self.assertEqual(text_cache.get_resume_text(path), 'Text of a.pdf')
+        self.assertEqual(ExtractedText.objects.get().extractor_version, text_cache.TEXT_EXTRACTOR_VERSION)
+
+    @override_settings(RESUME_TEXT_CACHE_MAX_ENTRIES=2, RESUME_TEXT_CACHE_PRUNE_EVERY=4)
+    def test_prunes_least_recently_used_every_few_stores(self):
+        for i in range(2):
+            text_cache.store_text(f'{i:064x}', f'text {i}')
+        ExtractedText.objects.filter(content_hash=f'{0:064x}').update(last_used_at=timezone.now() - timedelta(days=1))
+        with CaptureQueriesContext(connection) as queries:
+            text_cache.store_text(f'{2:064x}', 'text 2') # Over the limit, but not due a prune yet
+        self.assertNotIn('DELETE', ' '.join(query['sql'] for query in queries))
+        self.assertEqual(ExtractedText.objects.count(), 3)
+        text_cache.store_text(f'{3:064x}', 'text 3')
+        self.assertEqual(sorted(ExtractedText.objects.values_list('text', flat=True)), ['text 2', 'text 3'])
+
+
+class ScoringQueueTests(TestCase):
+    """ScoringJob queueing: one pending job per application, retries with backoff, then FAILED."""
+    def setUp(self):
+        user = CustomUser.objects.create_user(email='scoring@example.com', password='pw')
+        self.application = JobApplication.objects.create(user=user, company_name_manual='Acme', job_title='Dev')
+
+    def test_enqueue_keeps_one_pending_job(self):
+        ScoringJob.objects.enqueue(self.application.pk)
+        ScoringJob.objects.enqueue(self.application.pk)
+        self.assertEqual(ScoringJob.objects.filter(status=ScoringJob.STATUS_PENDING).count(), 1)
+        job = scoring_queue.claim_next_job()
+        self.assertEqual((job.status, job.attempts), (ScoringJob.STATUS_RUNNING, 1))
+        ScoringJob.objects.enqueue(self.application.pk) # A change while the job runs still gets scored afterwards
+        self.assertEqual(ScoringJob.objects.filter(status=ScoringJob.STATUS_PENDING).count(), 1)
+        self.assertEqual(ScoringJob.objects.count(), 2)
+
+    @override_settings(SCORING_JOB_MAX_ATTEMPTS=2, SCORING_JOB_RETRY_BACKOFF=30)
+    def test_failures_back_off_then_fail(self):
+        ScoringJob.objects.enqueue(self.application.pk)
+        job = scoring_queue.claim_next_job()
+        before = timezone.now()
+        scoring_queue._record_failure(job, 'boom')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), (ScoringJob.STATUS_PENDING, 'boom'))
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=30))
+        self.assertIsNone(scoring_queue.claim_next_job()) # Not due until the backoff has passed
+
+        ScoringJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        job = scoring_queue.claim_next_job()
+        scoring_queue._record_failure(job, 'boom again')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ScoringJob.STATUS_FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_superseded_by_newer_job(self):
+        ScoringJob.objects.enqueue(self.application.pk)
+        job = scoring_queue.claim_next_job()
+        ScoringJob.objects.enqueue(self.application.pk)
+        scoring_queue._record_failure(job, 'boom')
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScoringJob.STATUS_FAILED)
+        self.assertIn('Superseded', job.last_error)
+        self.assertEqual(ScoringJob.objects.filter(status=ScoringJob.STATUS_PENDING).count(), 1)
+
+    def test_backoff_is_capped(self):
+        with self.settings(SCORING_JOB_RETRY_BACKOFF=30, SCORING_JOB_RETRY_BACKOFF_MAX=100):
+            self.assertEqual([scoring_queue.get_retry_delay(n).total_seconds() for n in (1, 2, 3, 4)], [30, 60, 100, 100])
+
+
+class ChangeTrackingTests(TestCase):
+    """JobApplication.save() rescoring only when the JD or resume changed, without re-reading the row."""
+    def setUp(self):
+        user = CustomUser.objects.create_user(email='tracking@example.com', password='pw')
+        with self.captureOnCommitCallbacks(execute=True):
+            created = JobApplication.objects.create(user=user, company_name_manual='Acme', job_title='Dev',
+                                                    job_description='Python', resume_submitted='resumes/cv.pdf')
+        ScoringJob.objects.all().delete()
+        JobApplication.objects.filter(pk=created.pk).update(resume_match_score=80.0)
+        self.application = JobApplication.objects.get(pk=created.pk)
+
+    def save(self):
+        """Saves the application; returns the queries run before its UPDATE (the search index is refreshed after)."""
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self.application.save()
+        sql = [query['sql'] for query in queries]
+        return sql[:next(i for i, statement in enumerate(sql) if statement.startswith('UPDATE'))]
+
+    def test_unrelated_change_keeps_score(self):
+        self.application.notes = 'Called back'
+        self.assertEqual(self.save(), [])
+        self.assertEqual(JobApplication.objects.get(pk=self.application.pk).resume_match_score, 80.0)
+        self.assertFalse(ScoringJob.objects.exists())
+
+    def test_description_change_clears_score_and_queues_job(self):
+        self.application.job_description = 'Python and Django'
+        self.assertEqual(self.save(), [])
+        self.assertIsNone(JobApplication.objects.get(pk=self.application.pk).resume_match_score)
+        self.assertEqual(list(ScoringJob.objects.values_list('application_id', flat=True)), [self.application.pk])
+
+    def test_partial_save_leaves_description_change_for_a_later_save(self):
+        self.application.job_description = 'Python and Django'
+        self.application.notes = 'Only the notes are saved'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.application.save(update_fields=['notes'])
+        stored = JobApplication.objects.get(pk=self.application.pk)
+        self.assertEqual((stored.job_description, stored.job_description_hash, stored.resume_match_score),
+                         ('Python', text_hash('Python'), 80.0))
+        self.assertFalse(ScoringJob.objects.exists())
+        self.save()
+        self.assertTrue(self.application._job_description_changed)
+        self.assertEqual(JobApplication.objects.get(pk=self.application.pk).job_description_hash, text_hash('Python and Django'))
+        self.assertEqual(ScoringJob.objects.count(), 1)
+
+    def test_unloaded_instance_falls_back_to_one_query(self):
+        loaded = self.application
+        self.application = JobApplication(**{field.attname: getattr(loaded, field.attname) for field in JobApplication._meta.concrete_fields})
+        self.application._state.adding = False
+        self.application.notes = 'Rebuilt'
+        queries = self.save()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"job_description_hash"', queries[0])
+        self.assertFalse(ScoringJob.objects.exists())
+
+
+class DocumentEmbeddingCacheTests(TestCase):
+    """Embeddings are stored per content hash and model, so each distinct text is encoded once."""
+    def setUp(self):
+        import numpy as np
+        self.model = mock.Mock()
+        self.model.encode.side_effect = lambda texts, **kwargs: np.asarray([[len(text), 1.0] for text in texts])
+        for patch in (mock.patch.object(embeddings, 'get_sentence_model', return_value=self.model),
+                      mock.patch.object(embeddings, 'get_sentence_model_name', return_value='test-model')):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def encoded_texts(self):
+        return [text for call in self.model.encode.call_args_list for text in call.args[0]]
+
+    def test_encodes_only_missing_texts(self):
+        first = embeddings.get_embeddings(['Python developer', 'Go developer', 'Python developer'])
+        self.assertEqual(first.shape, (3, 2))
+        self.assertEqual(self.encoded_texts(), ['Python developer', 'Go developer'])
+        second = embeddings.get_embeddings(['Go developer', 'Rust developer'])
+        self.assertEqual(self.encoded_texts(), ['Python developer', 'Go developer', 'Rust developer'])
+        self.assertEqual(second[0].tolist(), first[1].tolist())
+        self.assertEqual(DocumentEmbedding.objects.filter(model_name='test-model').count(), 3)
+
+    def test_stored_embeddings_are_per_model(self):
+        embeddings.get_embeddings(['Python developer'])
+        content_hash = DocumentEmbedding.objects.get().content_hash
+        self.assertEqual(list(embeddings.get_stored_embeddings([content_hash])), [content_hash])
+        with mock.patch.object(embeddings, 'get_sentence_model_name', return_value='other-model'):
+            self.assertEqual(embeddings.get_stored_embeddings([content_hash]), {})
+            embeddings.get_embeddings(['Python developer'])
+        self.assertEqual(self.model.encode.call_count, 2)
+
+
+class TfidfModelTests(TestCase):
+    """The corpus TF-IDF model is fitted once, saved, loaded once per process and reloaded when the file changes."""
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        preprocessor = mock.Mock()
+        preprocessor.process_many.side_effect = lambda texts: (text.lower() for text in texts)
+        settings_override = override_settings(RESUME_MATCH_TFIDF_MODEL_PATH=os.path.join(directory, 'tfidf.joblib'),
+                                              RESUME_MATCH_TFIDF_REFIT_AFTER_DOCS=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for patch in (mock.patch.object(tfidf_model, 'get_text_preprocessor', return_value=preprocessor), # No NLTK data needed
+                      mock.patch.object(tfidf_model, '_cached_model', None),
+                      mock.patch.object(tfidf_model, '_cached_model_mtime', None)):
+            patch.start()
+            self.addCleanup(patch.stop)
+        user = CustomUser.objects.create_user(email='tfidf@example.com', password='pw')
+        for description in ('Python Django developer', 'Go backend engineer'):
+            JobApplication.objects.create(user=user, company_name_manual='Acme', job_title='Dev', job_description=description)
+
+    def test_fit_load_and_staleness(self):
+        self.assertIsNone(tfidf_model.get_tfidf_model())
+        self.assertTrue(tfidf_model.is_model_stale())
+        self.assertEqual(tfidf_model.fit_tfidf_model()['document_count'], 2)
+        model = tfidf_model.get_tfidf_model()
+        with mock.patch.object(tfidf_model.joblib, 'load', side_effect=AssertionError('reloaded')):
+            self.assertIs(tfidf_model.get_tfidf_model(), model)
+        self.assertFalse(tfidf_model.is_model_stale(model))
+        ExtractedText.objects.bulk_create(ExtractedText(content_hash=f'{i:064x}', extractor_version=1, text='python resume',
+                                                        text_length=13, last_used_at=timezone.now()) for i in range(2))
+        self.assertTrue(tfidf_model.is_model_stale(model))
+
+    def test_scores_with_corpus_model(self):
+        tfidf_model.fit_tfidf_model()
+        self.assertGreater(score_texts('Python Django developer', 'python developer'), score_texts('Python Django developer', 'go engineer'))
+
+
+class KeysetPaginationTests(TrackerTestCase):
+    """Signed cursors walk the list in order, forwards and back, and tampered cursors restart at the first page."""
+    def setUp(self):
+        super().setUp()
+        patch = mock.patch.object(ApplicationListView, 'page_size', 4)
+        patch.start()
+        self.addCleanup(patch.stop)
+        for i, application in enumerate(self.applications): # Ties on applied_date are broken by updated_at, then id
+            JobApplication.objects.filter(pk=application.pk).update(applied_date=timezone.localdate() - timedelta(days=i // 2))
+        self.expected = list(JobApplication.objects.filter(user=self.user)
+                             .order_by('-applied_date', '-updated_at', '-id').values_list('id', flat=True))
+
+    def page(self, **params):
+        response = self.client.get(reverse('job_applications:application_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page']
+
+    def test_walks_forward_and_back(self):
+        first = self.page()
+        self.assertEqual(([a.pk for a in first.object_list], first.has_previous, first.total_count), (self.expected[:4], False, 6))
+        second = self.page(cursor=first.next_cursor)
+        self.assertEqual(([a.pk for a in second.object_list], second.has_next), (self.expected[4:], False))
+        back = self.page(cursor=second.previous_cursor)
+        self.assertEqual(([a.pk for a in back.object_list], back.has_previous, back.has_next), (self.expected[:4], False, True))
+
+    def test_rejects_tampered_and_foreign_cursors(self):
+        first = self.page()
+        self.assertEqual(signing.loads(first.next_cursor, salt=CURSOR_SALT)[0], 'next')
+        forged = signing.dumps(['next', ['2000-01-01', '2000-01-01T00:00:00', 1]], salt='another salt', compress=True)
+        company_cursor = signing.dumps(['next', ['Company 0', 1]], salt=CURSOR_SALT, compress=True) # Wrong columns
+        for cursor in (first.next_cursor[:-2] + 'xx', forged, company_cursor, 'garbage'):
+            self.assertEqual([a.pk for a in self.page(cursor=cursor).object_list], self.expected[:4])
+
+    def test_partial_request_returns_next_cursor_header(self):
+        response = self.client.get(reverse('job_applications:application_list'), {'partial': '1'})
+        self.assertEqual(response['X-Next-Cursor'], response.context['next_cursor'])
+        self.assertTrue(response['X-Next-Cursor'])
+
+
+class SearchTests(TestCase):
+    """FTS5 search (ranked, per user, kept in sync on save/delete) and the icontains fallback."""
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='search@example.com', password='pw')
+        other = CustomUser.objects.create_user(email='other-search@example.com', password='pw')
+        self.acme = Company.objects.create(user=self.user, name='Acme')
+        self.title_match = JobApplication.objects.create(user=self.user, company=self.acme, job_title='Django developer',
+                                                         job_description='Backend work.')
+        self.description_match = JobApplication.objects.create(user=self.user, company_name_manual='Initech', job_title='Engineer',
+                                                               job_description='We use Django and machine learning.')
+        JobApplication.objects.create(user=self.user, company_name_manual='Globex', job_title='Go developer', notes='No match here.')
+        JobApplication.objects.create(user=other, company_name_manual='Acme', job_title='Django developer')
+
+    def search(self, query):
+        return list(search.search_applications(JobApplication.objects.filter(user=self.user), query, user=self.user)
+                    .order_by('-search_rank', '-id'))
+
+    def test_parse_query(self):
+        terms = search.parse_query('django "machine  learning" dev* c++ ""')
+        self.assertEqual(terms, [(['django'], False), (['machine', 'learning'], False), (['dev'], True), (['c'], False)])
+        self.assertEqual(search.to_fts5_query(terms), '"django" "machine learning" "dev"* "c"')
+        self.assertEqual(search.to_tsquery(terms), 'django & (machine <-> learning) & dev:* & c')
+
+    def test_fts5_ranks_and_highlights(self):
+        self.assertEqual(search.get_backend(), 'sqlite')
+        results = self.search('django')
+        self.assertEqual(results, [self.title_match, self.description_match]) # Title matches weigh more
+        self.assertIn('<mark>Django</mark>', search.highlight_html(results[1].search_snippet))
+        self.assertEqual(self.search('"machine learning" initech'), [self.description_match])
+        self.assertEqual(self.search('acm*'), [self.title_match]) # Linked company name
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.acme.name = 'Umbrella'
+        self.acme.save()
+        self.assertEqual(self.search('umbrella'), [self.title_match])
+        self.description_match.notes = 'Referred by Jane'
+        self.description_match.save()
+        self.assertEqual(self.search('jane'), [self.description_match])
+        self.description_match.delete()
+        self.assertEqual(self.search('django'), [self.title_match])
+        self.assertEqual(search.rebuild_index(), 3)
+        self.assertEqual(self.search('django'), [self.title_match])
+
+    def test_fallback_without_fts(self):
+        with mock.patch.object(search, 'get_backend', return_value='fallback'):
+            results = self.search('django')
+            self.assertEqual(set(results), {self.title_match, self.description_match})
+            self.assertEqual({(r.search_rank, r.search_snippet) for r in results}, {(0.0, '')})
+            self.assertEqual(self.search('acme developer'), [self.title_match])
+
+
+class ImporterTests(TestCase):
+    """Bulk import: per-row validation with row-numbered errors, batched inserts and the bookkeeping save() would do."""
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email='import@example.com', password='pw')
+        self.existing = Company.objects.create(user=self.user, name='Acme')
+
+    def run_import(self, content, file_format='csv', **kwargs):
+        return import_applications(self.user, io.BytesIO(content.encode()), file_format, **kwargs)
+
+    def test_validates_rows_and_reports_errors(self):
+        result = self.run_import(
+            'Company,Title,Status,Source,Date\n'
+            'Acme,Developer,Interview Round 1,LinkedIn,2026-01-05\n'
+            ',Missing company,,,\n'
+            'Globex,Engineer,Hired,,\n'
+            'Initech,Analyst,,,not a date\n'
+            'Initech,Tester,withdrawn,,\n'
+        )
+        self.assertEqual((result.rows, result.created, result.error_count), (5, 2, 3))
+        self.assertEqual([row for row, _ in result.errors], [2, 3, 4])
+        self.assertIn('company_name_manual', result.errors[0][1])
+        self.assertIn('status', result.errors[1][1])
+        self.assertIn('applied_date', result.errors[2][1])
+        developer = JobApplication.objects.get(job_title='Developer')
+        self.assertEqual((developer.company, developer.status, developer.application_source), (self.existing, 'INTERVIEW_R1', 'LINKEDIN'))
+        self.assertEqual(JobApplication.objects.get(job_title='Tester').status, 'WITHDRAWN')
+        self.assertEqual(developer.funnel_stage, 1)
+        self.assertEqual(dict(FunnelRollup.objects.filter(user=self.user).values_list('stage', 'application_count')),
+                         {0: 2, 1: 1})
+
+    def test_inserts_in_batches(self):
+        rows = ''.join(f'Company {i % 2},Job {i}\n' for i in range(5))
+        get_company_index(self.user) # Cached before the import
+        with CaptureQueriesContext(connection) as queries:
+            result = self.run_import('company,title\n' + rows, batch_size=2)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT INTO "job_applications_jobapplication"')]
+        self.assertEqual((result.created, result.companies_created, len(inserts)), (5, 2, 3))
+        self.assertEqual(StatusTransition.objects.filter(user=self.user, to_status='APPLIED').count(), 5)
+        self.assertEqual(StatusRollup.objects.get(user=self.user, from_status='', to_status='APPLIED').transition_count, 5)
+        self.assertEqual(search.search_applications(JobApplication.objects.all(), 'job', user=self.user).count(), 5)
+        self.assertIsNotNone(get_company_index(self.user).find('company 1')) # The index was invalidated
+
+    def test_matches_companies_ignoring_case_and_spacing(self):
+        result = self.run_import('company,title\n acme  ,Dev\nGlobex Corp,Dev\n globex   CORP ,Ops\n')
+        self.assertEqual((result.created, result.companies_created), (3, 1))
+        self.assertEqual(sorted(Company.objects.filter(user=self.user).values_list('name', flat=True)), ['Acme', 'Globex Corp'])
+        self.assertEqual(JobApplication.objects.filter(user=self.user, company=self.existing).count(), 1)
+
+    def test_json_streams_and_keeps_rows_before_a_malformed_end(self):
+        rows = [{'company': 'Acme', 'title': f'Job {i}', 'description': 'x' * 50} for i in range(3)]
+        content = json.dumps(rows)
+        self.assertEqual(list(iter_json_array_rows(io.BytesIO(content.encode()), chunk_size=7)), rows)
+        result = self.run_import(content[:-20], file_format='json')
+        self.assertEqual((result.created, result.error_count), (2, 1))
+        self.assertIn('Could not read the file', result.errors[0][1])
+        result = self.run_import('{"company": "Acme", "title": "Lines"}\n\n["not an object"]\n', file_format='jsonl')
+        self.assertEqual((result.created, result.errors), (1, [(2, 'Each row must be an object.')]))
+
+    def test_caps_reported_errors_and_unknown_resumes(self):
+        with mock.patch('job_applications.importer.MAX_REPORTED_ERRORS', 2):
+            result = self.run_import('company,title,resume\n' + 'Acme,Dev,resumes/elsewhere.pdf\n' * 3)
+        self.assertEqual((result.created, result.error_count, len(result.errors)), (0, 3, 2))
+        self.assertIn('not one of your stored resumes', result.errors[0][1])
+
+    def test_upload_view(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('applications.csv', b'company,title\nAcme,Developer\n', content_type='text/csv')
+        response = self.client.post(reverse('job_applications:application_import'), {'file': upload})
+        self.assertEqual((response.status_code, response.context['result'].created), (200, 1))
+
+
+class ExportTests(TrackerTestCase):
+    """CSV and XLSX exports: the user's rows only, labels resolved, streamed in pieces from one query."""
+    def setUp(self):
+        super().setUp()
+        other = CustomUser.objects.create_user(email='other-export@example.com', password='pw')
+        JobApplication.objects.create(user=other, company_name_manual='Not mine', job_title='Hidden')
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(notes='Tags <b> & "quotes"\x01', resume_match_score=71.239)
+
+    def export(self, file_format):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_applications:application_export'), {'format': file_format})
+            chunks = list(response.streaming_content)
+        self.assertEqual(len([q for q in queries if 'FROM "job_applications_jobapplication"' in q['sql']]), 1)
+        return response, chunks
+
+    def test_csv(self):
+        with mock.patch('job_applications.exporter.FLUSH_BYTES', 4096):
+            response, chunks = self.export('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'attachment; filename="job-applications-\d{4}-\d\d-\d\d\.csv"')
+        self.assertGreater(len(chunks), 1)
+        content = b''.join(chunks).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeffCompany,Job Title,'))
+        rows = list(csv.reader(io.StringIO(content[1:])))
+        self.assertEqual(len(rows), 7)
+        by_title = {row[1]: row for row in rows[1:]}
+        self.assertNotIn('Hidden', by_title)
+        first = by_title['Engineer 0']
+        self.assertEqual((first[0], first[4], first[6], first[7], first[8]),
+                         ('Manual 0', 'LinkedIn', 'Applied', 'Tags <b> & "quotes"\x01', '71.24'))
+        self.assertEqual(by_title['Engineer 1'][0], 'Company 1') # The linked company wins over the typed name
+
+    def test_xlsx(self):
+        response, chunks = self.export('xlsx')
+        self.assertEqual(response['Content-Type'], CONTENT_TYPES['xlsx'])
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertIn('[Content_Types].xml', archive.namelist())
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        namespace = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        rows = [[cell.findtext('s:is/s:t', namespaces=namespace) or cell.findtext('s:v', namespaces=namespace) for cell in row]
+                for row in sheet.iterfind('s:sheetData/s:row', namespace)]
+        self.assertEqual(rows[0][:2], ['Company', 'Job Title'])
+        self.assertEqual(len(rows), 7)
+        first = next(row for row in rows if row[1] == 'Engineer 0')
+        self.assertEqual((first[7], first[8]), ('Tags <b> & "quotes"', '71.24')) # Control characters are dropped
+
+
+class OutboxTests(TestCase):
+    """Email queued by the views and sent by process_outbox() through the locmem backend."""
+    def enqueue(self, count=1, **kwargs):
+        return [OutgoingEmail.objects.enqueue(subject=f'Message {i}', body='Hello', to=[f'to{i}@example.com'], **kwargs)
+                for i in range(count)]
+
+    def test_signup_and_password_reset_are_queued_then_scrubbed(self):
+        response = self.client.post(reverse('signup'), {'email': 'new@example.com', 'password': 'Sturdy-pass-42', 'password2': 'Sturdy-pass-42'})
+        self.assertEqual(response.status_code, 200)
+        CustomUser.objects.create_user(email='reset@example.com', password='pw', is_active=True)
+        self.client.post(reverse('password_reset'), {'email': 'reset@example.com'})
+        self.assertEqual(mail.outbox, [])
+        queued = {email.kind: email for email in OutgoingEmail.objects.all()}
+        self.assertEqual(set(queued), {'activation', 'password_reset'})
+        self.assertIn('/activate/', queued['activation'].html_body)
+        self.assertIn('/accounts/reset/', queued['password_reset'].body)
+
+        self.assertEqual(process_outbox(), 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['new@example.com', 'reset@example.com'])
+        self.assertIn('/accounts/reset/', next(m.body for m in mail.outbox if m.to == ['reset@example.com']))
+        self.assertEqual(set(OutgoingEmail.objects.values_list('status', 'body', 'html_body')), {(OutgoingEmail.STATUS_SENT, '', '')})
+
+    def test_claim_batch_never_shares_a_message(self):
+        self.enqueue(5)
+        real_uuid4 = uuid.uuid4
+        racing = []
+
+        def uuid4(): # Another worker claims between this worker's SELECT of due ids and its UPDATE
+            if not racing:
+                racing.append(None)
+                racing[0] = outbox.claim_batch(2)
+            return real_uuid4()
+
+        with mock.patch.object(outbox.uuid, 'uuid4', side_effect=uuid4):
+            first = outbox.claim_batch(3)
+        rest = outbox.claim_batch(10)
+        ids = [[message.pk for message in batch] for batch in (racing[0], first, rest)]
+        self.assertEqual([len(batch) for batch in ids], [2, 1, 2])
+        self.assertEqual(len(set().union(*ids)), 5)
+        self.assertEqual(outbox.claim_batch(10), [])
+
+    def test_failures_retry_fail_and_reconnect(self):
+        temporary, permanent, dropped, fine = self.enqueue(4)
+        connection = mail.get_connection()
+        original_send = connection.send_messages
+        errors = {
+            temporary.to[0]: smtplib.SMTPResponseException(451, b'Try again later'),
+            permanent.to[0]: smtplib.SMTPRecipientsRefused({permanent.to[0]: (550, b'No such user')}),
+            dropped.to[0]: smtplib.SMTPServerDisconnected('Connection unexpectedly closed'),
+        }
+
+        def send_messages(messages):
+            if messages[0].to[0] in errors:
+                raise errors[messages[0].to[0]]
+            return original_send(messages)
+
+        before = timezone.now()
+        with mock.patch.object(connection, 'send_messages', side_effect=send_messages), \
+                mock.patch.object(connection, 'open') as opened, mock.patch.object(connection, 'close') as closed:
+            self.assertEqual(process_outbox(connection=connection), 1)
+        self.assertEqual((opened.call_count, closed.call_count), (2, 2)) # Reopened once after the disconnect
+        self.assertEqual([message.to for message in mail.outbox], [fine.to])
+
+        statuses = {email.pk: email for email in OutgoingEmail.objects.all()}
+        self.assertEqual(statuses[temporary.pk].status, OutgoingEmail.STATUS_PENDING)
+        self.assertGreaterEqual(statuses[temporary.pk].run_after, before + timedelta(seconds=60))
+        self.assertIn('451', statuses[temporary.pk].last_error)
+        self.assertEqual(statuses[permanent.pk].status, OutgoingEmail.STATUS_FAILED)
+        self.assertEqual(statuses[dropped.pk].status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(statuses[fine.pk].status, OutgoingEmail.STATUS_SENT)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_requeue_stale_messages(self):
+        stale, exhausted, fresh = self.enqueue(3)
+        outbox.claim_batch(3)
+        OutgoingEmail.objects.filter(pk=exhausted.pk).update(attempts=2)
+        OutgoingEmail.objects.exclude(pk=fresh.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(outbox.requeue_stale_messages(), 2)
+        statuses = dict(OutgoingEmail.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {stale.pk: OutgoingEmail.STATUS_PENDING, exhausted.pk: OutgoingEmail.STATUS_FAILED,
+                                    fresh.pk: OutgoingEmail.STATUS_SENDING})
+
+
+class ResumeStorageTests(TestCase):
+    """Content-addressed resume files, their ResumeBlob reference counts and the resume_storage command."""
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = CustomUser.objects.create_user(email='resumes@example.com', password='pw')
+        self.old = timezone.now() - timedelta(days=2) # Past the cleanup grace period
+
+    def create(self, content=b'%PDF-1.4 resume', filename='cv.pdf', **kwargs):
+        return JobApplication.objects.create(user=self.user, company_name_manual='Acme', job_title='Dev',
+                                             resume_submitted=SimpleUploadedFile(filename, content), **kwargs)
+
+    def ref_counts(self):
+        return dict(ResumeBlob.objects.values_list('name', 'ref_count'))
+
+    def stored_files(self):
+        return sorted(iter_stored_names('resumes'))
+
+    def age(self, name):
+        ResumeBlob.objects.filter(name=name).update(updated_at=self.old)
+        os.utime(resume_storage.path(name), (self.old.timestamp(), self.old.timestamp()))
+
+    def cleanup(self, *args):
+        call_command('resume_storage', *args, stdout=io.StringIO())
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.create(filename='cv.pdf')
+        second = self.create(filename='Resume Final.PDF')
+        self.assertEqual(first.resume_submitted.name, second.resume_submitted.name) # Extensions are lower-cased
+        self.assertEqual(content_hash_from_name(first.resume_submitted.name), hashlib.sha256(b'%PDF-1.4 resume').hexdigest())
+        self.assertEqual(self.stored_files(), [first.resume_submitted.name])
+        self.assertEqual(self.ref_counts(), {first.resume_submitted.name: 2})
+        self.assertEqual([first.resume_original_name, second.resume_original_name], ['cv.pdf', 'Resume Final.PDF'])
+
+    def test_edit_and_delete_release_references(self):
+        application = self.create()
+        shared = application.resume_submitted.name
+        other = self.create()
+        application.resume_submitted = SimpleUploadedFile('new.pdf', b'%PDF-1.4 new resume')
+        application.save()
+        replacement = application.resume_submitted.name
+        self.assertEqual(self.ref_counts(), {shared: 1, replacement: 1})
+        other.delete()
+        application.delete()
+        self.assertEqual(self.ref_counts(), {shared: 0, replacement: 0})
+
+    def test_cleanup_keeps_referenced_and_recent_files(self):
+        kept = self.create(b'%PDF kept').resume_submitted.name
+        released = self.create(b'%PDF released')
+        unreferenced = released.resume_submitted.name
+        released.delete()
+        recent = self.create(b'%PDF recent')
+        recently_released = recent.resume_submitted.name
+        recent.delete()
+        orphan = resume_storage.save('resumes/orphan.pdf', io.BytesIO(b'%PDF never registered'))
+        for name in (kept, unreferenced, orphan):
+            self.age(name)
+        self.cleanup('--cleanup')
+        self.assertEqual(self.stored_files(), sorted([kept, recently_released]))
+        self.assertEqual(set(self.ref_counts()), {kept, recently_released})
+
+    def test_upload_of_an_unreferenced_file_keeps_it(self):
+        application = self.create()
+        name = application.resume_submitted.name
+        application.delete()
+        self.age(name)
+        self.assertEqual(resume_storage.save('resumes/again.pdf', io.BytesIO(b'%PDF-1.4 resume')), name) # Upload in flight
+        self.cleanup('--cleanup')
+        self.assertEqual(self.stored_files(), [name])
+
+    def test_recount_and_migrate_legacy(self):
+        application = self.create()
+        name = application.resume_submitted.name
+        ResumeBlob.objects.filter(name=name).update(ref_count=7)
+        legacy = resume_storage.path('resumes/2024/01/02/legacy.pdf')
+        os.makedirs(os.path.dirname(legacy))
+        with open(legacy, 'wb') as f:
+            f.write(b'%PDF-1.4 resume') # The same bytes as the content-addressed file
+        JobApplication.objects.filter(pk=application.pk).update(resume_submitted='resumes/2024/01/02/legacy.pdf')
+        self.cleanup('--recount')
+        self.assertEqual(self.ref_counts(), {name: 0, 'resumes/2024/01/02/legacy.pdf': 1})
+        self.cleanup('--migrate-legacy')
+        application.refresh_from_db()
+        self.assertEqual(application.resume_submitted.name, name)
+        self.assertEqual(self.ref_counts(), {name: 1})
+        self.assertEqual(self.stored_files(), [name])
+
+    def test_reuse_stored_resume_from_the_form(self):
+        name = self.create().resume_submitted.name
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('job_applications:application_create'), {
+            'company_name_manual': 'Globex', 'job_title': 'Engineer', 'applied_date': timezone.localdate().isoformat(),
+            'status': 'APPLIED', 'existing_resume': name,
+        })
+        self.assertEqual(response.status_code, 302)
+        application = JobApplication.objects.get(job_title='Engineer')
+        self.assertEqual((application.resume_submitted.name, application.resume_original_name), (name, 'cv.pdf'))
+        self.assertEqual(self.ref_counts(), {name: 2})
+        self.assertEqual(self.stored_files(), [name])
+
+
+class CompanyIndexTests(TrackerTestCase):
+    """The cached per-user company index behind the application form's company field and type-ahead."""
+    def setUp(self):
+        super().setUp()
+        self.other_user = CustomUser.objects.create_user(email='other-companies@example.com', password='pw')
+        self.foreign = Company.objects.create(user=self.other_user, name='Company Foreign')
+
+    def form(self, company):
+        return JobApplicationForm(data={'company': company, 'job_title': 'Dev', 'status': 'APPLIED',
+                                        'applied_date': timezone.localdate().isoformat()}, user=self.user)
+
+    def test_field_accepts_only_the_users_companies(self):
+        get_company_index(self.user)
+        form = self.form(self.companies[1].pk)
+        with self.assertNumQueries(1): # Only model validation's existence check of the foreign key
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual((form.cleaned_data['company'].pk, form.cleaned_data['company'].name), (self.companies[1].pk, 'Company 1'))
+        for value in (self.foreign.pk, 'not an id'):
+            form = self.form(value)
+            self.assertFalse(form.is_valid())
+            self.assertIn('company', form.errors)
+
+    def test_field_without_index_looks_up_only_the_users_companies(self):
+        field = self.form(self.foreign.pk).fields['company']
+        field.index = None # The database fallback
+        self.assertEqual(field.to_python(self.companies[0].pk).pk, self.companies[0].pk)
+        with self.assertRaises(ValidationError):
+            field.to_python(self.foreign.pk)
+
+    def test_resolve_company(self):
+        index = get_company_index(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_company(self.user, '  COMPANY   1 ', index=index).pk, self.companies[1].pk)
+        created = resolve_company(self.user, '  Initech ', index=index)
+        self.assertEqual((created.name, created.user), ('Initech', self.user))
+        self.assertEqual(resolve_company(self.user, 'initech').pk, created.pk) # The save invalidated the cached index
+        self.assertIsNone(get_company_index(self.other_user).find('Initech'))
+
+    def test_lookup_is_scoped_to_the_user(self):
+        Company.objects.create(user=self.user, name='Big Company')
+        response = self.client.get(reverse('job_applications:company_lookup'), {'q': 'comp'})
+        self.assertEqual([result['name'] for result in response.json()['results']],
+                         ['Company 0', 'Company 1', 'Company 2', 'Big Company']) # Prefix matches first
+        self.client.force_login(self.other_user)
+        response = self.client.get(reverse('job_applications:company_lookup'), {'q': 'comp'})
+        self.assertEqual(response.json()['results'], [{'id': self.foreign.pk, 'name': 'Company Foreign'}])
+
+    def test_index_is_invalidated(self):
+        get_company_index(self.user)
+        company = Company.objects.create(user=self.user, name='Initech')
+        self.assertEqual(get_company_index(self.user).find('initech'), company.pk)
+        company.name = 'Initrode'
+        company.save()
+        self.assertEqual((get_company_index(self.user).find('initech'), get_company_index(self.user).find('initrode')), (None, company.pk))
+        company.delete()
+        self.assertIsNone(get_company_index(self.user).find('initrode'))
+        import_applications(self.user, io.BytesIO(b'company,title\nGlobex,Dev\n'), 'csv') # Companies bulk-created
+        self.assertIsNotNone(get_company_index(self.user).find('globex'))
+
+
+def write_text_pdf(path, pages):
+    """Writes a minimal PDF whose page N reads "Page N text"."""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>',
+               f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(pages))}] /Count {pages} >>"]
+    font = 3 + 2 * pages
+    for i in range(pages):
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R '
+                       f'/Resources << /Font << /F1 {font} 0 R >> >> >>')
+        stream = f'BT /F1 12 Tf 72 720 Td (Page {i + 1} text) Tj ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    objects.append('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    content, offsets = b'%PDF-1.4\n', []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += f'{number} 0 obj\n{obj}\nendobj\n'.encode()
+    xref = len(content)
+    content += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    content += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    content += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def slow_second_pdf_page(pdf_path, page_num):
+    """Stands in for utils._extract_pdf_page in worker processes: page 2 hangs."""
+    if page_num == 1:
+        time.sleep(60)
+    return f'Page {page_num + 1} text'
+
+
+class PdfExtractionTests(TestCase):
+    """Page and character budgets, early stop, and skipping pages that exceed the timeout."""
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.pdf_path = os.path.join(directory, 'resume.pdf')
+        write_text_pdf(self.pdf_path, 5)
+        utils._discard_page_worker() # Workers are forked after the patches below
+        self.addCleanup(utils._discard_page_worker)
+
+    def pages(self, text):
+        return re.findall(r'Page (\d+) text', text)
+
+    @override_settings(RESUME_PDF_PAGE_TIMEOUT=None)
+    def test_budgets_stop_extraction_early(self):
+        self.assertEqual(self.pages(utils.extract_text_from_pdf(self.pdf_path)), ['1', '2', '3', '4', '5'])
+        self.assertEqual(self.pages(utils.extract_text_from_pdf(self.pdf_path, max_pages=2)), ['1', '2'])
+        with mock.patch.object(PyPDF2.PageObject, 'extract_text', autospec=True, return_value='x' * 8) as extract:
+            self.assertEqual(utils.extract_text_from_pdf(self.pdf_path, max_chars=10), 'x' * 10)
+        self.assertEqual(extract.call_count, 2) # Stopped once the character budget was reached
+
+    @override_settings(RESUME_PDF_PAGE_TIMEOUT=5, RESUME_PDF_PARALLEL_MIN_PAGES=20)
+    def test_small_documents_reuse_one_worker_with_a_timeout(self):
+        self.assertEqual(self.pages(utils.extract_text_from_pdf(self.pdf_path)), ['1', '2', '3', '4', '5'])
+        worker = utils._page_worker.pool
+        self.assertEqual(self.pages(utils.extract_text_from_pdf(self.pdf_path, max_pages=3)), ['1', '2', '3'])
+        self.assertIs(utils._page_worker.pool, worker)
+
+    @override_settings(RESUME_PDF_PAGE_TIMEOUT=1, RESUME_PDF_PARALLEL_MIN_PAGES=20)
+    def test_slow_page_is_skipped(self):
+        with mock.patch.object(utils, '_extract_pdf_page', slow_second_pdf_page):
+            started = time.monotonic()
+            text = utils.extract_text_from_pdf(self.pdf_path, max_pages=3)
+        self.assertEqual(self.pages(text), ['1', '3'])
+        self.assertLess(time.monotonic() - started, 30)
+
+    @override_settings(RESUME_PDF_PAGE_TIMEOUT=1, RESUME_PDF_PARALLEL_MIN_PAGES=4, RESUME_PDF_WORKERS=2)
+    def test_slow_page_is_skipped_in_the_pool(self):
+        with mock.patch.object(utils, '_extract_pdf_page', slow_second_pdf_page):
+            text = utils.extract_text_from_pdf(self.pdf_path)
+        self.assertEqual(self.pages(text), ['1', '3', '4', '5'])
+
+
+class RescoreCommandTests(TrackerTestCase):
+    """`rescore_applications` scores whole chunks at once and only writes the scores that changed."""
+    def setUp(self):
+        super().setUp()
+        for application, score in zip(self.applications, (None, 10.0, 50.0)): # Unscored, stale, current; the rest have no resume
+            JobApplication.objects.filter(pk=application.pk).update(resume_submitted='resumes/r.pdf', resume_match_score=score)
+        command = 'job_applications.management.commands.rescore_applications'
+        self.score_pairs = mock.patch(f'{command}.score_text_pairs', side_effect=lambda jds, resumes: [50.0] * len(jds)).start()
+        self.addCleanup(mock.patch.stopall)
+        mock.patch(f'{command}.get_resume_text', return_value='Resume text').start()
+
+    def rescore(self, *args):
+        out = io.StringIO()
+        call_command('rescore_applications', '--user', self.user.email, '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def scores(self):
+        return [JobApplication.objects.get(pk=application.pk).resume_match_score for application in self.applications[:3]]
+
+    def test_dry_run_then_rescore(self):
+        self.assertIn('Scored 3 application(s)', self.rescore('--dry-run'))
+        self.assertEqual(self.scores(), [None, 10.0, 50.0])
+        self.assertEqual([len(call.args[0]) for call in self.score_pairs.call_args_list], [2, 1]) # One call per chunk
+        self.assertIn('Updated 2 score(s)', self.rescore())
+        self.assertEqual(self.scores(), [50.0, 50.0, 50.0])
+
+    def test_unscored_only(self):
+        self.assertIn('Updated 1 score(s)', self.rescore('--unscored'))
+        self.assertEqual(self.scores(), [50.0, 10.0, 50.0])
+
+
+class TextPreprocessorTests(TestCase):
+    """The TF-IDF preprocessor is built once per process and gives the tokens the per-call pipeline gave."""
+    def setUp(self):
+        mock.patch.object(utils, '_text_preprocessor', None).start()
+        self.addCleanup(mock.patch.stopall)
+        stop_words = mock.Mock(words=mock.Mock(return_value=['the', 'and', 'for', 'with']))
+        mock.patch.object(utils, 'stopwords', stop_words).start() # No NLTK data needed
+        self.lemmatizer_class = mock.patch.object(utils, 'WordNetLemmatizer').start()
+        self.lemmatize = self.lemmatizer_class.return_value.lemmatize
+        self.lemmatize.side_effect = lambda word: word[:-1] if word.endswith('s') else word
+
+    def test_same_tokens_as_before(self):
+        text = "Developers, the DEVELOPER and testers!\nWork with C++ & APIs; go for it."
+        # What preprocess_text_for_tfidf() did before: clean, tokenize, filter and lemmatize word by word
+        cleaned = re.sub(r'\s+', ' ', re.sub(r'\W+', ' ', text.lower())).strip()
+        expected = ' '.join(self.lemmatize.side_effect(w) for w in cleaned.split() if w not in {'the', 'and', 'for', 'with'} and len(w) > 2)
+        self.assertEqual(utils.preprocess_text_for_tfidf(text), expected)
+        self.assertEqual(expected, 'developer developer tester work api')
+        self.assertEqual(list(utils.get_text_preprocessor().process_many([text, '', None])), [expected, '', ''])
+
+    def test_built_once_and_lemmas_memoised(self):
+        preprocessor = utils.get_text_preprocessor()
+        self.assertIs(utils.get_text_preprocessor(), preprocessor)
+        for _ in range(3):
+            preprocessor.process('resumes resumes skills')
+        self.assertEqual(self.lemmatizer_class.call_count, 1)
+        self.assertEqual(sorted(call.args[0] for call in self.lemmatize.call_args_list), ['resumes', 'skills'])
+
+
+class ApplicationRankViewTests(TrackerTestCase):
+    """Ranking one resume against the user's stored JD embeddings, cached until a job description changes."""
+    def setUp(self):
+        super().setUp()
+        import numpy as np
+        from . import ranking
+        self.ranking = ranking
+        mock.patch.object(ranking, 'get_sentence_model', return_value=mock.Mock()).start()
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.object(ranking, 'get_embedding', return_value=np.asarray([1, 0, 0], dtype=np.float32)).start()
+        mock.patch.object(text_cache, 'get_text_from_file', return_value='Resume text').start()
+        directions = [(1, 0.2, 0), (0, 1, 0), (1, 1, 0), (0, 0, 1), (0, 0, 1), (0, 0, 1)]
+        for application, direction in zip(self.applications, directions):
+            self.set_description(application, f'Job description {application.pk}', direction)
+
+    def set_description(self, application, description, direction):
+        import numpy as np
+        from .utils import get_sentence_model_name
+        application.job_description = description
+        application.save() # Recomputes job_description_hash
+        vector = np.asarray(direction, dtype=np.float32)
+        DocumentEmbedding.objects.create(content_hash=application.job_description_hash, model_name=get_sentence_model_name(),
+                                         dimensions=3, vector=embeddings.vector_to_bytes(vector / np.linalg.norm(vector)))
+
+    def rank(self):
+        upload = SimpleUploadedFile('resume.pdf', b'%PDF resume')
+        response = self.client.post(reverse('job_applications:application_rank') + '?format=json', {'resume_file': upload, 'top_k': 2})
+        self.assertEqual(response.status_code, 200)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_cache_hit_and_miss(self):
+        with mock.patch.object(self.ranking, '_jd_similarities', wraps=self.ranking._jd_similarities) as similarities:
+            self.assertEqual(self.rank(), [self.applications[0].pk, self.applications[2].pk])
+            self.assertEqual(self.rank(), [self.applications[0].pk, self.applications[2].pk]) # Cached
+            self.assertEqual(similarities.call_count, 1)
+            self.set_description(self.applications[1], 'Rewritten description', (1, 0, 0))
+            self.assertEqual(self.rank(), [self.applications[1].pk, self.applications[0].pk]) # The JD change invalidated it
+            self.assertEqual(similarities.call_count, 2)
+
+
+class SentenceModelLoadingTests(TestCase):
+    """The SentenceTransformer is only built on first use, once, however many threads ask for it at the same time."""
+    def setUp(self):
+        for patch in (mock.patch.object(utils, '_sentence_model', None),
+                      mock.patch.object(utils, '_sentence_model_unavailable', False)):
+            patch.start()
+        self.addCleanup(mock.patch.stopall)
+        self.constructor = mock.Mock(side_effect=lambda name: time.sleep(0.05) or mock.Mock(name=name))
+        fake_module = mock.Mock(SentenceTransformer=self.constructor)
+        mock.patch.dict('sys.modules', {'sentence_transformers': fake_module}).start()
+
+    @override_settings(RESUME_MATCH_BACKEND='auto', RESUME_MATCH_MODEL='/models/pinned')
+    def test_loaded_once_under_concurrent_first_use(self):
+        import threading
+        start = threading.Barrier(8)
+        models = []
+
+        def load():
+            start.wait()
+            models.append(utils.get_sentence_model())
+
+        threads = [threading.Thread(target=load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.constructor.assert_called_once_with('/models/pinned')
+        self.assertEqual(len(models), 8)
+        self.assertTrue(all(model is models[0] for model in models))
+        self.assertIs(utils.get_sentence_model(), models[0])
+
+    @override_settings(RESUME_MATCH_BACKEND='tfidf')
+    def test_tfidf_backend_never_loads_it(self):
+        self.assertIsNone(utils.get_sentence_model())
+        self.assertFalse(utils.warm_up_scoring_model())
+        self.constructor.assert_not_called()
+
+
+class CacheVersionTests(TrackerTestCase):
+    """Saves and deletes bump the owner's cache versions, so the next request sees the change."""
+    def list_total(self):
+        return self.client.get(reverse('job_applications:application_list')).context['page'].total_count
+
+    def dashboard_total(self):
+        return self.client.get(reverse('job_applications:dashboard')).context['stats']['total']
+
+    def versions(self):
+        return {namespace: get_version(namespace, self.user.pk) for namespace in (APPLICATION_COUNT, ANALYTICS, RANKING)}
+
+    def bumped(self, before):
+        return {namespace for namespace, version in self.versions().items() if version != before[namespace]}
+
+    def test_save_and_delete_invalidate_counts_and_dashboard(self):
+        self.assertEqual((self.list_total(), self.dashboard_total()), (6, 6))
+        before = self.versions()
+        added = JobApplication.objects.create(user=self.user, company_name_manual='New', job_title='New')
+        self.assertEqual(self.bumped(before), {APPLICATION_COUNT, ANALYTICS, RANKING})
+        self.assertEqual((self.list_total(), self.dashboard_total()), (7, 7))
+        before = self.versions()
+        added.notes = 'Called back'
+        added.save()
+        self.assertEqual(self.bumped(before), {APPLICATION_COUNT, ANALYTICS}) # Same job description: rankings still hold
+        before = self.versions()
+        added.delete()
+        self.assertEqual(self.bumped(before), {APPLICATION_COUNT, ANALYTICS, RANKING})
+        self.assertEqual((self.list_total(), self.dashboard_total()), (6, 6))
+
+    def test_versions_are_per_user(self):
+        other = CustomUser.objects.create_user(email='other-versions@example.com', password='pw')
+        other_version = get_version(APPLICATION_COUNT, other.pk)
+        JobApplication.objects.create(user=self.user, company_name_manual='Mine', job_title='Mine')
+        self.assertEqual(get_version(APPLICATION_COUNT, other.pk), other_version)
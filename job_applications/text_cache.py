@@ -0,0 +1,131 @@
+"""
+Content-addressed cache of text extracted from resume files.
+
+Files are identified by the SHA-256 of their content, so the same resume attached to dozens of
+applications (or rescored many times) is parsed with PyPDF2/python-docx only once. Entries carry
+the extractor version they were produced with and are evicted least-recently-used first once the
+cache grows past settings.RESUME_TEXT_CACHE_MAX_ENTRIES / RESUME_TEXT_CACHE_MAX_CHARS. Eviction
+scans the whole table, so it runs once every RESUME_TEXT_CACHE_PRUNE_EVERY stores (counted in the
+Django cache) and from `python manage.py resume_text_cache --prune`, not on every cache miss.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ExtractedText
+from .utils import TEXT_EXTRACTOR_VERSION, get_text_from_file, normalize_extracted_text
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# last_used_at is only refreshed when older than this, so cache hits don't turn into a write each time.
+TOUCH_INTERVAL = timedelta(hours=1)
+STORES_KEY = 'job_applications:text_cache:stores' # Entries stored since the cache was last pruned
+
+
+def hash_file(file_path):
+    """SHA-256 hex digest of a file, read in chunks so large uploads aren't loaded into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_resume_text(file_path, refresh=False):
+    """
+    Returns the normalised text of a resume file, extracting it only on a cache miss
+    (or always, with refresh=True). Returns an empty string if the file can't be read
+    or yields no text; empty results aren't cached.
+    """
+    return get_resume_text_with_hash(file_path, refresh=refresh)[1]
+
+
+def get_resume_text_with_hash(file_path, refresh=False):
+    """Like get_resume_text(), but returns a (content_hash, text) tuple; the hash is '' if the file can't be read."""
+    if not file_path:
+        return '', ""
+    try:
+        content_hash = hash_file(file_path)
+    except OSError as e:
+        print(f"Error hashing resume file {file_path}: {e}")
+        return '', ""
+
+    entry = None
+    if not refresh:
+        entry = ExtractedText.objects.filter(content_hash=content_hash, extractor_version=TEXT_EXTRACTOR_VERSION).first()
+    if entry is not None:
+        now = timezone.now()
+        if entry.last_used_at < now - TOUCH_INTERVAL:
+            ExtractedText.objects.filter(pk=entry.pk).update(last_used_at=now)
+        return content_hash, entry.text
+
+    text = normalize_extracted_text(get_text_from_file(file_path))
+    if text:
+        store_text(content_hash, text)
+    return content_hash, text
+
+
+def store_text(content_hash, text):
+    """Saves extracted text for a content hash, replacing any entry from an older extractor version."""
+    try:
+        with transaction.atomic():
+            ExtractedText.objects.update_or_create(
+                content_hash=content_hash,
+                defaults={
+                    'extractor_version': TEXT_EXTRACTOR_VERSION,
+                    'text': text,
+                    'text_length': len(text),
+                    'last_used_at': timezone.now(),
+                },
+            )
+    except IntegrityError:
+        # A concurrent worker stored the same file first; its text is identical.
+        return
+    _count_store()
+
+
+def _count_store():
+    """Counts a stored entry and prunes the cache once every RESUME_TEXT_CACHE_PRUNE_EVERY stores."""
+    cache.add(STORES_KEY, 0, None)
+    try:
+        stores = cache.incr(STORES_KEY)
+    except ValueError: # Evicted between add() and incr()
+        return
+    if stores >= getattr(settings, 'RESUME_TEXT_CACHE_PRUNE_EVERY', 100):
+        prune()
+
+
+def prune(max_entries=None, max_chars=None):
+    """
+    Drops entries from old extractor versions, then evicts least-recently-used entries until
+    the cache is within its entry and size bounds. Returns the number of entries deleted.
+    """
+    if max_entries is None:
+        max_entries = getattr(settings, 'RESUME_TEXT_CACHE_MAX_ENTRIES', 10000)
+    if max_chars is None:
+        max_chars = getattr(settings, 'RESUME_TEXT_CACHE_MAX_CHARS', 200_000_000)
+
+    cache.set(STORES_KEY, 0, None)
+    deleted, _ = ExtractedText.objects.exclude(extractor_version=TEXT_EXTRACTOR_VERSION).delete()
+
+    stats = ExtractedText.objects.aggregate(total_chars=Sum('text_length'))
+    entries = ExtractedText.objects.count()
+    total_chars = stats['total_chars'] or 0
+    if entries <= max_entries and total_chars <= max_chars:
+        return deleted
+
+    # Walk from the least recently used entry, collecting ids until both bounds are met.
+    evict_ids = []
+    for pk, text_length in ExtractedText.objects.order_by('last_used_at', 'pk').values_list('pk', 'text_length').iterator():
+        if entries <= max_entries and total_chars <= max_chars:
+            break
+        evict_ids.append(pk)
+        entries -= 1
+        total_chars -= text_length
+    for start in range(0, len(evict_ids), 500):
+        deleted += ExtractedText.objects.filter(pk__in=evict_ids[start:start + 500]).delete()[0]
+    return deleted
@@ -0,0 +1,127 @@
+"""
+Corpus-level TF-IDF model for the fallback scorer.
+
+Instead of fitting a TfidfVectorizer on just the two documents being compared (which makes the IDF
+weights meaningless and repeats the fit for every score), one vectorizer is fitted over all stored
+job descriptions and extracted resume texts and persisted with joblib. Scoring is then a sparse
+transform plus a sparse dot product. Refit on a schedule with `python manage.py fit_tfidf_model --if-stale`.
+"""
+import os
+import tempfile
+import threading
+from datetime import timedelta
+
+import joblib
+from django.conf import settings
+from django.utils import timezone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .models import ExtractedText, JobApplication
+from .utils import get_text_preprocessor
+
+_cached_model = None
+_cached_model_mtime = None
+_model_lock = threading.Lock()
+
+
+def get_model_path():
+    return getattr(settings, 'RESUME_MATCH_TFIDF_MODEL_PATH', os.path.join(settings.BASE_DIR, 'nlp_models', 'tfidf.joblib'))
+
+
+def count_corpus_documents():
+    return (JobApplication.objects.exclude(job_description='').count()
+            + ExtractedText.objects.count())
+
+
+def iter_corpus_documents():
+    """Streams every stored job description and resume text, without loading them all at once."""
+    job_descriptions = (JobApplication.objects.exclude(job_description='')
+                        .order_by().values_list('job_description', flat=True))
+    for text in job_descriptions.iterator(chunk_size=1000):
+        yield text
+    for text in ExtractedText.objects.order_by().values_list('text', flat=True).iterator(chunk_size=200):
+        yield text
+
+
+def fit_tfidf_model():
+    """
+    Fits a TfidfVectorizer over the whole corpus and saves it to get_model_path().
+    Returns the saved model dict, or None if the corpus is empty.
+    """
+    document_count = 0
+
+    def documents():
+        nonlocal document_count
+        for processed in get_text_preprocessor().process_many(iter_corpus_documents()):
+            document_count += 1
+            yield processed
+
+    vectorizer = TfidfVectorizer(sublinear_tf=True)
+    try:
+        vectorizer.fit(documents())
+    except ValueError as e: # Empty corpus or empty vocabulary
+        print(f"TF-IDF: Could not fit corpus model: {e}")
+        return None
+
+    model = {
+        'vectorizer': vectorizer,
+        'document_count': document_count,
+        'fitted_at': timezone.now(),
+    }
+    path = get_model_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file and rename, so workers never load a half-written model.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"TF-IDF corpus model fitted on {document_count} documents ({len(vectorizer.vocabulary_)} terms).")
+    return model
+
+
+def get_tfidf_model():
+    """
+    Returns the persisted model dict ({'vectorizer', 'document_count', 'fitted_at'}) or None if
+    no model has been fitted. The model is loaded once per process and reloaded when the file changes.
+    """
+    global _cached_model, _cached_model_mtime
+    path = get_model_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _cached_model is not None and _cached_model_mtime == mtime:
+        return _cached_model
+    with _model_lock:
+        if _cached_model is None or _cached_model_mtime != mtime:
+            try:
+                _cached_model = joblib.load(path)
+                _cached_model_mtime = mtime
+            except Exception as e:
+                print(f"TF-IDF: Could not load corpus model from {path}: {e}")
+                return None
+    return _cached_model
+
+
+def is_model_stale(model=None):
+    """True if there is no model, it is older than the max age, or the corpus grew past the refit threshold."""
+    model = model or get_tfidf_model()
+    if model is None:
+        return True
+    max_age = timedelta(days=getattr(settings, 'RESUME_MATCH_TFIDF_MAX_AGE_DAYS', 7))
+    if timezone.now() - model['fitted_at'] > max_age:
+        return True
+    refit_after = getattr(settings, 'RESUME_MATCH_TFIDF_REFIT_AFTER_DOCS', 500)
+    return count_corpus_documents() - model['document_count'] >= refit_after
+
+
+def transform(texts):
+    """Sparse, L2-normalised TF-IDF rows for `texts` using the corpus model (None if not fitted)."""
+    model = get_tfidf_model()
+    if model is None:
+        return None
+    return model['vectorizer'].transform(get_text_preprocessor().process_many(texts))
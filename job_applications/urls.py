@@ -7,14 +7,20 @@ app_name = 'job_applications'
 urlpatterns = [
     # Job Application URLs
     path('', views.ApplicationListView.as_view(), name='application_list'),
+    path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
     path('application/new/', views.ApplicationCreateView.as_view(), name='application_create'),
+    path('application/import/', views.ApplicationImportView.as_view(), name='application_import'),
+    path('application/export/', views.ApplicationExportView.as_view(), name='application_export'),
+    path('application/rank/', views.ApplicationRankView.as_view(), name='application_rank'),
     path('application/<int:pk>/', views.ApplicationDetailView.as_view(), name='application_detail'),
     path('application/<int:pk>/edit/', views.ApplicationUpdateView.as_view(), name='application_update'),
     path('application/<int:pk>/delete/', views.ApplicationDeleteView.as_view(), name='application_delete'),
+    path('application/<int:pk>/similar/', views.SimilarApplicationsView.as_view(), name='application_similar'),
 
     # Company URLs
     path('companies/', views.CompanyListView.as_view(), name='company_list'),
     path('company/new/', views.CompanyCreateView.as_view(), name='company_create'),
+    path('company/lookup/', views.CompanyLookupView.as_view(), name='company_lookup'),
     path('company/<int:pk>/edit/', views.CompanyUpdateView.as_view(), name='company_update'),
     path('company/<int:pk>/delete/', views.CompanyDeleteView.as_view(), name='company_delete'),
     # We don't have a CompanyDetailView defined, but you could add one if needed:
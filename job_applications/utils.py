@@ -1,50 +1,245 @@
+import functools
+import os
 import re
+import threading
 import PyPDF2
+from django.conf import settings
 from docx import Document as DocxDocument
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
-# For more advanced sentence similarity (recommended)
-try:
-    from sentence_transformers import SentenceTransformer, util
-    # Load a pre-trained model for sentence embeddings.
-    # 'all-MiniLM-L6-v2' is small, fast, and good for general purpose.
-    # It will be downloaded automatically the first time it's used if not cached.
-    sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-    print("SentenceTransformer model loaded successfully.")
-except ImportError:
-    print("SentenceTransformer library not found. TF-IDF will be used as a fallback.")
-    sentence_model = None
-except Exception as e:
-    print(f"Warning: Could not load SentenceTransformer model. TF-IDF will be used as a fallback. Error: {e}")
-    sentence_model = None
-
-
-def extract_text_from_pdf(pdf_path):
-    """Extracts text from a PDF file."""
-    text = ""
+# --- Sentence embedding model (loaded lazily) ---
+# Importing sentence_transformers pulls in torch, which costs seconds of start-up and hundreds of MB
+# of RSS. Only processes that actually score (the scoring worker, bulk rescoring) should pay for it,
+# so the model is built on first use instead of at import time.
+BACKEND_AUTO = 'auto'
+BACKEND_TFIDF = 'tfidf'
+
+_sentence_model = None
+_sentence_model_unavailable = False
+_sentence_model_lock = threading.Lock()
+
+
+def get_scoring_backend():
+    """The configured backend: 'auto' (SentenceTransformer with TF-IDF fallback) or 'tfidf'."""
+    return getattr(settings, 'RESUME_MATCH_BACKEND', BACKEND_AUTO)
+
+
+def get_sentence_model_name():
+    """Model name or local path passed to SentenceTransformer (settings.RESUME_MATCH_MODEL)."""
+    return getattr(settings, 'RESUME_MATCH_MODEL', 'all-MiniLM-L6-v2')
+
+
+def get_sentence_model():
+    """
+    Returns the process-wide SentenceTransformer, loading it on first call.
+    Returns None if the TF-IDF backend is forced or the model cannot be loaded.
+    Safe to call from multiple threads: the model is only ever loaded once.
+    """
+    global _sentence_model, _sentence_model_unavailable
+    if get_scoring_backend() == BACKEND_TFIDF:
+        return None
+    if _sentence_model is not None or _sentence_model_unavailable:
+        return _sentence_model
+
+    with _sentence_model_lock:
+        # Another thread may have finished loading while we waited for the lock.
+        if _sentence_model is not None or _sentence_model_unavailable:
+            return _sentence_model
+        try:
+            from sentence_transformers import SentenceTransformer
+            # 'all-MiniLM-L6-v2' is small, fast, and good for general purpose.
+            # It will be downloaded automatically the first time it's used if not cached.
+            _sentence_model = SentenceTransformer(get_sentence_model_name())
+            print("SentenceTransformer model loaded successfully.")
+        except ImportError:
+            print("SentenceTransformer library not found. TF-IDF will be used as a fallback.")
+            _sentence_model_unavailable = True
+        except Exception as e:
+            print(f"Warning: Could not load SentenceTransformer model. TF-IDF will be used as a fallback. Error: {e}")
+            _sentence_model_unavailable = True
+    return _sentence_model
+
+
+def warm_up_scoring_model():
+    """
+    Optional warm-up hook for processes that score (e.g. the scoring worker): loads the model
+    and runs one tiny encode so the first real job doesn't pay the start-up cost.
+    Returns True if a SentenceTransformer model is ready.
+    """
+    model = get_sentence_model()
+    if model is None:
+        return False
+    model.encode("warm up", convert_to_tensor=True)
+    return True
+
+
+# Bump whenever extraction/normalisation output changes, so cached resume text is re-extracted.
+TEXT_EXTRACTOR_VERSION = 2
+
+
+# --- PDF extraction ---
+def get_pdf_extraction_limits():
+    """Page/character budget, timeout and parallelism settings for PDF extraction."""
+    return {
+        'max_pages': getattr(settings, 'RESUME_PDF_MAX_PAGES', 50),
+        'max_chars': getattr(settings, 'RESUME_PDF_MAX_CHARS', 200_000),
+        'page_timeout': getattr(settings, 'RESUME_PDF_PAGE_TIMEOUT', 10),
+        'workers': getattr(settings, 'RESUME_PDF_WORKERS', 4),
+        'parallel_min_pages': getattr(settings, 'RESUME_PDF_PARALLEL_MIN_PAGES', 20),
+    }
+
+
+# Worker processes keep the last PDF they were sent open, so each parses a document once however
+# many of its pages it extracts.
+_worker_pdf = None # ((path, mtime, size), open file, PdfReader)
+
+
+def _get_worker_pdf_reader(pdf_path):
+    global _worker_pdf
+    stat = os.stat(pdf_path)
+    key = (pdf_path, stat.st_mtime_ns, stat.st_size)
+    if _worker_pdf is None or _worker_pdf[0] != key:
+        if _worker_pdf is not None:
+            _worker_pdf[1].close()
+        file = open(pdf_path, 'rb') # Kept open: PdfReader reads lazily
+        _worker_pdf = (key, file, PyPDF2.PdfReader(file))
+    return _worker_pdf[2]
+
+
+def _extract_pdf_page(pdf_path, page_num):
+    """Extracts one page in a worker process, so a pathological page can be timed out."""
+    return _get_worker_pdf_reader(pdf_path).pages[page_num].extract_text() or "" # Add or "" to handle None return
+
+
+def iter_reader_pages(reader, page_count):
+    """Streams the text of the first page_count pages of an open PdfReader, in this process."""
+    for page_num in range(page_count):
+        yield reader.pages[page_num].extract_text() or ""
+
+
+# One long-lived extraction process per thread, for documents too small to be worth a pool. It is
+# only replaced after a page timed out.
+_page_worker = threading.local()
+
+
+def _get_page_worker():
+    import multiprocessing
+    if getattr(_page_worker, 'pool', None) is None:
+        _page_worker.pool = multiprocessing.Pool(processes=1)
+    return _page_worker.pool
+
+
+def _discard_page_worker():
+    pool, _page_worker.pool = getattr(_page_worker, 'pool', None), None
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+
+
+def iter_pdf_pages_with_timeout(pdf_path, page_count, page_timeout):
+    """
+    Streams page texts in order, extracted one at a time by this thread's page worker. A page that
+    takes longer than page_timeout seconds is skipped, and the stuck worker replaced.
+    """
+    import multiprocessing
+    for page_num in range(page_count):
+        result = _get_page_worker().apply_async(_extract_pdf_page, (pdf_path, page_num))
+        try:
+            yield result.get(timeout=page_timeout)
+        except multiprocessing.TimeoutError:
+            print(f"Warning: Page {page_num + 1} of PDF {pdf_path} timed out after {page_timeout}s; skipping it.")
+            _discard_page_worker()
+        except Exception as e:
+            print(f"Warning: Could not extract page {page_num + 1} of PDF {pdf_path}: {e}")
+
+
+def iter_pdf_pages_in_pool(pdf_path, page_count, processes, page_timeout=None):
+    """
+    Streams page texts in order while extracting them in a process pool, a small window of pages
+    ahead of the consumer. A page that takes longer than page_timeout seconds is skipped: the pool,
+    including the stuck process, is replaced and the other in-flight pages are resubmitted.
+    """
+    import multiprocessing
+
+    window = processes * 2
+    pool = multiprocessing.Pool(processes=processes)
+    try:
+        pending = []
+        next_page = 0
+        while next_page < page_count or pending:
+            while next_page < page_count and len(pending) < window:
+                pending.append((next_page, pool.apply_async(_extract_pdf_page, (pdf_path, next_page))))
+                next_page += 1
+            page_num, result = pending.pop(0)
+            try:
+                yield result.get(timeout=page_timeout)
+            except multiprocessing.TimeoutError:
+                print(f"Warning: Page {page_num + 1} of PDF {pdf_path} timed out after {page_timeout}s; skipping it.")
+                pool.terminate()
+                pool.join()
+                pool = multiprocessing.Pool(processes=processes)
+                pending = [(num, pool.apply_async(_extract_pdf_page, (pdf_path, num))) for num, _ in pending]
+            except Exception as e:
+                print(f"Warning: Could not extract page {page_num + 1} of PDF {pdf_path}: {e}")
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def extract_text_from_pdf(pdf_path, max_pages=None, max_chars=None):
+    """
+    Extracts text from a PDF file, stopping at the configured page/character budget.
+    Pages are streamed and joined once. Every page is subject to RESUME_PDF_PAGE_TIMEOUT, so one
+    pathological page can't hang the caller: documents of at least RESUME_PDF_PARALLEL_MIN_PAGES
+    pages are extracted in parallel by a process pool, smaller ones (a typical resume) by a reused
+    single worker process, which never pays for starting a pool. Without a timeout, small
+    documents are extracted in this process.
+    """
+    limits = get_pdf_extraction_limits()
+    max_pages = limits['max_pages'] if max_pages is None else max_pages
+    max_chars = limits['max_chars'] if max_chars is None else max_chars
+
+    parts = []
+    length = 0
+    pages = None
     try:
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                page = reader.pages[page_num]
-                text += page.extract_text() or "" # Add or "" to handle None return
+            page_count = len(reader.pages)
+            if max_pages is not None:
+                page_count = min(page_count, max_pages)
+
+            if page_count >= limits['parallel_min_pages'] and limits['workers'] > 1:
+                pages = iter_pdf_pages_in_pool(pdf_path, page_count, min(limits['workers'], page_count), limits['page_timeout'])
+            elif limits['page_timeout']:
+                pages = iter_pdf_pages_with_timeout(pdf_path, page_count, limits['page_timeout'])
+            else:
+                pages = iter_reader_pages(reader, page_count)
+
+            for page_text in pages:
+                parts.append(page_text)
+                length += len(page_text)
+                if max_chars is not None and length >= max_chars:
+                    break
     except FileNotFoundError:
         print(f"Error: PDF file not found at {pdf_path}")
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
-    return text
+    finally:
+        if pages is not None:
+            pages.close() # Stops the page generator (and terminates any pool) early
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
 
 def extract_text_from_docx(docx_path):
     """Extracts text from a DOCX file."""
     text = ""
     try:
         doc = DocxDocument(docx_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        text = "".join(para.text + "\n" for para in doc.paragraphs)
     except FileNotFoundError:
         print(f"Error: DOCX file not found at {docx_path}")
     except Exception as e:
@@ -76,23 +271,61 @@ def get_text_from_file(file_path):
         print(f"Unsupported file type for text extraction: {file_path}")
         return ""
 
-def preprocess_text_for_tfidf(text):
-    """Basic text preprocessing for TF-IDF: lowercasing, removing non-alphanumeric, tokenizing, removing stopwords, lemmatizing."""
+def normalize_extracted_text(text):
+    """Normalises extracted text for storage: drops NUL bytes and collapses runs of whitespace."""
     if not text:
         return ""
-    text = text.lower()
-    text = re.sub(r'\W+', ' ', text)  # Replace non-alphanumeric characters (and underscore) with space
-    text = re.sub(r'\s+', ' ', text).strip() # Replace multiple spaces with single space and strip leading/trailing
-    
-    tokens = word_tokenize(text)
-    stop_words = set(stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
-    
-    # Lemmatize and remove stopwords and short tokens
-    filtered_tokens = [
-        lemmatizer.lemmatize(w) for w in tokens if w not in stop_words and len(w) > 2
-    ]
-    return " ".join(filtered_tokens)
+    text = text.replace('\x00', '')
+    return re.sub(r'\s+', ' ', text).strip()
+
+# --- TF-IDF text preprocessing ---
+_NON_WORD_RE = re.compile(r'\W+')
+
+class TextPreprocessor:
+    """
+    Preprocessing for the TF-IDF scorer: lowercasing, removing non-alphanumeric, tokenizing,
+    removing stopwords, lemmatizing. Built once per process (see get_text_preprocessor()) so the
+    stopword list and WordNet lemmatizer aren't reloaded for every document.
+    """
+    def __init__(self, lemma_cache_size=100_000):
+        self.stop_words = frozenset(stopwords.words('english'))
+        # Lemmatizing is by far the most expensive step, and resume/JD vocabularies repeat a lot.
+        self.lemmatize = functools.lru_cache(maxsize=lemma_cache_size)(WordNetLemmatizer().lemmatize)
+
+    def process(self, text):
+        if not text:
+            return ""
+        # After replacing every non-word character (and collapsing whitespace) the text is plain
+        # space-separated words, so a split() is all the tokenizing it needs.
+        tokens = _NON_WORD_RE.sub(' ', text.lower()).split()
+        stop_words = self.stop_words
+        lemmatize = self.lemmatize
+        # Lemmatize and remove stopwords and short tokens
+        return " ".join(lemmatize(w) for w in tokens if len(w) > 2 and w not in stop_words)
+
+    def process_many(self, texts):
+        """Lazily preprocesses an iterable of documents, yielding one processed string per input."""
+        for text in texts:
+            yield self.process(text)
+
+
+_text_preprocessor = None
+_text_preprocessor_lock = threading.Lock()
+
+
+def get_text_preprocessor():
+    """Returns the process-wide TextPreprocessor, building it on first use."""
+    global _text_preprocessor
+    if _text_preprocessor is None:
+        with _text_preprocessor_lock:
+            if _text_preprocessor is None:
+                _text_preprocessor = TextPreprocessor()
+    return _text_preprocessor
+
+
+def preprocess_text_for_tfidf(text):
+    """Basic text preprocessing for TF-IDF: lowercasing, removing non-alphanumeric, tokenizing, removing stopwords, lemmatizing."""
+    return get_text_preprocessor().process(text)
 
 def calculate_similarity_tfidf(text1, text2):
     """Calculates cosine similarity between two texts using TF-IDF."""
@@ -100,8 +333,7 @@ def calculate_similarity_tfidf(text1, text2):
         print("TF-IDF: One or both texts are empty.")
         return 0.0
     
-    processed_text1 = preprocess_text_for_tfidf(text1)
-    processed_text2 = preprocess_text_for_tfidf(text2)
+    processed_text1, processed_text2 = get_text_preprocessor().process_many([text1, text2])
 
     if not processed_text1 or not processed_text2: # If preprocessing results in empty strings
         print("TF-IDF: One or both texts became empty after preprocessing.")
@@ -121,6 +353,7 @@ def calculate_similarity_tfidf(text1, text2):
 
 def calculate_similarity_sentence_transformer(text1, text2):
     """Calculates cosine similarity using SentenceTransformer embeddings."""
+    sentence_model = get_sentence_model()
     if not sentence_model:
         print("SentenceTransformer: Model not loaded.")
         return 0.0 # Or raise an error
@@ -143,6 +376,7 @@ def calculate_similarity_sentence_transformer(text1, text2):
         embedding2 = sentence_model.encode(text2_cleaned, convert_to_tensor=True)
         
         # Compute cosine-similarity
+        from sentence_transformers import util
         cosine_scores = util.pytorch_cos_sim(embedding1, embedding2)
         similarity = cosine_scores.item() # Get the single similarity score
         return max(0.0, min(similarity * 100, 100.0)) # As a percentage, clamped 0-100
@@ -151,6 +385,32 @@ def calculate_similarity_sentence_transformer(text1, text2):
         return 0.0
 
 
+def get_jd_resume_text_match_score(job_description_text, resume_text):
+    """
+    Calculates the match score between a job description and already-extracted resume text.
+    Prefers SentenceTransformer if available, otherwise falls back to TF-IDF.
+    """
+    if not job_description_text:
+        print("Match Score: Job description text is empty.")
+        return 0.0
+    if not resume_text:
+        print("Match Score: Resume text is empty.")
+        return 0.0
+
+    print(f"Resume text length: {len(resume_text)}.")
+    print(f"Job description text length: {len(job_description_text)}.")
+
+    if get_sentence_model():
+        print("Calculating similarity using Sentence Transformer.")
+        score = calculate_similarity_sentence_transformer(job_description_text, resume_text)
+    else:
+        print("Sentence Transformer model not available. Calculating similarity using TF-IDF.")
+        score = calculate_similarity_tfidf(job_description_text, resume_text)
+    
+    print(f"Calculated raw score: {score}")
+    return score
+
+
 def get_jd_resume_match_score(job_description_text, resume_file_path):
     """
     Calculates the match score between a job description and a resume file.
@@ -170,14 +430,4 @@ def get_jd_resume_match_score(job_description_text, resume_file_path):
         return 0.0
     
     print(f"Successfully extracted resume text (length: {len(resume_text)}).")
-    print(f"Job description text length: {len(job_description_text)}.")
-
-    if sentence_model:
-        print("Calculating similarity using Sentence Transformer.")
-        score = calculate_similarity_sentence_transformer(job_description_text, resume_text)
-    else:
-        print("Sentence Transformer model not available. Calculating similarity using TF-IDF.")
-        score = calculate_similarity_tfidf(job_description_text, resume_text)
-    
-    print(f"Calculated raw score: {score}")
-    return score
\ No newline at end of file
+    return get_jd_resume_text_match_score(job_description_text, resume_text)
@@ -1,26 +1,38 @@
 # In application_tracker/job_applications/views.py
 
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth import login, get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import (
+    View,
     ListView,
     DetailView,
+    TemplateView,
     CreateView,
     UpdateView,
     DeleteView
 )
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
+from django.utils.html import strip_tags
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
 from django.contrib import messages
 
-from .models import JobApplication, Company # CustomUser is fetched via get_user_model
-from .forms import EmailUserCreationForm, JobApplicationForm, CompanyForm
+from .cache_versions import APPLICATION_COUNT, COMPANY_COUNT
+from .company_index import get_company_index, resolve_company
+from .models import JobApplication, Company, OutgoingEmail # CustomUser is fetched via get_user_model
+from .forms import EmailUserCreationForm, JobApplicationForm, CompanyForm, ResumeRankForm, ApplicationImportForm
+from .pagination import KeysetPaginationMixin
+from .search import search_applications
 
 User = get_user_model() # Get your active user model (CustomUser)
 
@@ -67,25 +79,19 @@ def signup_view(request):
             }
             # Render the email body from an HTML template
             message_html = render_to_string('registration/account_activation_email.html', message_context)
-            
-            try:
-                send_mail(
-                    subject=mail_subject,
-                    message='', # Plain text message (optional if sending HTML)
-                    from_email='noreply@yourapplicationtracker.com', # Your "from" address
-                    recipient_list=[user.email],
-                    html_message=message_html # HTML version of the email
-                )
-                messages.info(request, f'Registration successful! An activation link has been sent to {user.email}. Please check your email to complete registration.')
-                return render(request, 'registration/account_activation_sent.html', {'email': user.email})
-            except Exception as e:
-                # Log the detailed error to your server console/logs
-                print(f"ERROR sending activation email to {user.email}: {e}")
-                
-                # Provide a user-friendly error message
-                messages.error(request, 'We encountered an issue sending the activation email. Your registration has been recorded. Please contact support if you do not receive the email shortly.')
-                # Still redirect to the "activation sent" page, but it will now show the error message
-                return render(request, 'registration/account_activation_sent.html', {'email': user.email, 'email_error': True})
+
+            # Queued in the outbox and sent by the email worker (`run_email_worker`), so a slow
+            # mail server can't hold up the signup request.
+            OutgoingEmail.objects.enqueue(
+                subject=mail_subject,
+                body=strip_tags(message_html), # Plain-text alternative
+                html_body=message_html,
+                to=[user.email],
+                from_email='noreply@yourapplicationtracker.com', # Your "from" address
+                kind='activation',
+            )
+            messages.info(request, f'Registration successful! An activation link has been sent to {user.email}. Please check your email to complete registration.')
+            return render(request, 'registration/account_activation_sent.html', {'email': user.email})
     else: # GET request
         form = EmailUserCreationForm()
     
@@ -115,23 +121,60 @@ def activate_account_view(request, uidb64, token):
         return render(request, 'registration/account_activation_invalid.html')
 
 
+class OwnedObjectMixin:
+    """
+    Single-object views over the requesting user's own rows. Ownership is part of the query
+    (another user's pk is a 404) and the object is fetched once per request, with
+    `related_fields` joined, however many times get_object() is called.
+    """
+    related_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(user=self.request.user)
+        return queryset.select_related(*self.related_fields) if self.related_fields else queryset
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_owned_object'):
+            self._owned_object = super().get_object()
+        return self._owned_object
+
+
 # --- Job Application CRUD Views ---
 # (These remain the same as previously provided)
-class ApplicationListView(LoginRequiredMixin, ListView):
+class ApplicationListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = JobApplication
     template_name = 'job_applications/application_list.html'
+    partial_template_name = 'job_applications/_application_rows.html'
     context_object_name = 'applications'
-    paginate_by = 10
+    page_size = 10
+    keyset_ordering = ('-applied_date', '-updated_at', '-id') # Seeks along jobapp_user_applied_idx
+    count_cache_namespace = APPLICATION_COUNT
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
     def get_queryset(self):
-        return JobApplication.objects.filter(user=self.request.user).select_related('company').order_by('-applied_date', '-updated_at')
+        queryset = JobApplication.objects.filter(user=self.request.user).for_list()
+        if self.get_search_query():
+            queryset = search_applications(queryset, self.get_search_query(), user=self.request.user)
+        return queryset
+    def get_keyset_ordering(self):
+        if self.get_search_query():
+            return ('-search_rank', '-id') # Best match first
+        return super().get_keyset_ordering()
+    def get_count_cache_suffix(self):
+        query = self.get_search_query()
+        return hashlib.sha256(query.encode()).hexdigest()[:16] if query else ''
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['search_query'] = self.get_search_query()
+        return context
 
-class ApplicationDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class ApplicationDetailView(LoginRequiredMixin, OwnedObjectMixin, DetailView):
     model = JobApplication
+    related_fields = ('company',)
     template_name = 'job_applications/application_detail.html'
     context_object_name = 'application'
-    def test_func(self):
-        application = self.get_object()
-        return self.request.user == application.user
 
 class ApplicationCreateView(LoginRequiredMixin, CreateView):
     model = JobApplication
@@ -147,14 +190,14 @@ class ApplicationCreateView(LoginRequiredMixin, CreateView):
         company_obj_from_dropdown = form.cleaned_data.get('company')
         company_name_manual = form.cleaned_data.get('company_name_manual')
         if not company_obj_from_dropdown and company_name_manual:
-            company, created = Company.objects.get_or_create(user=self.request.user, name=company_name_manual.strip())
-            form.instance.company = company
+            form.instance.company = resolve_company(self.request.user, company_name_manual, index=form.company_index)
         elif company_obj_from_dropdown:
             form.instance.company = company_obj_from_dropdown
         return super().form_valid(form)
 
-class ApplicationUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class ApplicationUpdateView(LoginRequiredMixin, OwnedObjectMixin, UpdateView):
     model = JobApplication
+    related_fields = ('company',)
     form_class = JobApplicationForm
     template_name = 'job_applications/application_form.html'
     success_url = reverse_lazy('job_applications:application_list')
@@ -162,38 +205,162 @@ class ApplicationUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
         kwargs = super().get_form_kwargs()
         kwargs['user'] = self.request.user
         return kwargs
-    def test_func(self):
-        application = self.get_object()
-        return self.request.user == application.user
     def form_valid(self, form):
         company_obj_from_dropdown = form.cleaned_data.get('company')
         company_name_manual = form.cleaned_data.get('company_name_manual')
         if not company_obj_from_dropdown and company_name_manual:
-            company, created = Company.objects.get_or_create(user=self.request.user, name=company_name_manual.strip())
-            form.instance.company = company
+            form.instance.company = resolve_company(self.request.user, company_name_manual, index=form.company_index)
         elif company_obj_from_dropdown:
             form.instance.company = company_obj_from_dropdown
         else:
             form.instance.company = None
         return super().form_valid(form)
 
-class ApplicationDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class ApplicationDeleteView(LoginRequiredMixin, OwnedObjectMixin, DeleteView):
     model = JobApplication
+    related_fields = ('company',)
     template_name = 'job_applications/application_confirm_delete.html'
     success_url = reverse_lazy('job_applications:application_list')
     context_object_name = 'application'
-    def test_func(self):
-        application = self.get_object()
-        return self.request.user == application.user
+
+class ApplicationImportView(LoginRequiredMixin, View):
+    """Bulk import from a CSV/JSON file; see importer.py. Scoring of imported rows is queued for the worker."""
+    template_name = 'job_applications/application_import.html'
+
+    def get(self, request):
+        return render(request, self.template_name, {'form': ApplicationImportForm()})
+
+    def post(self, request):
+        from .importer import import_applications
+        form = ApplicationImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return render(request, self.template_name, {'form': form})
+        result = import_applications(request.user, form.cleaned_data['file'], form.cleaned_data['file_format'])
+        if result.created:
+            messages.success(request, f"Imported {result.created} of {result.rows} application(s).")
+        if result.error_count:
+            messages.warning(request, f"{result.error_count} row(s) could not be imported.")
+        return render(request, self.template_name, {'form': ApplicationImportForm(), 'result': result})
+
+class ApplicationExportView(LoginRequiredMixin, View):
+    """Streams all of the user's applications as CSV (default) or XLSX (?format=xlsx); see exporter.py."""
+    def get(self, request):
+        from .exporter import export_response
+        queryset = JobApplication.objects.filter(user=request.user)
+        return export_response(queryset, request.GET.get('format', 'csv'), 'job-applications')
+
+class ApplicationRankView(LoginRequiredMixin, View):
+    """Ranks all of the user's applications by how well their job description matches one resume."""
+    template_name = 'job_applications/application_rank.html'
+
+    def get(self, request):
+        form = ResumeRankForm(user=request.user)
+        return render(request, self.template_name, {'form': form})
+
+    def post(self, request):
+        # Imported here so only requests that rank load the NLP stack, not every web worker at start-up.
+        from .ranking import rank_applications
+        from .text_cache import get_resume_text_with_hash
+
+        form = ResumeRankForm(request.POST, request.FILES, user=request.user)
+        if not form.is_valid():
+            return render(request, self.template_name, {'form': form})
+
+        uploaded = form.cleaned_data.get('resume_file')
+        if uploaded:
+            suffix = os.path.splitext(uploaded.name)[1].lower()
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+                for chunk in uploaded.chunks():
+                    tmp.write(chunk)
+            try:
+                resume_hash, resume_text = get_resume_text_with_hash(tmp.name)
+            finally:
+                os.remove(tmp.name)
+        else:
+            storage = JobApplication._meta.get_field('resume_submitted').storage
+            resume_hash, resume_text = get_resume_text_with_hash(storage.path(form.cleaned_data['stored_resume']))
+
+        if not resume_text:
+            form.add_error(None, "Could not extract any text from that resume.")
+            return render(request, self.template_name, {'form': form})
+
+        ranking = rank_applications(request.user, resume_text, resume_hash, top_k=form.cleaned_data.get('top_k') or 20)
+        applications = JobApplication.objects.filter(user=request.user).select_related('company').in_bulk([pk for pk, _ in ranking])
+        results = [(applications[pk], score) for pk, score in ranking if pk in applications]
+
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'results': [
+                {
+                    'id': application.pk,
+                    'job_title': application.job_title,
+                    'company': application.get_company_name(),
+                    'status': application.status,
+                    'score': round(score, 2),
+                    'url': reverse('job_applications:application_detail', args=[application.pk]),
+                }
+                for application, score in results
+            ]})
+        return render(request, self.template_name, {'form': form, 'results': results})
+
+class SimilarApplicationsView(LoginRequiredMixin, OwnedObjectMixin, DetailView):
+    """Applications whose job description is most similar to this one; near-identical ones are flagged as duplicates."""
+    model = JobApplication
+    related_fields = ('company',)
+    template_name = 'job_applications/application_similar.html'
+    context_object_name = 'application'
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        similar = JobApplication.objects.filter(user=self.request.user).select_related('company').similar_to(
+            self.object, k=10, user=self.request.user
+        )
+        context['similar_applications'] = similar
+        context['duplicate_threshold'] = getattr(settings, 'DUPLICATE_POSTING_SIMILARITY', 0.95)
+        return context
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') == 'json':
+            threshold = context['duplicate_threshold']
+            return JsonResponse({'results': [
+                {
+                    'id': application.pk,
+                    'job_title': application.job_title,
+                    'company': application.get_company_name(),
+                    'similarity': round(application.similarity, 4),
+                    'is_duplicate': application.similarity >= threshold,
+                    'url': reverse('job_applications:application_detail', args=[application.pk]),
+                }
+                for application in context['similar_applications']
+            ]})
+        return super().render_to_response(context, **response_kwargs)
+
+class DashboardView(LoginRequiredMixin, TemplateView):
+    template_name = 'job_applications/dashboard.html'
+    def get_context_data(self, **kwargs):
+        from .analytics import get_dashboard_stats
+        context = super().get_context_data(**kwargs)
+        context['stats'] = get_dashboard_stats(self.request.user)
+        return context
 
 # --- Company CRUD Views ---
-class CompanyListView(LoginRequiredMixin, ListView):
+class CompanyListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Company
     template_name = 'job_applications/company_list.html'
+    partial_template_name = 'job_applications/_company_rows.html'
     context_object_name = 'companies'
-    paginate_by = 10
+    page_size = 10
+    keyset_ordering = ('name', 'id') # (user, name) is unique, so this seeks along its index
+    count_cache_namespace = COMPANY_COUNT
     def get_queryset(self):
-        return Company.objects.filter(user=self.request.user).order_by('name')
+        return Company.objects.filter(user=self.request.user).only('name', 'website')
+
+class CompanyLookupView(LoginRequiredMixin, View):
+    """Type-ahead for the application form's company field: the user's companies matching ?q=, from the cached index."""
+    LIMIT = 20
+
+    def get(self, request):
+        index = get_company_index(request.user)
+        return JsonResponse({'results': [
+            {'id': company_id, 'name': name} for company_id, name in index.search(request.GET.get('q', ''), limit=self.LIMIT)
+        ]})
 
 class CompanyCreateView(LoginRequiredMixin, CreateView):
     model = Company
@@ -204,20 +371,14 @@ class CompanyCreateView(LoginRequiredMixin, CreateView):
         form.instance.user = self.request.user
         return super().form_valid(form)
 
-class CompanyUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class CompanyUpdateView(LoginRequiredMixin, OwnedObjectMixin, UpdateView):
     model = Company
     form_class = CompanyForm
     template_name = 'job_applications/company_form.html'
     success_url = reverse_lazy('job_applications:company_list')
-    def test_func(self):
-        company = self.get_object()
-        return self.request.user == company.user
 
-class CompanyDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CompanyDeleteView(LoginRequiredMixin, OwnedObjectMixin, DeleteView):
     model = Company
     template_name = 'job_applications/company_confirm_delete.html'
     success_url = reverse_lazy('job_applications:company_list')
     context_object_name = 'company'
-    def test_func(self):
-        company = self.get_object()
-        return self.request.user == company.user
\ No newline at end of file
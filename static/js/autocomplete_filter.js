@@ -0,0 +1,12 @@
+// Admin changelist: reloads the list filtered on the object picked in an autocomplete list filter.
+// select2 fires its change events through jQuery, so the handler is bound with django.jQuery.
+django.jQuery(function ($) {
+    $('.autocomplete-filter select').on('change', function () {
+        var container = this.closest('.autocomplete-filter');
+        var params = new URLSearchParams(container.dataset.queryString);
+        if (this.value) {
+            params.set(container.dataset.parameter, this.value);
+        }
+        window.location.search = params.toString();
+    });
+});
@@ -0,0 +1,42 @@
+// Type-ahead for the application form's company field: suggests the user's companies from the
+// company lookup endpoint and keeps the hidden company id in step with the typed name.
+document.querySelectorAll('input.company-typeahead').forEach(function (input) {
+    if (input.dataset.bound) return;
+    input.dataset.bound = '1';
+    var hidden = document.getElementById(input.dataset.target);
+    var options = document.getElementById(input.getAttribute('list'));
+    var known = {}; // Lower-cased name -> id, for every suggestion shown so far
+    var timer = null;
+
+    function lookup() {
+        var params = new URLSearchParams({q: input.value});
+        fetch(input.dataset.lookupUrl + '?' + params.toString(), {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                options.innerHTML = '';
+                data.results.forEach(function (company) {
+                    known[company.name.toLowerCase()] = company.id;
+                    var option = document.createElement('option');
+                    option.value = company.name;
+                    options.appendChild(option);
+                });
+                select();
+            })
+            .catch(function () {});
+    }
+
+    function select() {
+        var id = known[input.value.trim().toLowerCase()];
+        hidden.value = id === undefined ? '' : id;
+    }
+
+    if (input.value) known[input.value.toLowerCase()] = hidden.value;
+    input.addEventListener('input', function () {
+        select();
+        clearTimeout(timer);
+        timer = setTimeout(lookup, 150);
+    });
+    input.addEventListener('focus', function () {
+        if (!options.children.length) lookup();
+    });
+});
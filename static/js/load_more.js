@@ -0,0 +1,34 @@
+// "Load more" for the cursor-paginated lists: fetches the next page's rows (?partial=1)
+// and appends them, following the X-Next-Cursor header until it is empty.
+document.querySelectorAll('button.load-more').forEach(function (button) {
+    if (button.dataset.bound) return;
+    button.dataset.bound = '1';
+    button.addEventListener('click', function () {
+        var params = new URLSearchParams(window.location.search);
+        params.set('cursor', button.dataset.cursor);
+        params.set('partial', '1');
+        params.set('count', '0'); // The total was already rendered with the first page
+        button.disabled = true;
+        fetch(window.location.pathname + '?' + params.toString(), {credentials: 'same-origin'})
+            .then(function (response) {
+                var nextCursor = response.headers.get('X-Next-Cursor');
+                return response.text().then(function (html) { return [html, nextCursor]; });
+            })
+            .then(function (result) {
+                document.getElementById(button.dataset.rows).insertAdjacentHTML('beforeend', result[0]);
+                if (result[1]) {
+                    button.dataset.cursor = result[1];
+                    document.querySelectorAll('.next-page-link').forEach(function (link) {
+                        var linkParams = new URLSearchParams(link.search);
+                        linkParams.set('cursor', result[1]);
+                        link.search = linkParams.toString();
+                    });
+                    button.disabled = false;
+                } else {
+                    button.remove();
+                    document.querySelectorAll('.next-page-link').forEach(function (link) { link.remove(); });
+                }
+            })
+            .catch(function () { button.disabled = false; });
+    });
+});
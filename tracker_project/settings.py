@@ -110,6 +110,9 @@ STATICFILES_DIRS = [
 # Media files (user-uploaded content like resumes)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Resumes are stored once per distinct file; `python manage.py resume_storage --cleanup` deletes files
+# no application has referenced for this long.
+RESUME_CLEANUP_GRACE_HOURS = 24
 
 
 LOGIN_URL = 'login' 
@@ -135,4 +138,71 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 # Crispy Forms Settings
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_DEFAULT_TEMPLATE_PACK = "bootstrap5"
-CRISPY_TEMPLATE_PACK = "bootstrap5"
\ No newline at end of file
+CRISPY_TEMPLATE_PACK = "bootstrap5"
+
+# Resume match scoring queue (processed by `python manage.py run_scoring_worker`)
+SCORING_JOB_MAX_ATTEMPTS = 5 # Jobs are marked FAILED after this many attempts
+SCORING_JOB_RETRY_BACKOFF = 30 # Seconds before the first retry; doubles on each further attempt
+SCORING_JOB_RETRY_BACKOFF_MAX = 3600
+SCORING_JOB_RUNNING_TIMEOUT = 600 # RUNNING jobs older than this are assumed abandoned and retried
+SCORING_WORKER_POLL_INTERVAL = 2 # Seconds the worker sleeps when the queue is empty
+
+# Outgoing email outbox (sent by `python manage.py run_email_worker`)
+EMAIL_OUTBOX_BATCH_SIZE = 100 # Messages claimed and sent per batch over the worker's connection
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5 # Messages are marked FAILED after this many attempts
+EMAIL_OUTBOX_RETRY_BACKOFF = 60 # Seconds before the first retry; doubles on each further attempt
+EMAIL_OUTBOX_RETRY_BACKOFF_MAX = 3600
+EMAIL_OUTBOX_SENDING_TIMEOUT = 600 # SENDING messages older than this are assumed abandoned and retried
+EMAIL_WORKER_POLL_INTERVAL = 5 # Seconds the worker sleeps when the outbox is empty
+
+# Resume match scoring model. The model is loaded lazily by the processes that score, never at import time.
+RESUME_MATCH_BACKEND = os.getenv('RESUME_MATCH_BACKEND', 'auto') # 'auto' (SentenceTransformer, TF-IDF fallback) or 'tfidf'
+RESUME_MATCH_MODEL = os.getenv('RESUME_MATCH_MODEL', 'all-MiniLM-L6-v2') # Model name or a local path to pin a specific model
+
+# Content-addressed cache of extracted resume text (see `python manage.py resume_text_cache`)
+RESUME_TEXT_CACHE_MAX_ENTRIES = 10000
+RESUME_TEXT_CACHE_MAX_CHARS = 200_000_000 # Total cached characters before least-recently-used entries are evicted
+RESUME_TEXT_CACHE_PRUNE_EVERY = 100 # New entries between prunes; the bounds can be exceeded by up to this many
+
+# Corpus-level TF-IDF model used when no SentenceTransformer model is available (see `python manage.py fit_tfidf_model`)
+RESUME_MATCH_TFIDF_MODEL_PATH = os.path.join(BASE_DIR, 'nlp_models', 'tfidf.joblib')
+RESUME_MATCH_TFIDF_MAX_AGE_DAYS = 7 # `fit_tfidf_model --if-stale` refits models older than this...
+RESUME_MATCH_TFIDF_REFIT_AFTER_DOCS = 500 # ...or once this many documents were added since the last fit
+
+# Cache used for rankings and other per-user cached data. Cached entries are invalidated from signal
+# receivers, so multi-process deployments should point this at a shared backend (e.g. Redis or Memcached).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+RANKING_CACHE_TIMEOUT = 24 * 60 * 60 # Seconds a resume's ranking stays cached if none of the user's JDs change
+ANALYTICS_CACHE_TIMEOUT = 60 * 60 # Seconds the dashboard stays cached (changes invalidate it sooner; bounds the "last N weeks" window)
+COMPANY_INDEX_CACHE_TIMEOUT = 24 * 60 * 60 # Seconds a user's company index stays cached (company saves/deletes invalidate it sooner)
+
+# Approximate nearest-neighbour index over job description embeddings ("similar applications")
+JD_INDEX_PATH = os.path.join(BASE_DIR, 'nlp_models', 'jd_index.npz')
+JD_INDEX_SYNC_INTERVAL = 30 # Seconds between incremental syncs of JD changes into the index
+DUPLICATE_POSTING_SIMILARITY = 0.95 # Similar applications at or above this cosine similarity are flagged as duplicates
+
+# Follow-up reminders (see `python manage.py send_reminders`)
+# Days an application may stay in a status before its owner is reminded about it; other statuses are never reminded.
+REMINDER_RULES = {
+    'APPLIED': 14,
+    'ASSESSMENT': 7,
+    'INTERVIEW_R1': 7,
+    'INTERVIEW_R2': 7,
+    'INTERVIEW_R3_PLUS': 7,
+    'OFFER_RECEIVED': 3,
+}
+REMINDER_REPEAT_DAYS = 7 # An application is not reminded about again within this many days
+REMINDER_FROM_EMAIL = DEFAULT_FROM_EMAIL or 'noreply@yourapplicationtracker.com'
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000') # Used for links in emails sent outside a request
+
+# PDF resume text extraction limits
+RESUME_PDF_MAX_PAGES = 50 # Pages beyond this are never read
+RESUME_PDF_MAX_CHARS = 200_000 # Extraction stops once this many characters were extracted
+RESUME_PDF_PAGE_TIMEOUT = 10 # Seconds per page before it is skipped; None extracts small documents in-process, without a timeout
+RESUME_PDF_WORKERS = 4 # Processes used to extract big documents in parallel
+RESUME_PDF_PARALLEL_MIN_PAGES = 20 # Documents with at least this many pages are extracted in parallel
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include # Add include
 from django.contrib.auth import views as auth_views # For Django's built-in auth views
 from job_applications import views as job_app_views # Import your app's views for signup
+from job_applications.forms import OutboxPasswordResetForm
 
 # For serving media files during development (resume uploads)
 from django.conf import settings
@@ -17,7 +18,7 @@ urlpatterns = [
 
     # Password Reset URLs (Optional, but good to have)
     # You'll need to create templates for these if you enable them.
-    path('accounts/password_reset/', auth_views.PasswordResetView.as_view(template_name='registration/password_reset_form.html'), name='password_reset'),
+    path('accounts/password_reset/', auth_views.PasswordResetView.as_view(template_name='registration/password_reset_form.html', form_class=OutboxPasswordResetForm), name='password_reset'), # Email sent by the outbox worker
     path('accounts/password_reset/done/', auth_views.PasswordResetDoneView.as_view(template_name='registration/password_reset_done.html'), name='password_reset_done'),
     path('accounts/reset/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(template_name='registration/password_reset_confirm.html'), name='password_reset_confirm'),
     path('accounts/reset/done/', auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name='password_reset_complete'),